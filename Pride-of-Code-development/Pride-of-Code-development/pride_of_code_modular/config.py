@@ -1,4 +1,4 @@
-# Game window settings
+# Game window settings (logical resolution; the window is scaled to fit)
 WINDOW_WIDTH = 1400
 WINDOW_HEIGHT = 800
 GAME_TITLE = "Code of Pride: Marching Band Director"
@@ -46,10 +46,21 @@ EDITOR_Y = 140
 
 # Paths
 ASSETS_DIR = "assets"
+LEVELS_DIR = "assets/levels"  # one json file per level
+LEVEL_INDEX_PATH = "level_index.json"  # cached index of LEVELS_DIR, rebuilt when files change
+EXAMPLES_DIR = "examples"  # opened as workspace tabs in the editor scene
+LEADERBOARD_PATH = "leaderboard.db"  # SQLite database, created on first use
+SCORE_LOG_PATH = "score_events.jsonl"  # every Pride Points award, for analytics
+DAILY_CHALLENGES_PATH = "daily_challenges.json"  # generated daily challenges for the current term
+RUN_LOG_PATH = "run_records.jsonl"  # every graded challenge run, for re-verification
 
 # Animation settings
 MARCHER_MOVE_SPEED = 2.0  # pixels per frame
 MARCHER_SIZE = 8  # 8x8 pixel sprite (Retro Bowl style)
+TICKS_PER_COUNT = 8  # Simulation ticks per count of music
+DEFAULT_TEMPO = 120  # Counts per minute
+SIM_TICK_RATE = TICKS_PER_COUNT * DEFAULT_TEMPO / 60  # Simulation ticks per second
+TRAIL_COUNTS = 8  # Counts of history shown in marcher trails
 
 # Scoring
 MAX_PRIDE_POINTS = 100.0
@@ -0,0 +1,39 @@
+import time
+
+# Fixed-step simulation clock. The simulation always advances in whole
+# ticks of 1 / tick_rate seconds, so it does the same work in the same
+# order on every machine; the renderer uses `alpha` to interpolate
+# between the last two ticks at whatever rate frames are drawn.
+
+class FixedStepClock:
+    def __init__(self, tick_rate: float, max_ticks_per_frame: int = 8):
+        self.tick_rate = tick_rate
+        self.tick_length = 1.0 / tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.ticks = 0
+        self.alpha = 0.0
+        self._accumulator = 0.0
+        self._last = time.perf_counter()
+
+    def reset(self):
+        self.ticks = 0
+        self.alpha = 0.0
+        self._accumulator = 0.0
+        self._last = time.perf_counter()
+
+    def advance(self, elapsed: float = None) -> int:
+        # returns the number of ticks to simulate this frame
+        if elapsed is None:
+            now = time.perf_counter()
+            elapsed = now - self._last
+            self._last = now
+        self._accumulator += max(0.0, elapsed)
+        due = int(self._accumulator / self.tick_length)
+        if due > self.max_ticks_per_frame:
+            # after a stall, drop the backlog instead of spiralling
+            due = self.max_ticks_per_frame
+            self._accumulator = due * self.tick_length
+        self._accumulator -= due * self.tick_length
+        self.ticks += due
+        self.alpha = self._accumulator / self.tick_length
+        return due
@@ -0,0 +1,81 @@
+import pygame
+from typing import Tuple
+
+# The game always renders at a fixed logical resolution (WINDOW_WIDTH x
+# WINDOW_HEIGHT), so layout and every static cache (field background, grid,
+# sprite atlas) are built once at that size. pygame.SCALED lets SDL scale the
+# logical frame to any window size on the GPU at a fixed per-frame cost. If
+# that is unavailable we scale ourselves into a cached, letterboxed target
+# with a nearest-neighbour scale; that path still costs more per frame at
+# larger window sizes.
+
+class Display:
+    def __init__(self, size: Tuple[int, int], hardware_scaling: bool = True):
+        self.logical_size = size
+        self.hardware_scaled = False
+        if hardware_scaling:
+            try:
+                self.window = pygame.display.set_mode(size, pygame.SCALED | pygame.RESIZABLE)
+                self.surface = self.window
+                self.hardware_scaled = True
+            except pygame.error:
+                pass
+        if not self.hardware_scaled:
+            self.window = pygame.display.set_mode(size, pygame.RESIZABLE)
+            self.surface = pygame.Surface(size)
+
+        # software scaling target, rebuilt only when the window size changes
+        self.scale = 1.0
+        self.viewport = pygame.Rect((0, 0), size)
+        self._scaled = None
+        self._clear_window = True
+        self._update_viewport(self.window.get_size())
+
+    def _update_viewport(self, window_size: Tuple[int, int]):
+        lw, lh = self.logical_size
+        ww, wh = window_size
+        scale = min(ww / lw, wh / lh)
+        vw, vh = max(1, int(lw * scale)), max(1, int(lh * scale))
+        self.scale = scale
+        self.viewport = pygame.Rect((ww - vw) // 2, (wh - vh) // 2, vw, vh)
+        self._scaled = None if (vw, vh) == self.logical_size else pygame.Surface((vw, vh))
+        # the letterbox bars are cleared once, not every frame
+        self._clear_window = True
+
+    def handle_resize(self, ev):
+        if self.hardware_scaled:
+            return
+        self.window = pygame.display.set_mode((ev.w, ev.h), pygame.RESIZABLE)
+        self._update_viewport((ev.w, ev.h))
+
+    def to_logical(self, pos: Tuple[int, int]) -> Tuple[int, int]:
+        if self.hardware_scaled:
+            return pos
+        return (int((pos[0] - self.viewport.x) / self.scale),
+                int((pos[1] - self.viewport.y) / self.scale))
+
+    def mouse_pos(self) -> Tuple[int, int]:
+        # logical replacement for pygame.mouse.get_pos()
+        return self.to_logical(pygame.mouse.get_pos())
+
+    def translate_event(self, ev):
+        # SDL already reports logical mouse coordinates in SCALED mode
+        if self.hardware_scaled or not hasattr(ev, 'pos'):
+            return ev
+        attrs = dict(ev.dict)
+        attrs['pos'] = self.to_logical(ev.pos)
+        if 'rel' in attrs:
+            attrs['rel'] = (int(ev.rel[0] / self.scale), int(ev.rel[1] / self.scale))
+        return pygame.event.Event(ev.type, attrs)
+
+    def present(self):
+        if not self.hardware_scaled:
+            if self._clear_window:
+                self.window.fill((0, 0, 0))
+                self._clear_window = False
+            if self._scaled is None:
+                self.window.blit(self.surface, self.viewport)
+            else:
+                pygame.transform.scale(self.surface, self.viewport.size, self._scaled)
+                self.window.blit(self._scaled, self.viewport)
+        pygame.display.flip()
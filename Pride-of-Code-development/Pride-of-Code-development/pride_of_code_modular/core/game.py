@@ -1,9 +1,11 @@
 import pygame
 import time
 
-from config import WINDOW_WIDTH, WINDOW_HEIGHT, GAME_TITLE, EDITOR_X, EDITOR_Y, EDITOR_WIDTH, EDITOR_HEIGHT
+from config import WINDOW_WIDTH, WINDOW_HEIGHT, GAME_TITLE, EDITOR_X, EDITOR_Y, EDITOR_WIDTH, EDITOR_HEIGHT, SIM_TICK_RATE
 
 from core.state_manager import StateManager
+from core.display import Display
+from core.clock import FixedStepClock
 from core.audio_manager import AudioManager
 from core.save_system import SaveSystem
 
@@ -23,16 +25,19 @@ from scenes.story import StoryScene
 class PrideOfCodeGame:
     def __init__(self):
         # -------------------------------
-        # Window
+        # Window (fixed logical resolution, scaled to the window)
         # -------------------------------
         pygame.display.set_caption(GAME_TITLE)
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.display = Display((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.screen = self.display.surface
 
         # -------------------------------
         # Time management
         # -------------------------------
         self.clock = pygame.time.Clock()
-        self.last_time = time.time()
+        self.last_time = time.perf_counter()
+        # simulation runs in fixed ticks, independent of the frame rate
+        self.sim_clock = FixedStepClock(SIM_TICK_RATE)
 
         # -------------------------------
         # Systems
@@ -89,9 +94,9 @@ class PrideOfCodeGame:
 
         while running:
             # --------------------------
-            # Delta-time calculation
+            # Delta-time calculation (monotonic clock)
             # --------------------------
-            now = time.time()
+            now = time.perf_counter()
             dt = now - self.last_time
             self.last_time = now
 
@@ -101,7 +106,12 @@ class PrideOfCodeGame:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
+                elif event.type == pygame.VIDEORESIZE:
+                    # Layout stays in logical coordinates; only the
+                    # final scaling to the window changes
+                    self.display.handle_resize(event)
                 else:
+                    event = self.display.translate_event(event)
                     # Editor gets first chance when active scene is editor
                     if self.state_manager.current_name == "editor":
                         self.editor.handle_event(event)
@@ -109,8 +119,11 @@ class PrideOfCodeGame:
                     self.state_manager.handle_event(event)
 
             # --------------------------
-            # Update
+            # Update: fixed simulation ticks, then per-frame UI
             # --------------------------
+            for _ in range(self.sim_clock.advance(dt)):
+                self.state_manager.tick()
+            self.state_manager.alpha = self.sim_clock.alpha
             self.state_manager.update(dt)
 
             # --------------------------
@@ -118,7 +131,7 @@ class PrideOfCodeGame:
             # --------------------------
             self.screen.fill((20, 20, 30))    # global background
             self.state_manager.draw(self.screen)
-            pygame.display.flip()
+            self.display.present()
 
             # --------------------------
             # Framerate cap
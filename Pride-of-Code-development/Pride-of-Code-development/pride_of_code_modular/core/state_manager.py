@@ -4,6 +4,7 @@ class State:
     def enter(self, **params): pass
     def exit(self): pass
     def update(self, dt): pass
+    def tick(self): pass
     def draw(self, surface): pass
     def handle_event(self, ev): pass
 
@@ -12,6 +13,8 @@ class StateManager:
         self.states: Dict[str, State] = {}
         self.current: State | None = None
         self.current_name: str | None = None
+        # fraction of a simulation tick elapsed, for render interpolation
+        self.alpha = 0.0
 
     def register(self, name: str, state: State):
         self.states[name] = state
@@ -30,6 +33,10 @@ class StateManager:
         if self.current:
             self.current.update(dt)
 
+    def tick(self):
+        if self.current:
+            self.current.tick()
+        
     def draw(self, surface):
         if self.current:
             self.current.draw(surface)
@@ -44,11 +44,14 @@ class BandAPI:
             'percussion': [],
             'guard': []
         }
+        # Drill sets recorded so far as (counts, [(x, y), ...]) tuples
+        self.drill_sets: List[Tuple[int, List[Tuple[float, float]]]] = []
         
     def reset(self):
         """Clear all members and animations."""
         self.members = []
         self.animation_queue = []
+        self.drill_sets = []
         for section in self.sections.values():
             section.clear()
             
@@ -94,6 +97,9 @@ class BandAPI:
             self.members.append(member)
             self.sections[section].append(member)
             
+        # The starting formation is the opening set of the drill
+        self.drill_sets.append((0, self.get_positions()))
+        
     def get_member(self, id: int) -> Optional[BandMember]:
         """Get a band member by ID."""
         for member in self.members:
@@ -105,6 +111,10 @@ class BandAPI:
         """Get all members of a specific section."""
         return self.sections.get(section, [])
         
+    def get_positions(self) -> List[Tuple[float, float]]:
+        """Get the current (x, y) position of every member in ID order."""
+        return [(m.x, m.y) for m in self.members]
+    
     # ============== STUDENT-FACING API METHODS ==============
     
     def move_to(self, member, x: float, y: float):
@@ -234,6 +244,17 @@ class BandAPI:
                 new_y = y + row * spacing
                 self.move_to(m, new_x, new_y)
                 
+    def next_set(self, counts: int = 8):
+        """Finish the current drill set.
+        
+        Every move made since the previous set is marched over the given
+        number of counts when the drill is played back or exported.
+        
+        Args:
+            counts: Number of counts to reach this set (8 = one phrase)
+        """
+        self.drill_sets.append((max(1, int(counts)), self.get_positions()))
+        
     def get_all_members(self) -> List[BandMember]:
         """Return all band members."""
         return self.members
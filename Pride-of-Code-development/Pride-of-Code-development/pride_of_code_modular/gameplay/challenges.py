@@ -6,24 +6,45 @@ that focus on specific programming concepts or tricky drill design problems.
 """
 
 import pygame
-import random
 import datetime
+import math
+import random
 from typing import List, Dict, Optional
 from gameplay.scoring import PridePoints
+from gameplay.score_events import ScoreCategory
+from gameplay.formations import fit_line, fit_circle, fit_block, is_complex_pattern, positions
+from gameplay.grading import ChallengeGrader
+from gameplay.leaderboard import LeaderboardStore
+from gameplay.daily_challenges import DailyChallenges
+from gameplay.run_records import RunLog, make_record
+from config import DAILY_CHALLENGES_PATH, LEADERBOARD_PATH, RUN_LOG_PATH
 
 
 class ChallengeMode:
     """Manages the daily challenge mode."""
     
-    def __init__(self):
+    def __init__(self, run_log_path: Optional[str] = RUN_LOG_PATH):
+        """Create the challenge mode.
+        
+        Args:
+            run_log_path: File every graded run is recorded in, so its
+                score can be re-verified; None to keep only the last
+        """
         self.scorer = PridePoints()
+        # Runs submissions; shared verdict cache for every student
+        self.grader = ChallengeGrader()
         self.challenges = self._generate_challenges()
+        # A challenge for every day, generated a term at a time
+        self.daily = DailyChallenges(DAILY_CHALLENGES_PATH, self.grader)
         self.completed_challenges = set()
         self.current_challenge = None
         self.challenge_start_time = 0
         
         # Leaderboard
-        self.leaderboard = []
+        self.leaderboard = LeaderboardStore(LEADERBOARD_PATH)
+        
+        # Graded runs, for auditing scores
+        self.runs = RunLog(run_log_path)
         
     def _generate_challenges(self) -> List[Dict]:
         """Generate a list of daily challenges.
@@ -42,7 +63,8 @@ class ChallengeMode:
                 'points': 20,
                 'setup_code': '# Create a single band member at position (20, 20)\n'
                              'member = band.get_member(0)\n',
-                'solution_check': 'member.x == 50 and member.y == 30'
+                'solution_check': 'member.x == 50 and member.y == 30',
+                'target': {'members': '[member]', 'positions': [(50, 30)]}
             },
             {
                 'id': 2,
@@ -54,7 +76,10 @@ class ChallengeMode:
                 'points': 30,
                 'setup_code': '# Create 5 band members\n'
                              'members = band.get_all_members()[:5]\n',
-                'solution_check': 'len(members) == 5 and _is_line_formation(members)'
+                'solution_check': 'len(members) == 5 and _is_line_formation(members)',
+                # Any evenly spaced line, anywhere on the field
+                'target': {'members': 'members', 'positions': [(4.0 * i, 0.0) for i in range(5)],
+                           'align': True, 'scale': True}
             },
             {
                 'id': 3,
@@ -66,7 +91,12 @@ class ChallengeMode:
                 'points': 40,
                 'setup_code': '# Create 8 band members\n'
                              'members = band.get_all_members()[:8]\n',
-                'solution_check': 'len(members) == 8 and _is_circle_formation(members)'
+                'solution_check': 'len(members) == 8 and _is_circle_formation(members)',
+                # Any evenly spaced circle, anywhere on the field
+                'target': {'members': 'members',
+                           'positions': [(10 * math.cos(i * math.pi / 4), 10 * math.sin(i * math.pi / 4))
+                                         for i in range(8)],
+                           'align': True, 'scale': True}
             },
             {
                 'id': 4,
@@ -102,19 +132,16 @@ class ChallengeMode:
         
         return challenges
         
-    def get_daily_challenge(self) -> Dict:
-        """Get today's daily challenge.
+    def get_daily_challenge(self, day: Optional[datetime.date] = None) -> Dict:
+        """Get the daily challenge.
+        
+        Args:
+            day: Date of the challenge; today by default
         
         Returns:
-            Challenge dictionary for today
+            Challenge dictionary generated for the day
         """
-        # In a real implementation, we would use the actual date
-        # For now, we'll just rotate through challenges
-        today = datetime.date.today()
-        days_since_epoch = (today - datetime.date(2024, 1, 1)).days
-        challenge_index = days_since_epoch % len(self.challenges)
-        
-        self.current_challenge = self.challenges[challenge_index].copy()
+        self.current_challenge = self.daily.get(day).copy()
         self.challenge_start_time = pygame.time.get_ticks() / 1000.0
         
         return self.current_challenge
@@ -155,12 +182,13 @@ class ChallengeMode:
         # Calculate time taken
         time_taken = (pygame.time.get_ticks() / 1000.0) - self.challenge_start_time
         
-        # Check if solution is correct (simplified check)
-        # In a real implementation, we would execute the code and verify the result
-        is_correct = self._check_solution(code)
+        # Run the code and check the band it leaves behind
+        verdict = self._check_solution(code)
+        is_correct = verdict['success']
         
         # Calculate score
         points = 0
+        source = f"challenge:{self.current_challenge['id']}"
         if is_correct:
             # Base points
             points = self.current_challenge['points']
@@ -172,88 +200,117 @@ class ChallengeMode:
                 points += time_bonus
                 
             # Add to scorer
-            self.scorer.add_points(points, "Challenge completed")
+            self.scorer.add_points(points, "Challenge completed", category=ScoreCategory.COMPLETION,
+                                   source=source)
+            
+            # Bonuses for efficient and creative code, from its syntax tree
+            metrics = verdict['metrics']
+            if metrics:
+                efficiency = self.scorer.calculate_efficiency_score(
+                    metrics['statements'], self.current_challenge['expected_lines'])
+                creativity = self.scorer.calculate_creativity_score(
+                    metrics['complexity'] - 1 + metrics['functions'] + metrics['classes'])
+                self.scorer.add_points(efficiency, "Efficient code", streak=False,
+                                       category=ScoreCategory.EFFICIENT_CODE, source=source)
+                self.scorer.add_points(creativity, "Creative solution", streak=False,
+                                       category=ScoreCategory.CREATIVITY, source=source)
+                points += efficiency + creativity
             
             # Mark as completed
             self.completed_challenges.add(self.current_challenge['id'])
+        elif verdict['similarity']:
+            # Partial credit for a formation close to its target; a
+            # failed attempt still ends the streak
+            points = self.scorer.calculate_formation_score(verdict['similarity'],
+                                                           self.current_challenge['points'])
+            if points > 0:
+                self.scorer.add_points(points, "Formation partly correct",
+                                       category=ScoreCategory.CORRECT_FORMATION, source=source)
+                self.scorer.reset_streak()
+        
+        # Record the run so the score can be reproduced
+        record = make_record(self.current_challenge, code, verdict, points)
+        self.runs.append(record)
             
         # Return results
         return {
             'success': is_correct,
             'points': points,
             'time_taken': time_taken,
-            'message': 'Challenge completed!' if is_correct else 'Solution incorrect'
+            'message': verdict['message'],
+            'output': verdict['output'],
+            'similarity': verdict['similarity'],
+            'metrics': verdict['metrics'],
+            'hints': self._hints(verdict['metrics']),
+            'record': record
         }
         
-    def _check_solution(self, code: str) -> bool:
-        """Check if the solution is correct.
+    def _hints(self, metrics: Optional[Dict]) -> List[str]:
+        """Get tips on making the code shorter.
+        
+        Args:
+            metrics: Code metrics of the submission, if it parsed
+        
+        Returns:
+            One tip per run of repeated calls a loop could replace
+        """
+        if not metrics:
+            return []
+        return [f"Line {c['line'] + 1}: {c['count']} {c['call']} calls in a row could be a loop"
+                for c in metrics['loop_candidates']]
+        
+    def _check_solution(self, code: str) -> Dict:
+        """Check if the solution is correct by running it.
         
         Args:
             code: Code to check
             
         Returns:
-            True if solution is correct, False otherwise
+            The grader's verdict for the current challenge
         """
-        # This is a simplified check
-        # In a real implementation, we would execute the code and verify the result
-        # against the challenge requirements
-        
-        # For now, we'll just check if the code contains some expected elements
-        required_elements = [
-            'band.move_to',
-            'band.form_line',
-            'band.form_circle',
-            'band.form_block'
-        ]
+        return self.grader.grade(self.current_challenge, code)
         
-        # Check for at least one required element
-        for element in required_elements:
-            if element in code:
-                return True
-                
-        return False
-        
-    def get_leaderboard(self, limit: int = 10) -> List[Dict]:
+    def get_leaderboard(self, limit: int = 10, challenge_id: Optional[int] = None,
+                        date: Optional[str] = None) -> List[Dict]:
         """Get the challenge leaderboard.
         
         Args:
             limit: Number of top scores to return
+            challenge_id: Only scores for this challenge
+            date: Only scores from this ISO date (e.g. today's board)
             
         Returns:
-            List of leaderboard entries
+            List of leaderboard entries, best first
         """
-        # Sort leaderboard by score (descending)
-        sorted_leaderboard = sorted(
-            self.leaderboard, 
-            key=lambda x: x['score'], 
-            reverse=True
-        )
-        
-        return sorted_leaderboard[:limit]
+        return self.leaderboard.top(limit, challenge_id, date)
         
-    def add_to_leaderboard(self, name: str, score: float):
+    def add_to_leaderboard(self, name: str, score: float, challenge_id: Optional[int] = None):
         """Add an entry to the leaderboard.
         
         Args:
             name: Player name
             score: Score achieved
+            challenge_id: Challenge the score is for
         """
-        entry = {
-            'name': name,
-            'score': score,
-            'date': datetime.date.today().isoformat()
-        }
+        self.leaderboard.add(name, score, challenge_id)
+        # Nothing closes the store when the game exits, so don't leave
+        # the score in the write buffer
+        self.leaderboard.flush()
         
-        self.leaderboard.append(entry)
+    def get_player_rank(self, name: str, challenge_id: Optional[int] = None,
+                        date: Optional[str] = None) -> Optional[int]:
+        """Get a player's place on the leaderboard.
         
-        # Keep only top 100 scores
-        if len(self.leaderboard) > 100:
-            self.leaderboard = sorted(
-                self.leaderboard, 
-                key=lambda x: x['score'], 
-                reverse=True
-            )[:100]
+        Args:
+            name: Player name
+            challenge_id: Rank on this challenge's board
+            date: Rank on this ISO date's board
             
+        Returns:
+            Rank from 1, or None if the player has no score there
+        """
+        return self.leaderboard.rank(name, challenge_id, date)
+        
     def get_completed_count(self) -> int:
         """Get the number of completed challenges.
         
@@ -283,25 +340,20 @@ class ChallengeMode:
     def reset_progress(self):
         """Reset challenge progress."""
         self.completed_challenges.clear()
-        self.leaderboard.clear()
         self.current_challenge = None
         
     def _is_line_formation(self, members) -> bool:
-        """Check if members form a line (simplified)."""
-        # This would be implemented with actual coordinate checking
-        return len(members) >= 2
+        """Check if members stand in a straight line."""
+        return fit_line(positions(members))['ok']
         
     def _is_circle_formation(self, members) -> bool:
-        """Check if members form a circle (simplified)."""
-        # This would be implemented with actual coordinate checking
-        return len(members) >= 3
+        """Check if members stand evenly around a circle."""
+        return fit_circle(positions(members))['ok']
         
     def _is_block_formation(self, members) -> bool:
-        """Check if members form a block (simplified)."""
-        # This would be implemented with actual coordinate checking
-        return len(members) >= 4
+        """Check if members stand in evenly spaced rows and columns."""
+        return fit_block(positions(members))['ok']
         
     def _is_complex_pattern(self, members) -> bool:
-        """Check if members form a complex pattern (simplified)."""
-        # This would be implemented with actual coordinate checking
-        return len(members) >= 5
\ No newline at end of file
+        """Check if members form a pattern made of several formations."""
+        return is_complex_pattern(members)
@@ -0,0 +1,188 @@
+"""
+Code Analysis - Static checks on student code before it runs.
+
+This module finds the mistakes students otherwise only see as runtime
+errors: names that are not defined anywhere (NameError) and calls to
+band commands that do not exist or get the wrong arguments (AttributeError
+and TypeError). Names are resolved against the namespace the code
+executor provides; band commands are checked against BandAPI's method
+signatures.
+
+Analysis runs on the AST the editor already has. Results for a function
+are cached by the function's AST dump (which ignores positions) and the
+names visible to it, so after an edit only the changed function and the
+module-level code are looked at again.
+"""
+
+import ast
+import difflib
+import inspect
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from gameplay.band_api import BandAPI
+from gameplay.code_executor import CodeExecutor
+
+_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def _diagnostic(node: ast.AST, msg: str, severity: str = 'error') -> Dict:
+    """Make a diagnostic dictionary (0-based line) for an AST node."""
+    line = node.lineno - 1
+    col = node.col_offset
+    end_col = node.end_col_offset if node.end_lineno == node.lineno else None
+    return {'line': line, 'col': col, 'end_col': end_col or col + 1, 'msg': msg, 'severity': severity}
+
+
+def _scan(nodes: List[ast.AST]):
+    """Scan one scope without entering nested function or class bodies.
+    
+    Returns:
+        (bound names, loaded Name nodes, band.* Call nodes, nested scopes)
+    """
+    bound: Set[str] = set()
+    loads: List[ast.Name] = []
+    calls: List[ast.Call] = []
+    nested: List[ast.AST] = []
+    stack = list(reversed(nodes))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, _SCOPES):
+            bound.add(node.name)
+            nested.append(node)
+            # Decorators, defaults and bases are evaluated in this scope
+            outer = list(node.decorator_list)
+            if isinstance(node, ast.ClassDef):
+                outer += node.bases + [k.value for k in node.keywords]
+            else:
+                outer += node.args.defaults + [d for d in node.args.kw_defaults if d is not None]
+            stack.extend(reversed(outer))
+            continue
+        if isinstance(node, ast.Name):
+            if isinstance(node.ctx, ast.Load):
+                loads.append(node)
+            else:
+                bound.add(node.id)
+        elif isinstance(node, ast.arg):
+            # Lambda parameters; treated as visible to the whole scope
+            bound.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                bound.add((alias.asname or alias.name).split('.')[0])
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            bound.add(node.name)
+        elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+              and isinstance(node.func.value, ast.Name) and node.func.value.id == 'band'):
+            calls.append(node)
+        stack.extend(reversed(list(ast.iter_child_nodes(node))))
+    return bound, loads, calls, nested
+
+
+def _parameters(node: ast.AST) -> Set[str]:
+    """Names of every parameter of a function definition."""
+    args = node.args
+    names = [a.arg for a in args.posonlyargs + args.args + args.kwonlyargs]
+    if args.vararg:
+        names.append(args.vararg.arg)
+    if args.kwarg:
+        names.append(args.kwarg.arg)
+    return set(names)
+
+
+class CodeAnalyzer:
+    """Finds undefined names and band command misuse in student code."""
+    
+    def __init__(self, namespace: Optional[Dict] = None):
+        """Create an analyzer for code run in the given namespace.
+        
+        Args:
+            namespace: Globals student code runs with; defaults to the
+                code executor's namespace
+        """
+        if namespace is None:
+            namespace = CodeExecutor().build_namespace()
+        builtins = namespace.get('__builtins__', {})
+        self.known_names = frozenset(namespace) | frozenset(builtins)
+        
+        # Signatures of the public band commands, without `self`
+        self.signatures: Dict[str, inspect.Signature] = {}
+        for name in dir(BandAPI):
+            attr = getattr(BandAPI, name)
+            if not name.startswith('_') and callable(attr):
+                signature = inspect.signature(attr)
+                params = list(signature.parameters.values())[1:]
+                self.signatures[name] = signature.replace(parameters=params)
+        
+        # (function dump, visible names) -> diagnostics relative to the function
+        self._function_cache: Dict[Tuple[str, frozenset], List[Dict]] = {}
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        
+    def analyze(self, tree: ast.Module) -> List[Dict]:
+        """Analyze a parsed module.
+        
+        Args:
+            tree: AST of the student's code
+        
+        Returns:
+            Diagnostics sorted by position, each a dictionary with 'line'
+            (0-based), 'col', 'end_col', 'msg' and 'severity'
+        """
+        with self._lock:
+            used: Dict[Tuple[str, frozenset], List[Dict]] = {}
+            diagnostics = self._analyze_scope(tree.body, self.known_names, used)
+            # Keep only entries for functions that still exist
+            self._function_cache = used
+        diagnostics.sort(key=lambda d: (d['line'], d['col']))
+        return diagnostics
+        
+    def _analyze_scope(self, nodes: List[ast.AST], visible: frozenset, used: Dict) -> List[Dict]:
+        bound, loads, calls, nested = _scan(nodes)
+        visible = visible | bound
+        diagnostics = [_diagnostic(name, f"Name '{name.id}' is not defined")
+                       for name in loads if name.id not in visible]
+        for call in calls:
+            problem = self._check_band_call(call)
+            if problem:
+                diagnostics.append(_diagnostic(call, problem))
+        for scope in nested:
+            diagnostics.extend(self._analyze_nested(scope, visible, used))
+        return diagnostics
+        
+    def _analyze_nested(self, node: ast.AST, visible: frozenset, used: Dict) -> List[Dict]:
+        """Analyze a function or class body, reusing cached results."""
+        key = (ast.dump(node), visible)
+        relative = used.get(key)
+        if relative is None:
+            relative = self._function_cache.get(key)
+        if relative is not None:
+            self.cache_hits += 1
+        else:
+            inner = visible | _parameters(node) if not isinstance(node, ast.ClassDef) else visible
+            found = self._analyze_scope(node.body, inner, used)
+            # Store positions relative to the definition so moving it is free
+            relative = [dict(d, line=d['line'] - (node.lineno - 1), col=d['col'] - node.col_offset,
+                             end_col=d['end_col'] - node.col_offset) for d in found]
+        used[key] = relative
+        return [dict(d, line=d['line'] + node.lineno - 1, col=d['col'] + node.col_offset,
+                     end_col=d['end_col'] + node.col_offset) for d in relative]
+        
+    def _check_band_call(self, call: ast.Call) -> Optional[str]:
+        """Check a band.<command>(...) call against BandAPI.
+        
+        Returns:
+            A message describing the problem, or None
+        """
+        command = call.func.attr
+        signature = self.signatures.get(command)
+        if signature is None:
+            close = difflib.get_close_matches(command, self.signatures, n=1)
+            hint = f" - did you mean band.{close[0]}?" if close else ''
+            return f"band has no command '{command}'{hint}"
+        if any(isinstance(a, ast.Starred) for a in call.args) or any(k.arg is None for k in call.keywords):
+            return None
+        try:
+            signature.bind(*call.args, **{k.arg: k.value for k in call.keywords})
+        except TypeError as e:
+            return f"band.{command}(): {e}"
+        return None
@@ -6,10 +6,77 @@ with access to the Band API.
 
 import sys
 import io
+import random
+import time
 import traceback
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 from gameplay.band_api import BandAPI
 
+# Seconds student code may run before it is stopped
+EXECUTION_TIMEOUT = 5.0
+
+# Bump whenever the executor or the Band API would leave a program's band
+# somewhere else; run records carry it so re-verification can tell a
+# behavior change from a tampered score
+EXECUTOR_VERSION = 1
+
+# File name student code is compiled under; only its frames are timed
+STUDENT_FILENAME = '<student>'
+
+# Sections injected into student code as globals
+SECTIONS = ('brass', 'woodwind', 'percussion', 'guard')
+
+# The only builtins student code can use
+SAFE_BUILTINS = {
+    'print': print,
+    'len': len,
+    'range': range,
+    'enumerate': enumerate,
+    'int': int,
+    'float': float,
+    'str': str,
+    'list': list,
+    'dict': dict,
+    'tuple': tuple,
+    'set': set,
+    'True': True,
+    'False': False,
+    'None': None,
+    'abs': abs,
+    'min': min,
+    'max': max,
+    'sum': sum,
+    'round': round,
+}
+
+
+class ExecutionTimeout(BaseException):
+    """Raised inside student code that runs past its time limit.
+    
+    Derived from BaseException so that a student's `except Exception`
+    can't swallow it; it is raised again on every following line anyway.
+    """
+
+
+def _deadline_tracer(deadline: float):
+    """Build a trace function that stops student code after a deadline.
+    
+    Only frames compiled from student code are traced line by line, so
+    Band API calls run at full speed. A single long call into a builtin
+    (e.g. sum(range(10**12))) can't be interrupted.
+    """
+    def trace_line(frame, event, arg):
+        if time.perf_counter() > deadline:
+            raise ExecutionTimeout()
+        return trace_line
+        
+    def trace_call(frame, event, arg):
+        if frame.f_code.co_filename != STUDENT_FILENAME:
+            return None
+        return trace_line(frame, event, arg)
+        
+    return trace_call
+
 
 class CodeExecutor:
     """Executes student Python code in a controlled environment."""
@@ -18,63 +85,76 @@ class CodeExecutor:
         self.band_api = BandAPI()
         self.output_buffer = []
         self.error_message = None
+        # Globals of the last run, for checking the variables it left
+        self.namespace: Dict[str, Any] = {}
+        self.timed_out = False
+        # Seed of the `random` generator student code gets; None for a fresh one
+        self.seed: Optional[int] = None
         
     def reset(self):
         """Reset the execution environment."""
         self.band_api.reset()
         self.output_buffer = []
         self.error_message = None
+        self.namespace = {}
+        self.timed_out = False
+        
+    def build_namespace(self) -> Dict[str, Any]:
+        """Build the global namespace student code runs in.
+        
+        Returns:
+            Globals with the safe builtins, the Band API and its sections,
+            and `random`, a random.Random seeded with self.seed
+        """
+        namespace = {
+            '__builtins__': dict(SAFE_BUILTINS),
+            'band': self.band_api,
+            'members': self.band_api.members,
+            'random': random.Random(self.seed),
+        }
+        for section in SECTIONS:
+            namespace[section] = self.band_api.get_section(section)
+        return namespace
         
-    def execute(self, code: str, initial_band_size: int = 16) -> Tuple[bool, str]:
+    def execute(self, code: str, initial_band_size: int = 16, timeout: Optional[float] = EXECUTION_TIMEOUT,
+                setup_code: str = '', seed: Optional[int] = None) -> Tuple[bool, str]:
         """Execute student code with the Band API.
         
         Args:
             code: Python code to execute
             initial_band_size: Number of band members to create
+            timeout: Seconds the code may run, or None for no limit
+            setup_code: Code run first in the same namespace (e.g. a
+                challenge's setup); errors in it are reported the same way
+            seed: Seed of the code's `random` generator, so a run can be
+                repeated exactly; None for an unseeded one
             
         Returns:
             (success: bool, output: str) tuple
         """
         self.reset()
+        self.seed = seed
         self.band_api.create_band(initial_band_size)
         
         # Capture stdout
         old_stdout = sys.stdout
         sys.stdout = io.StringIO()
+        old_trace = sys.gettrace()
         
         try:
             # Create safe global namespace with Band API
-            safe_globals = {
-                '__builtins__': {
-                    'print': print,
-                    'len': len,
-                    'range': range,
-                    'int': int,
-                    'float': float,
-                    'str': str,
-                    'list': list,
-                    'dict': dict,
-                    'tuple': tuple,
-                    'set': set,
-                    'True': True,
-                    'False': False,
-                    'None': None,
-                    'abs': abs,
-                    'min': min,
-                    'max': max,
-                    'sum': sum,
-                    'round': round,
-                },
-                'band': self.band_api,
-                'members': self.band_api.members,
-                'brass': self.band_api.get_section('brass'),
-                'woodwind': self.band_api.get_section('woodwind'),
-                'percussion': self.band_api.get_section('percussion'),
-                'guard': self.band_api.get_section('guard'),
-            }
+            safe_globals = self.build_namespace()
+            self.namespace = safe_globals
+            
+            # Compile first so syntax errors aren't counted against the time
+            programs = [compile(setup_code, STUDENT_FILENAME, 'exec')] if setup_code else []
+            programs.append(compile(code, STUDENT_FILENAME, 'exec'))
             
-            # Execute the code
-            exec(code, safe_globals)
+            # Execute the code, stopping it at the deadline
+            if timeout is not None:
+                sys.settrace(_deadline_tracer(time.perf_counter() + timeout))
+            for program in programs:
+                exec(program, safe_globals)
             
             # Get output
             output = sys.stdout.getvalue()
@@ -87,6 +167,13 @@ class CodeExecutor:
             self.error_message = error_msg
             return False, error_msg
             
+        except ExecutionTimeout:
+            error_msg = (f"Timeout: your code ran for more than {timeout:g} seconds.\n\n"
+                         "Check for loops that never end.")
+            self.error_message = error_msg
+            self.timed_out = True
+            return False, error_msg
+            
         except NameError as e:
             error_msg = f"Name Error: {str(e)}\n\nDid you forget to define a variable?"
             self.error_message = error_msg
@@ -103,6 +190,7 @@ class CodeExecutor:
             return False, error_msg
             
         finally:
+            sys.settrace(old_trace)
             sys.stdout = old_stdout
             
     def get_band_members(self):
@@ -0,0 +1,191 @@
+"""
+Code Metrics - Measure student code from its syntax tree.
+
+One walk over the AST counts what scoring needs:
+
+- statements: executable statements; comments never reach the tree, and
+  bare string expressions (docstrings) are skipped too
+- loops and comprehensions
+- functions and classes defined
+- complexity: cyclomatic complexity, 1 plus one per decision (if,
+  loop, except, boolean operator, comprehension clause, match case)
+- loop_candidates: runs of REPEAT_RUN or more consecutive calls to the
+  same function with the same argument layout, e.g. a band.move_to per
+  member, which a loop could replace
+
+Measuring is memoized by a hash of the code's AST dump, so code that
+differs only in comments or formatting is measured once, and grading
+parses a submission once for both its cache key and its metrics.
+"""
+
+import ast
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Consecutive similar calls reported as a loop candidate
+REPEAT_RUN = 3
+
+# Metrics kept in a MetricsCache
+MAX_CACHED_METRICS = 4096
+
+_LOOPS = (ast.For, ast.AsyncFor, ast.While)
+_COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+_FUNCTIONS = (ast.FunctionDef, ast.AsyncFunctionDef)
+_BRANCHES = (ast.If, ast.IfExp, ast.ExceptHandler, ast.match_case) + _LOOPS
+_BODIES = ('body', 'orelse', 'finalbody')
+
+
+def parse(code: str) -> Tuple[Optional[ast.Module], str]:
+    """Parse code and hash it so that formatting and comments don't matter.
+    
+    Code that parses is hashed by its AST dump (which ignores positions
+    and comments); anything else by its text with line endings and
+    trailing whitespace normalized.
+    
+    Args:
+        code: Student code
+    
+    Returns:
+        (syntax tree, or None on a syntax error; hex SHA-256 digest)
+    """
+    try:
+        tree = ast.parse(code)
+        text = ast.dump(tree)
+    except (SyntaxError, ValueError):
+        tree = None
+        lines = code.replace('\r\n', '\n').split('\n')
+        text = '\n'.join(line.rstrip() for line in lines).strip('\n')
+    return tree, hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def code_hash(code: str) -> str:
+    """Hash code so that formatting and comments don't matter (see parse)."""
+    return parse(code)[1]
+
+
+def _callee(node: ast.AST) -> Optional[str]:
+    """Dotted name of a called function, e.g. 'band.move_to', or None."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return '.'.join(reversed(parts))
+
+
+def _call_shape(stmt: ast.stmt) -> Optional[Tuple]:
+    """Callee and argument layout of a call statement, or None."""
+    if not (isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Call)):
+        return None
+    call = stmt.value
+    name = _callee(call.func)
+    if name is None:
+        return None
+    return name, len(call.args), tuple(k.arg for k in call.keywords)
+
+
+def _repeated_calls(body: List[ast.stmt], found: List[Dict]):
+    """Record runs of similar consecutive call statements in one block."""
+    run_start = 0
+    shape = None
+    for i, stmt in enumerate(body + [None]):
+        current = _call_shape(stmt) if stmt is not None else None
+        if current is not None and current == shape:
+            continue
+        if shape is not None and i - run_start >= REPEAT_RUN:
+            found.append({'call': shape[0], 'line': body[run_start].lineno - 1, 'count': i - run_start})
+        run_start = i
+        shape = current
+
+
+def measure(tree: ast.AST) -> Dict:
+    """Measure a syntax tree in one walk.
+    
+    Args:
+        tree: Parsed student code
+    
+    Returns:
+        Dictionary with 'statements', 'loops', 'comprehensions',
+        'functions', 'classes', 'complexity' and 'loop_candidates' (each
+        with 'call', 0-based 'line' and 'count')
+    """
+    statements = loops = comprehensions = functions = classes = 0
+    decisions = 0
+    candidates: List[Dict] = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.stmt):
+            # Docstrings and other bare strings are comments in disguise
+            if not (isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant)
+                    and isinstance(node.value.value, str)):
+                statements += 1
+        if isinstance(node, _LOOPS):
+            loops += 1
+        elif isinstance(node, _COMPREHENSIONS):
+            comprehensions += 1
+        elif isinstance(node, _FUNCTIONS):
+            functions += 1
+        elif isinstance(node, ast.ClassDef):
+            classes += 1
+        if isinstance(node, _BRANCHES):
+            decisions += 1
+        elif isinstance(node, ast.BoolOp):
+            decisions += len(node.values) - 1
+        elif isinstance(node, ast.comprehension):
+            decisions += 1 + len(node.ifs)
+        for field in _BODIES:
+            body = getattr(node, field, None)
+            if isinstance(body, list) and len(body) >= REPEAT_RUN:
+                _repeated_calls(body, candidates)
+        stack.extend(ast.iter_child_nodes(node))
+    candidates.sort(key=lambda c: c['line'])
+    return {
+        'statements': statements,
+        'loops': loops,
+        'comprehensions': comprehensions,
+        'functions': functions,
+        'classes': classes,
+        'complexity': 1 + decisions,
+        'loop_candidates': candidates,
+    }
+
+
+class MetricsCache:
+    """Memoizes measure() by code hash."""
+    
+    def __init__(self, max_cached: int = MAX_CACHED_METRICS):
+        """Create a cache.
+        
+        Args:
+            max_cached: Results kept, least recently used dropped first
+        """
+        self.max_cached = max_cached
+        self._metrics: 'OrderedDict[str, Dict]' = OrderedDict()
+        self.cache_hits = 0
+        
+    def get(self, tree: ast.AST, key: str) -> Dict:
+        """Get the metrics of an already parsed tree.
+        
+        Args:
+            tree: Syntax tree, as returned by parse
+            key: Its hash, as returned by parse
+        """
+        metrics = self._metrics.get(key)
+        if metrics is not None:
+            self._metrics.move_to_end(key)
+            self.cache_hits += 1
+            return metrics
+        metrics = measure(tree)
+        self._metrics[key] = metrics
+        if len(self._metrics) > self.max_cached:
+            self._metrics.popitem(last=False)
+        return metrics
+        
+    def for_code(self, code: str) -> Optional[Dict]:
+        """Get the metrics of code, or None if it doesn't parse."""
+        tree, key = parse(code)
+        return self.get(tree, key) if tree is not None else None
@@ -0,0 +1,243 @@
+"""
+Daily Challenges - Generate a challenge for every day from its date.
+
+Each date seeds its own random generator, so a day's challenge is the
+same on every machine without storing it anywhere: the seed picks the
+formation (line, circle or block), its size, place and spacing, and the
+time limit and points follow from those. Generating a challenge also
+works out its target spots and a reference solution using the Band API,
+and the reference is graded like a student submission, so a challenge
+that can't be solved is caught before a student ever sees it.
+
+Challenges are generated a whole term at a time in one batch (see
+scripts/build_daily_challenges.py) and saved to a JSON file; fetching
+today's challenge is then a dictionary lookup.
+"""
+
+import datetime
+import json
+import math
+import os
+import random
+from typing import Dict, List, Optional, Tuple
+
+from config import DAILY_CHALLENGES_PATH
+from gameplay.code_metrics import MetricsCache
+from gameplay.grading import ChallengeGrader
+
+# Day the terms are counted from
+TERM_EPOCH = datetime.date(2024, 1, 1)
+
+# Days generated per batch
+TERM_DAYS = 120
+
+# Bump when generation changes; saved terms from other versions are rebuilt
+GENERATOR_VERSION = 2
+
+# Members the grader's band has to work with
+BAND_SIZE = 16
+
+# Room left at the sidelines and end zones, in yards
+FIELD_MARGIN = (5, 3)
+FIELD_SIZE = (100, 53)
+
+# Steps between line members in yards: across, down and diagonally
+LINE_STEPS = [(2, 0), (3, 0), (4, 0), (5, 0), (0, 2), (0, 3), (0, 4), (2, 2), (3, 3)]
+
+_KINDS = ('line', 'circle', 'block')
+_DIFFICULTY = {'line': 'beginner', 'circle': 'intermediate', 'block': 'intermediate'}
+_BASE_POINTS = {'line': 25, 'circle': 35, 'block': 35}
+
+_metrics = MetricsCache()
+
+
+def challenge_seed(day: datetime.date) -> int:
+    """Get a date's seed, which is also its challenge id (e.g. 20261019)."""
+    return day.year * 10000 + day.month * 100 + day.day
+
+
+def term_start(day: datetime.date) -> datetime.date:
+    """Get the first day of the term a date falls in."""
+    terms = (day - TERM_EPOCH).days // TERM_DAYS
+    return TERM_EPOCH + datetime.timedelta(days=terms * TERM_DAYS)
+
+
+def _corner(rng: random.Random, width: float, height: float) -> Tuple[int, int]:
+    """Pick a top-left corner that keeps a width x height shape on the field."""
+    x = rng.randint(FIELD_MARGIN[0], int(FIELD_SIZE[0] - FIELD_MARGIN[0] - width))
+    y = rng.randint(FIELD_MARGIN[1], int(FIELD_SIZE[1] - FIELD_MARGIN[1] - height))
+    return x, y
+
+
+def _line(rng: random.Random) -> Tuple[str, int, List, str]:
+    """Line: (description, size, target spots, reference call)."""
+    size = rng.randint(4, 12)
+    dx, dy = rng.choice(LINE_STEPS)
+    x, y = _corner(rng, dx * (size - 1), dy * (size - 1))
+    end_x, end_y = x + dx * (size - 1), y + dy * (size - 1)
+    spots = [[x + dx * i, y + dy * i] for i in range(size)]
+    description = f"Form a line of {size} members from ({x}, {y}) to ({end_x}, {end_y})"
+    return description, size, spots, f"band.form_line(members, {x}, {y}, {end_x}, {end_y})"
+
+
+def _circle(rng: random.Random) -> Tuple[str, int, List, str]:
+    """Circle: (description, size, target spots, reference call)."""
+    size = rng.randint(6, BAND_SIZE)
+    radius = rng.randint(5, 15)
+    x, y = _corner(rng, 2 * radius, 2 * radius)
+    cx, cy = x + radius, y + radius
+    # The same spots band.form_circle picks, starting due east
+    spots = []
+    for i in range(size):
+        angle = 2 * math.pi * i / size
+        spots.append([cx + radius * math.cos(angle), cy + radius * math.sin(angle)])
+    description = (f"Arrange {size} members evenly around a circle of radius {radius} "
+                   f"centered at ({cx}, {cy}), starting at ({cx + radius}, {cy})")
+    return description, size, spots, f"band.form_circle(members, {cx}, {cy}, {radius})"
+
+
+def _block(rng: random.Random) -> Tuple[str, int, List, str]:
+    """Block: (description, size, target spots, reference call)."""
+    rows = rng.randint(2, 4)
+    cols = rng.randint(3, 4)
+    spacing = rng.randint(2, 5)
+    x, y = _corner(rng, spacing * (cols - 1), spacing * (rows - 1))
+    spots = [[x + col * spacing, y + row * spacing] for row in range(rows) for col in range(cols)]
+    description = (f"Form a block of {rows} rows and {cols} columns, {spacing} yards apart, "
+                   f"with its top-left member at ({x}, {y})")
+    return description, rows * cols, spots, f"band.form_block(members, {x}, {y}, {rows}, {spacing})"
+
+
+_GENERATORS = {'line': _line, 'circle': _circle, 'block': _block}
+
+
+def generate_challenge(day: datetime.date) -> Dict:
+    """Generate a date's challenge.
+    
+    Args:
+        day: Date of the challenge
+    
+    Returns:
+        Challenge dictionary like ChallengeMode's, with 'date', a
+        'target' of exact spots, a 'reference' solution, and the
+        'band_size' and 'seed' it is graded with
+    """
+    seed = challenge_seed(day)
+    rng = random.Random(seed)
+    kind = rng.choice(_KINDS)
+    description, size, spots, call = _GENERATORS[kind](rng)
+    setup_code = f"# Your {size} members\nmembers = band.get_all_members()[:{size}]\n"
+    reference = call + '\n'
+    return {
+        'id': seed,
+        'date': day.isoformat(),
+        'title': f"Daily {kind.title()} of {size}",
+        'description': description,
+        'difficulty': _DIFFICULTY[kind],
+        'expected_lines': _metrics.for_code(reference)['statements'],
+        'time_limit': 120 + 10 * size,
+        'points': _BASE_POINTS[kind] + size,
+        'setup_code': setup_code,
+        'solution_check': f"len(members) == {size} and _matches_target(members)",
+        'target': {'members': 'members', 'positions': spots},
+        'reference': reference,
+        'band_size': BAND_SIZE,
+        'seed': seed,
+    }
+
+
+def validate_challenge(challenge: Dict, grader: Optional[ChallengeGrader] = None):
+    """Grade a challenge's reference solution.
+    
+    Raises:
+        ValueError: If the reference doesn't solve the challenge
+    """
+    grader = grader or ChallengeGrader()
+    verdict = grader.grade(challenge, challenge['reference'])
+    if not verdict['success']:
+        raise ValueError(f"the reference solution for {challenge['date']} fails: {verdict['message']}")
+
+
+class DailyChallenges:
+    """Daily challenges, generated and checked a term at a time."""
+    
+    def __init__(self, path: Optional[str] = DAILY_CHALLENGES_PATH,
+                 grader: Optional[ChallengeGrader] = None):
+        """Create the calendar; nothing is read or generated until needed.
+        
+        Args:
+            path: JSON file terms are saved to, or None to keep them in
+                memory only
+            grader: Grader the reference solutions are checked with
+        """
+        self.path = path
+        self.grader = grader
+        # ISO date -> challenge
+        self.challenges: Dict[str, Dict] = {}
+        self._loaded = False
+        
+    def get(self, day: Optional[datetime.date] = None) -> Dict:
+        """Get a day's challenge, building its term if it isn't saved.
+        
+        Args:
+            day: Date; today by default
+        
+        Returns:
+            The challenge dictionary (shared; copy it before changing it)
+        """
+        day = day or datetime.date.today()
+        key = day.isoformat()
+        if key not in self.challenges and not self._loaded:
+            self.load()
+        if key not in self.challenges:
+            self.build_term(term_start(day))
+        return self.challenges[key]
+        
+    def build_term(self, start: datetime.date, days: int = TERM_DAYS) -> Dict[str, Dict]:
+        """Generate, check and save the challenges for a run of days.
+        
+        Args:
+            start: First day
+            days: Number of days
+        
+        Returns:
+            The new challenges by ISO date
+        
+        Raises:
+            ValueError: If a reference solution fails
+        """
+        grader = self.grader or ChallengeGrader()
+        term = {}
+        for offset in range(days):
+            challenge = generate_challenge(start + datetime.timedelta(days=offset))
+            validate_challenge(challenge, grader)
+            term[challenge['date']] = challenge
+        # Only one term is kept
+        self.challenges = term
+        self.save()
+        return term
+        
+    def load(self):
+        """Read the saved term, if there is one from this generator."""
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return
+        if payload.get('version') == GENERATOR_VERSION:
+            self.challenges = payload.get('challenges', {})
+        
+    def save(self):
+        """Write the current term to the JSON file."""
+        if not self.path:
+            return
+        payload = {'version': GENERATOR_VERSION, 'challenges': self.challenges}
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f)
+        except OSError:
+            # A read-only install just generates the term again next time
+            pass
@@ -0,0 +1,163 @@
+"""
+Drill - Sets and counts for playing back a marching show.
+
+This module turns the formations a student's program produces into a
+drill: an ordered list of sets, each reached over a number of counts.
+Positions between sets are interpolated linearly, just like marchers
+taking even-sized steps from one dot to the next.
+"""
+
+from bisect import bisect_right
+from typing import List, Tuple, Dict, Optional
+from config import TICKS_PER_COUNT
+
+
+class Drill:
+    """A marching show as a sequence of sets and the counts between them."""
+    
+    def __init__(self, sets: List[Tuple[int, List[Tuple[float, float]]]],
+                 sections: Optional[List[str]] = None, facings: Optional[List[float]] = None):
+        """Create a drill.
+        
+        Args:
+            sets: List of (counts, positions) tuples. The first set is the
+                opening formation and its count value is ignored.
+            sections: Section name of each member (for colors)
+            facings: Facing direction of each member in degrees
+        """
+        if not sets:
+            raise ValueError("A drill needs at least one set")
+        
+        self.sets = [list(positions) for _, positions in sets]
+        self.size = len(self.sets[0])
+        self.sections = list(sections) if sections else ['brass'] * self.size
+        self.facings = list(facings) if facings else [0] * self.size
+        
+        # Count at which each set is reached
+        self.set_counts = [0]
+        for counts, _ in sets[1:]:
+            self.set_counts.append(self.set_counts[-1] + max(1, int(counts)))
+        
+    @property
+    def total_counts(self) -> int:
+        """Total number of counts in the drill."""
+        return self.set_counts[-1]
+        
+    def frame_count(self, frames_per_count: int) -> int:
+        """Number of frames needed to play the drill, both end sets included.
+        
+        Args:
+            frames_per_count: Frames rendered per count
+        """
+        return self.total_counts * frames_per_count + 1
+        
+    def positions_at(self, count: float) -> List[Tuple[float, float]]:
+        """Get every member's position at a (possibly fractional) count.
+        
+        Args:
+            count: Count in the show (0 to total_counts)
+        
+        Returns:
+            List of (x, y) positions in yards
+        """
+        if count <= 0 or len(self.sets) == 1:
+            return list(self.sets[0])
+        if count >= self.total_counts:
+            return list(self.sets[-1])
+        
+        index = bisect_right(self.set_counts, count) - 1
+        start_count = self.set_counts[index]
+        t = (count - start_count) / (self.set_counts[index + 1] - start_count)
+        start, end = self.sets[index], self.sets[index + 1]
+        return [
+            (x0 + (x1 - x0) * t, y0 + (y1 - y0) * t)
+            for (x0, y0), (x1, y1) in zip(start, end)
+        ]
+        
+    @classmethod
+    def from_band(cls, band_api, counts: int = 8) -> 'Drill':
+        """Build a drill from the sets recorded by a BandAPI.
+        
+        The band's current formation is appended as the final set if it
+        differs from the last recorded one.
+        
+        Args:
+            band_api: BandAPI the student's program ran against
+            counts: Counts used to reach the final formation
+        """
+        sets = list(band_api.drill_sets)
+        current = band_api.get_positions()
+        if not sets:
+            sets = [(0, current)]
+        elif sets[-1][1] != current:
+            sets.append((counts, current))
+        members = band_api.get_all_members()
+        return cls(sets, [m.section for m in members], [m.facing for m in members])
+        
+    @classmethod
+    def from_formations(cls, formations: List[Dict], counts: int = 8) -> 'Drill':
+        """Build a drill from saved sandbox formations.
+        
+        Args:
+            formations: Formations as saved by SandboxMode.save_formation
+            counts: Counts between consecutive formations
+        """
+        sets = []
+        for formation in formations:
+            ordered = sorted(formation['members'], key=lambda m: m['id'])
+            sets.append((counts, [(m['x'], m['y']) for m in ordered]))
+        first = sorted(formations[0]['members'], key=lambda m: m['id']) if formations else []
+        return cls(sets, [m['section'] for m in first])
+
+
+class DrillPlayback:
+    """Plays a drill back in fixed simulation ticks.
+    
+    The playback position is an integer tick count, so every machine
+    computes exactly the same positions for the same tick. Rendering
+    interpolates between the previous and current tick positions.
+    """
+    
+    def __init__(self, drill: Drill, ticks_per_count: int = TICKS_PER_COUNT):
+        """Start playback at the opening set.
+        
+        Args:
+            drill: Drill to play
+            ticks_per_count: Simulation ticks per count
+        """
+        self.drill = drill
+        self.ticks_per_count = max(1, int(ticks_per_count))
+        self.tick_count = 0
+        self.total_ticks = drill.total_counts * self.ticks_per_count
+        self.positions = drill.positions_at(0)
+        self.previous = self.positions
+        
+    @property
+    def finished(self) -> bool:
+        """Whether playback has reached the final set."""
+        return self.tick_count >= self.total_ticks
+        
+    def tick(self) -> List[Tuple[float, float]]:
+        """Advance playback by one tick.
+        
+        Returns:
+            Positions at the new tick
+        """
+        self.previous = self.positions
+        if not self.finished:
+            self.tick_count += 1
+            self.positions = self.drill.positions_at(self.tick_count / self.ticks_per_count)
+        return self.positions
+        
+    def interpolated(self, alpha: float) -> List[Tuple[float, float]]:
+        """Get positions between the last two ticks for rendering.
+        
+        Args:
+            alpha: Fraction of a tick elapsed since the last tick (0-1)
+        """
+        if alpha <= 0 or self.previous is self.positions:
+            return self.previous
+        return [
+            (x0 + (x1 - x0) * alpha, y0 + (y1 - y0) * alpha)
+            for (x0, y0), (x1, y1) in zip(self.previous, self.positions)
+        ]
@@ -0,0 +1,307 @@
+"""
+Formations - Recognize lines, circles and blocks from member positions.
+
+Each recognizer fits one shape to a list of (x, y) positions in yards in
+closed form, with a fixed number of passes over the positions and no
+neighbour search, so checking a formation costs O(n) (the block fit
+also sorts the distinct row and column buckets, which are few for
+anything block-like):
+
+- fit_line: total least squares, the line through the centroid along
+  the principal axis; the error is the RMS distance to that line.
+- fit_circle: algebraic (Kasa) circle fit; the error is the standard
+  deviation of the members' distances from the fitted center.
+- fit_block: lattice fit; rows and columns are counted from occupied
+  position buckets, then a least-squares spacing and origin is fitted
+  per axis and the error is the RMS distance to the lattice nodes.
+
+Every fit returns a dictionary with 'shape', 'ok' (error within
+tolerance), 'score' (1.0 for a perfect fit, 0.5 at the tolerance),
+'error' and 'tolerance' in yards, a 'reason' when the fit failed, and
+the fitted parameters.
+"""
+
+import cmath
+import math
+from collections import Counter
+from itertools import accumulate, repeat
+from operator import mul, sub
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+Point = Tuple[float, float]
+
+# Allowed RMS error of a formation, in yards
+TOLERANCE = 0.5
+
+
+def positions(members: Iterable) -> List[Point]:
+    """Get the positions of band members as (x, y) tuples."""
+    return [(m.x, m.y) for m in members]
+
+
+def _score(error: float, tolerance: float) -> float:
+    """Map an error to a score: 1.0 when exact, 0.5 at the tolerance."""
+    return tolerance / (tolerance + error)
+
+
+def _result(shape: str, error: float, tolerance: float, **params) -> Dict:
+    """Build a fit result for a shape that could be fitted."""
+    ok = error <= tolerance
+    reason = None if ok else f"members are off the {shape} by {error:.1f} yards"
+    return dict(params, shape=shape, ok=ok, score=_score(error, tolerance),
+                error=error, tolerance=tolerance, reason=reason)
+
+
+def _no_fit(shape: str, tolerance: float, reason: str) -> Dict:
+    """Build a fit result for positions that can't form the shape at all."""
+    return {'shape': shape, 'ok': False, 'score': 0.0, 'error': math.inf,
+            'tolerance': tolerance, 'reason': reason}
+
+
+def _moments(points: Sequence[Point]):
+    """Centroid and centered second moments (sxx, syy, sxy) of the points."""
+    n = len(points)
+    xs, ys = zip(*points)
+    mx = sum(xs) / n
+    my = sum(ys) / n
+    dx = list(map((-mx).__add__, xs))
+    dy = list(map((-my).__add__, ys))
+    return mx, my, sum(map(mul, dx, dx)), sum(map(mul, dy, dy)), sum(map(mul, dx, dy))
+
+
+def fit_line(points: Sequence[Point], tolerance: float = TOLERANCE) -> Dict:
+    """Fit a straight line by total least squares.
+    
+    Args:
+        points: Member positions in yards
+        tolerance: Allowed RMS distance from the line in yards
+    
+    Returns:
+        Fit result; also 'center' (a point on the line) and 'angle' (its
+        direction in degrees, in [0, 180))
+    """
+    n = len(points)
+    if n < 2:
+        return _no_fit('line', tolerance, "a line needs at least 2 members")
+    mx, my, sxx, syy, sxy = _moments(points)
+    # Eigenvalues of the scatter matrix: spread along and across the line
+    half_trace = (sxx + syy) / 2
+    root = math.hypot((sxx - syy) / 2, sxy)
+    along, across = half_trace + root, max(0.0, half_trace - root)
+    if along / n < tolerance * tolerance:
+        return _no_fit('line', tolerance, "members are all on the same spot")
+    angle = math.degrees(0.5 * math.atan2(2 * sxy, sxx - syy)) % 180
+    return _result('line', math.sqrt(across / n), tolerance, center=(mx, my), angle=angle)
+
+
+def fit_circle(points: Sequence[Point], tolerance: float = TOLERANCE) -> Dict:
+    """Fit a circle algebraically and measure how much the radius varies.
+    
+    The members must go around the circle: positions bunched on one arc
+    (centroid more than half a radius from the center) are rejected.
+    
+    Args:
+        points: Member positions in yards
+        tolerance: Allowed standard deviation of the radius in yards
+    
+    Returns:
+        Fit result; also 'center' and 'radius'
+    """
+    n = len(points)
+    if n < 3:
+        return _no_fit('circle', tolerance, "a circle needs at least 3 members")
+    # Centered coordinates keep the normal equations well conditioned
+    xs, ys = zip(*points)
+    mx = sum(xs) / n
+    my = sum(ys) / n
+    u = list(map((-mx).__add__, xs))
+    v = list(map((-my).__add__, ys))
+    uu = list(map(mul, u, u))
+    vv = list(map(mul, v, v))
+    suu = sum(uu)
+    svv = sum(vv)
+    suv = sum(map(mul, u, v))
+    suuu = sum(map(mul, uu, u))
+    svvv = sum(map(mul, vv, v))
+    suvv = sum(map(mul, u, vv))
+    svuu = sum(map(mul, v, uu))
+    det = suu * svv - suv * suv
+    if det <= 1e-12 * (suu + svv) ** 2 or suu + svv == 0:
+        return _no_fit('circle', tolerance, "members are in a straight line")
+    bu = (suuu + suvv) / 2
+    bv = (svvv + svuu) / 2
+    uc = (bu * svv - bv * suv) / det
+    vc = (bv * suu - bu * suv) / det
+    
+    # Spread of the distances from the fitted center
+    d = list(map(math.hypot, map((-uc).__add__, u), map((-vc).__add__, v)))
+    radius = sum(d) / n
+    error = math.sqrt(max(0.0, sum(map(mul, d, d)) / n - radius * radius))
+    if math.hypot(uc, vc) > radius / 2:
+        return _no_fit('circle', tolerance, "members only cover part of the circle")
+    return _result('circle', error, tolerance, center=(mx + uc, my + vc), radius=radius)
+
+
+def _groups(values: Sequence[float], tolerance: float):
+    """Split the coordinates along one axis into groups (rows or columns).
+    
+    A group is a run of adjacent occupied tolerance-sized buckets, so
+    groups closer than a few tolerances apart merge.
+    
+    Returns:
+        (number of groups, group index of each value)
+    """
+    keys = list(map(round, map((1.0 / tolerance).__mul__, values)))
+    buckets = sorted(set(keys))
+    # A gap of more than one bucket starts a new group
+    starts = list(map((1).__lt__, map(sub, buckets[1:], buckets[:-1])))
+    count = sum(starts) + 1
+    if count < 2:
+        return count, None
+    group_of = dict(zip(buckets, accumulate(starts, initial=0)))
+    return count, list(map(group_of.__getitem__, keys))
+
+
+def _axis_residual(values: Sequence[float], indices: List[int]):
+    """Least-squares spacing of groups along one axis.
+    
+    Returns:
+        (spacing, sum of squared distances from the fitted group positions)
+    """
+    n = len(values)
+    si = sum(indices)
+    sv = sum(values)
+    var_i = sum(map(mul, indices, indices)) - si * si / n
+    cov = sum(map(mul, indices, values)) - si * sv / n
+    var_v = sum(map(mul, values, values)) - sv * sv / n
+    spacing = cov / var_i
+    return spacing, max(0.0, var_v - cov * spacing)
+
+
+def _filled(indices: List[int], size: int, groups: int) -> bool:
+    """Whether every group but the first or last has `size` members."""
+    short = [g for g, count in Counter(indices).items() if count != size]
+    return not short or (len(short) == 1 and short[0] in (0, groups - 1))
+
+
+def _fit_lattice(points: Sequence[Point], angle: float, tolerance: float) -> Dict:
+    """Fit a rectangular lattice whose rows run at the given angle (degrees)."""
+    if angle:
+        c = math.cos(math.radians(angle))
+        s = math.sin(math.radians(angle))
+        us = [x * c + y * s for x, y in points]
+        vs = [y * c - x * s for x, y in points]
+    else:
+        us, vs = zip(*points)
+    n = len(points)
+    cols, iu = _groups(us, tolerance)
+    rows, iv = _groups(vs, tolerance) if cols > 1 else (1, None)
+    if rows < 2 or cols < 2:
+        return _no_fit('block', tolerance, "a block needs at least 2 rows and 2 columns")
+    if rows * cols - n >= max(rows, cols) or len(set(zip(iu, iv))) != n:
+        return _no_fit('block', tolerance, "the block has gaps or members share a spot")
+    # Only the first or last row (or column) may be partly filled
+    if not (_filled(iv, cols, rows) or _filled(iu, rows, cols)):
+        return _no_fit('block', tolerance, "the block has gaps")
+    col_spacing, res_u = _axis_residual(us, iu)
+    row_spacing, res_v = _axis_residual(vs, iv)
+    return _result('block', math.sqrt((res_u + res_v) / n), tolerance, rows=rows, cols=cols,
+                   spacing=(abs(col_spacing), abs(row_spacing)), angle=angle)
+
+
+def _step_angle(points: Sequence[Point]) -> Optional[float]:
+    """Estimate the row direction (degrees, mod 90) from the steps between
+    consecutive members.
+    
+    Formations are usually built row by row, so most steps run along a
+    row or column; folding angles mod 90 (by averaging 4 * angle) makes
+    both count the same, and weighting by 1 / length squared keeps the
+    long jumps between rows from pulling the estimate.
+    
+    Returns:
+        The angle, or None if the steps don't agree on a direction
+    """
+    xs, ys = zip(*points)
+    # Non-zero steps as complex numbers z
+    steps = list(filter(None, map(complex, map(sub, xs[1:], xs[:-1]), map(sub, ys[1:], ys[:-1]))))
+    if not steps:
+        return None
+    # z / conj(z)**3 = z**4 / |z|**6: direction 4 * angle, length 1 / |z|**2
+    folded = list(map(mul, steps, map(pow, map(complex.conjugate, steps), repeat(-3))))
+    total = sum(folded)
+    if abs(total) < sum(map(abs, folded)) / 2:
+        return None
+    return math.degrees(cmath.phase(total) / 4) % 90
+
+
+def fit_block(points: Sequence[Point], tolerance: float = TOLERANCE) -> Dict:
+    """Fit a rectangular block: evenly spaced rows and columns.
+    
+    Blocks are first fitted square to the field; if that fails, along the
+    direction of the steps between consecutive members or else the
+    principal axis of the positions, which finds turned blocks that were
+    built row by row or are full rectangles. Rows and columns must be
+    more than about three tolerances apart.
+    
+    Args:
+        points: Member positions in yards
+        tolerance: Allowed RMS distance from the lattice nodes in yards
+    
+    Returns:
+        Fit result; also 'rows', 'cols', 'spacing' (column and row
+        spacing) and 'angle' (direction of the rows in degrees)
+    """
+    if len(points) < 4:
+        return _no_fit('block', tolerance, "a block needs at least 4 members")
+    result = _fit_lattice(points, 0.0, tolerance)
+    if result['ok']:
+        return result
+    # One more try along the direction the members were placed in, or
+    # else the principal axis
+    angle = _step_angle(points)
+    if angle is None:
+        _, _, sxx, syy, sxy = _moments(points)
+        angle = math.degrees(0.5 * math.atan2(2 * sxy, sxx - syy)) % 90
+    if min(angle, 90 - angle) < 0.5:
+        return result
+    turned = _fit_lattice(points, angle, tolerance)
+    return turned if turned['score'] > result['score'] else result
+
+
+RECOGNIZERS = {'line': fit_line, 'circle': fit_circle, 'block': fit_block}
+
+
+def recognize(points: Sequence[Point], tolerance: float = TOLERANCE) -> Optional[Dict]:
+    """Find the formation that fits the positions best.
+    
+    Args:
+        points: Member positions in yards
+        tolerance: Allowed error in yards
+    
+    Returns:
+        The best fit result that is within tolerance, or None
+    """
+    best = None
+    for fit in RECOGNIZERS.values():
+        result = fit(points, tolerance)
+        if result['ok'] and (best is None or result['score'] > best['score']):
+            best = result
+    return best
+
+
+def is_complex_pattern(members) -> bool:
+    """Check if members form a pattern made of several formations.
+    
+    Members are grouped by instrument; every group must form a line,
+    circle or block of its own, while the band as a whole must not be
+    just one simple formation.
+    
+    Args:
+        members: Band members
+    """
+    groups: Dict[str, List] = {}
+    for member in members:
+        groups.setdefault(member.instrument, []).append(member)
+    if len(groups) < 2 or recognize(positions(members)) is not None:
+        return False
+    return all(recognize(positions(group)) is not None for group in groups.values())
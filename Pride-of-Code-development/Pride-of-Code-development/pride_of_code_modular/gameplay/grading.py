@@ -0,0 +1,167 @@
+"""
+Grading - Run challenge submissions and check the band they leave behind.
+
+A submission is graded by running the challenge's setup code and the
+student's code through the CodeExecutor (restricted builtins, time
+limit), then evaluating the challenge's solution check against the
+resulting namespace. Formation checks in solution checks use the
+closed-form recognizers from the formations module, and their fit
+results are returned so a failed check can say what was off.
+
+Running student code is deterministic (its `random` is seeded from the
+challenge), so verdicts are cached by challenge id and a hash of the
+code's syntax tree: a re-submission, or another student's solution that
+differs only in comments and spacing, is graded without running it
+again.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from gameplay.code_executor import CodeExecutor
+from gameplay.code_metrics import MetricsCache, parse
+from gameplay.formations import TOLERANCE, fit_line, fit_circle, fit_block, is_complex_pattern, positions
+from gameplay.similarity import compare
+
+# Seconds a submission may run before it fails
+GRADE_TIMEOUT = 2.0
+
+# Verdicts kept in the cache
+MAX_CACHED_VERDICTS = 4096
+
+# Band size and random seed of challenges that don't set their own
+DEFAULT_BAND_SIZE = 16
+DEFAULT_SEED = 0
+
+
+def _formation_checks(fits: List[Dict], target: Optional[Dict] = None) -> Dict[str, Callable]:
+    """Formation helpers for solution checks, recording every fit they make."""
+    def check(fit):
+        def helper(members) -> bool:
+            result = fit(positions(members))
+            fits.append(result)
+            return result['ok']
+        return helper
+    
+    def matches_target(members) -> bool:
+        # Every member within tolerance of its own spot of the target
+        if not target:
+            return False
+        result = compare(list(members), target['positions'], align=target.get('align', False),
+                         scale=target.get('scale', False))
+        return result['ok'] and result['max_error'] <= TOLERANCE
+    
+    return {
+        '_is_line_formation': check(fit_line),
+        '_is_circle_formation': check(fit_circle),
+        '_is_block_formation': check(fit_block),
+        '_is_complex_pattern': is_complex_pattern,
+        '_matches_target': matches_target,
+    }
+
+
+class ChallengeGrader:
+    """Grades challenge submissions by running them, with a verdict cache."""
+    
+    def __init__(self, executor: Optional[CodeExecutor] = None, timeout: float = GRADE_TIMEOUT,
+                 max_cached: int = MAX_CACHED_VERDICTS):
+        """Create a grader.
+        
+        Args:
+            executor: Executor submissions run in; a new one by default
+            timeout: Seconds a submission may run
+            max_cached: Verdicts kept, least recently used dropped first
+        """
+        self.executor = executor or CodeExecutor()
+        self.timeout = timeout
+        self.max_cached = max_cached
+        self._verdicts: 'OrderedDict[Tuple[object, str], Dict]' = OrderedDict()
+        self.metrics = MetricsCache(max_cached)
+        self.cache_hits = 0
+        
+    def grade(self, challenge: Dict, code: str) -> Dict:
+        """Grade a submission for a challenge.
+        
+        Args:
+            challenge: Challenge dictionary with 'id', 'setup_code',
+                'solution_check' (an expression over the code's globals)
+                and optionally 'target': 'members' (an expression),
+                'positions', 'align' and 'scale'; solution checks may
+                call _matches_target(members) to compare with it. Also
+                optionally 'band_size' and 'seed' (of the code's random)
+            code: Student code
+        
+        Returns:
+            Verdict dictionary with 'success', 'message', 'score' (the
+            lowest formation fit score, or 1.0 / 0.0 without formation
+            checks), 'fits' (formation fit results), 'output' and
+            'similarity' (comparison with the challenge's 'target', if
+            it has one; see gameplay.similarity.compare) and 'metrics'
+            (see gameplay.code_metrics.measure; None if the code doesn't
+            parse), and 'band_size', 'seed' and 'positions' (where the
+            run left every member) to record the run with
+        """
+        # One parse gives both the cache key and the code metrics
+        tree, digest = parse(code)
+        key = (challenge['id'], digest)
+        verdict = self._verdicts.get(key)
+        if verdict is not None:
+            self._verdicts.move_to_end(key)
+            self.cache_hits += 1
+            return dict(verdict)
+        verdict = self._run(challenge, code)
+        verdict['metrics'] = self.metrics.get(tree, digest) if tree is not None else None
+        # A timeout depends on how busy the machine was; don't keep it
+        if not self.executor.timed_out:
+            self._verdicts[key] = verdict
+            if len(self._verdicts) > self.max_cached:
+                self._verdicts.popitem(last=False)
+        return dict(verdict)
+        
+    def clear(self):
+        """Forget every cached verdict (e.g. after a challenge changed)."""
+        self._verdicts.clear()
+        
+    def _run(self, challenge: Dict, code: str) -> Dict:
+        """Run a submission and evaluate the challenge's solution check."""
+        run = {'band_size': challenge.get('band_size', DEFAULT_BAND_SIZE),
+               'seed': challenge.get('seed', DEFAULT_SEED)}
+        success, output = self.executor.execute(code, run['band_size'], timeout=self.timeout,
+                                                setup_code=challenge.get('setup_code', ''),
+                                                seed=run['seed'])
+        run['positions'] = self.executor.band_api.get_positions()
+        if not success:
+            return dict(run, success=False, message=output.split('\n', 1)[0], score=0.0,
+                        fits=[], output=output, similarity=None)
+        
+        fits: List[Dict] = []
+        namespace = dict(self.executor.namespace)
+        namespace.update(_formation_checks(fits, challenge.get('target')))
+        try:
+            passed = bool(eval(challenge['solution_check'], namespace))
+        except Exception as e:
+            return dict(run, success=False, message=f"Your code left the band in an unexpected state ({e})",
+                        score=0.0, fits=fits, output=output, similarity=None)
+        
+        if passed:
+            message = 'Challenge completed!'
+        else:
+            failed = [f for f in fits if not f['ok']]
+            message = f"Solution incorrect: {failed[0]['reason']}" if failed else 'Solution incorrect'
+        if fits:
+            score = min(f['score'] for f in fits)
+        else:
+            score = 1.0 if passed else 0.0
+        return dict(run, success=passed, message=message, score=score, fits=fits, output=output,
+                    similarity=self._similarity(challenge.get('target'), namespace))
+        
+    def _similarity(self, target: Optional[Dict], namespace: Dict) -> Optional[Dict]:
+        """Compare the members a challenge targets with their target spots."""
+        if not target:
+            return None
+        try:
+            members = list(eval(target['members'], namespace))
+        except Exception:
+            return None
+        return compare(members, target['positions'], align=target.get('align', False),
+                       scale=target.get('scale', False))
@@ -0,0 +1,170 @@
+"""
+Leaderboard - Persistent challenge leaderboard on SQLite.
+
+Entries live in one table with a B-tree index per kind of board: the
+overall board, one per challenge and one per day. Each index is ordered
+by score, so inserting an entry and reading the top k cost O(log n) (plus
+k), however many entries the school has. A player's rank counts the
+entries ahead of their best score along the same index.
+
+Writes are buffered and committed together in one transaction, when the
+buffer is full, before any read, and on flush() or close(); a crash can
+lose at most the last BATCH_SIZE entries. The database is opened on
+first use, so creating a store is free.
+"""
+
+import datetime
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+# Buffered entries written per transaction
+BATCH_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    score REAL NOT NULL,
+    challenge_id INTEGER,
+    date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_by_score ON entries (score DESC, id);
+CREATE INDEX IF NOT EXISTS entries_by_challenge ON entries (challenge_id, score DESC, id);
+CREATE INDEX IF NOT EXISTS entries_by_date ON entries (date, score DESC, id);
+CREATE INDEX IF NOT EXISTS entries_by_name ON entries (name, challenge_id, date, score);
+"""
+
+
+class LeaderboardStore:
+    """Leaderboard entries in a SQLite database, with batched writes."""
+    
+    def __init__(self, path: str = ':memory:', batch_size: int = BATCH_SIZE):
+        """Create a store.
+        
+        Args:
+            path: Database file, created if missing; ':memory:' keeps
+                entries for this session only
+            batch_size: Entries buffered before they are written
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self._db: Optional[sqlite3.Connection] = None
+        self._pending: List[Tuple[str, float, Optional[int], str]] = []
+        
+    @property
+    def db(self) -> sqlite3.Connection:
+        """The database connection, opened (and set up) on first use."""
+        if self._db is None:
+            self._db = sqlite3.connect(self.path)
+            if self.path != ':memory:':
+                # Readers don't block the writer, and commits skip the
+                # extra fsync of the rollback journal
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+        return self._db
+        
+    def add(self, name: str, score: float, challenge_id: Optional[int] = None,
+            date: Optional[str] = None):
+        """Add an entry; it is written with the next batch.
+        
+        Args:
+            name: Player name
+            score: Score achieved
+            challenge_id: Challenge the score is for, or None for none
+            date: ISO date of the entry; today by default
+        """
+        date = date or datetime.date.today().isoformat()
+        self._pending.append((name, float(score), challenge_id, date))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        
+    def flush(self):
+        """Write buffered entries in one transaction."""
+        if not self._pending:
+            return
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO entries (name, score, challenge_id, date) VALUES (?, ?, ?, ?)",
+                self._pending)
+        self._pending.clear()
+        
+    def _where(self, challenge_id: Optional[int], date: Optional[str]) -> Tuple[str, list]:
+        """SQL condition and parameters selecting one board."""
+        terms = []
+        params = []
+        if challenge_id is not None:
+            terms.append("challenge_id = ?")
+            params.append(challenge_id)
+        if date is not None:
+            terms.append("date = ?")
+            params.append(date)
+        return (" WHERE " + " AND ".join(terms) if terms else ""), params
+        
+    def top(self, limit: int = 10, challenge_id: Optional[int] = None,
+            date: Optional[str] = None) -> List[Dict]:
+        """Get the best entries of a board.
+        
+        Args:
+            limit: Number of entries
+            challenge_id: Only this challenge's entries
+            date: Only entries from this ISO date
+        
+        Returns:
+            Entries with 'name', 'score', 'challenge_id' and 'date', best
+            first; equal scores in the order they were added
+        """
+        self.flush()
+        where, params = self._where(challenge_id, date)
+        rows = self.db.execute(
+            f"SELECT name, score, challenge_id, date FROM entries{where} "
+            "ORDER BY score DESC, id LIMIT ?", params + [limit])
+        return [{'name': name, 'score': score, 'challenge_id': cid, 'date': day}
+                for name, score, cid, day in rows]
+        
+    def best(self, name: str, challenge_id: Optional[int] = None,
+             date: Optional[str] = None) -> Optional[float]:
+        """Get a player's best score on a board, or None if they have none."""
+        self.flush()
+        where, params = self._where(challenge_id, date)
+        where = (where + " AND" if where else " WHERE") + " name = ?"
+        row = self.db.execute(f"SELECT MAX(score) FROM entries{where}", params + [name]).fetchone()
+        return row[0]
+        
+    def rank(self, name: str, challenge_id: Optional[int] = None,
+             date: Optional[str] = None) -> Optional[int]:
+        """Get a player's place on a board (1 for the top).
+        
+        Ranked by the player's best score; entries that tie with it don't
+        count as ahead.
+        
+        Returns:
+            The rank, or None if the player has no entry on the board
+        """
+        best = self.best(name, challenge_id, date)
+        if best is None:
+            return None
+        where, params = self._where(challenge_id, date)
+        where = (where + " AND" if where else " WHERE") + " score > ?"
+        ahead = self.db.execute(f"SELECT COUNT(*) FROM entries{where}", params + [best]).fetchone()[0]
+        return ahead + 1
+        
+    def count(self, challenge_id: Optional[int] = None, date: Optional[str] = None) -> int:
+        """Get the number of entries on a board."""
+        self.flush()
+        where, params = self._where(challenge_id, date)
+        return self.db.execute(f"SELECT COUNT(*) FROM entries{where}", params).fetchone()[0]
+        
+    def clear(self):
+        """Delete every entry."""
+        self._pending.clear()
+        with self.db:
+            self.db.execute("DELETE FROM entries")
+        
+    def close(self):
+        """Write buffered entries and close the database."""
+        if self._db is None and not self._pending:
+            return
+        self.flush()
+        self._db.close()
+        self._db = None
@@ -1,22 +1,121 @@
-from typing import Dict, Any
-from .validators import BaseValidator, Week1Validator
+import json, os
+from typing import Dict, Any, List, Optional
+from config import LEVELS_DIR, LEVEL_INDEX_PATH
+from .validators import BaseValidator, compile_validator
+
+# bump when the index layout changes; older index files are rebuilt
+INDEX_VERSION = 1
+
+# level fields kept in the index, enough for menus without opening files
+INDEX_FIELDS = ('id', 'title', 'week', 'order', 'description')
 
 class LevelManager:
-    def __init__(self):
-        # simple registry mapping level id to validator and metadata
+    def __init__(self, levels_dir: str = LEVELS_DIR, index_path: Optional[str] = LEVEL_INDEX_PATH):
+        # registry mapping level id to metadata; levels come from the json
+        # files in levels_dir and are only parsed and compiled when first used
         self.levels: Dict[str, Dict[str, Any]] = {}
-        self.register('week1', {'title':'Week 1 - Lists', 'validator': Week1Validator()})
+        self.levels_dir = levels_dir
+        self.index_path = index_path
+        self.load_index()
 
     def register(self, id, meta):
         self.levels[id] = meta
 
+    def load_index(self):
+        # the index caches each file's metadata by size and mtime, so a warm
+        # start costs one directory scan and one small json read
+        if not os.path.isdir(self.levels_dir):
+            return
+        cached = self._read_index()
+        files = {}
+        changed = False
+        with os.scandir(self.levels_dir) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                if not entry.name.endswith('.json') or not entry.is_file():
+                    continue
+                st = entry.stat()
+                record = cached.get(entry.name)
+                if not record or record['mtime_ns'] != st.st_mtime_ns or record['size'] != st.st_size:
+                    spec = self._read_level(entry.path)
+                    if spec is None:
+                        continue
+                    record = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size,
+                              'level': {k: spec[k] for k in INDEX_FIELDS if k in spec}}
+                    changed = True
+                files[entry.name] = record
+                meta = dict(record['level'], path=entry.path)
+                self.register(meta['id'], meta)
+        if changed or files.keys() != cached.keys():
+            self._write_index(files)
+
+    def _read_index(self) -> Dict[str, Any]:
+        if not self.index_path or not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if payload.get('_version') != INDEX_VERSION or payload.get('dir') != os.path.abspath(self.levels_dir):
+            return {}
+        return payload.get('files', {})
+
+    def _write_index(self, files: Dict[str, Any]):
+        if not self.index_path:
+            return
+        payload = {'_version': INDEX_VERSION, 'dir': os.path.abspath(self.levels_dir), 'files': files}
+        try:
+            with open(self.index_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f)
+        except OSError:
+            # a read-only install just rebuilds the index next time
+            pass
+
+    def _read_level(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                spec = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f'Skipping level file {path}: {e}')
+            return None
+        if not isinstance(spec, dict) or 'id' not in spec:
+            print(f'Skipping level file {path}: no level id')
+            return None
+        return spec
+
+    def _compile(self, meta: Dict[str, Any]):
+        # parse the level file and compile its checks, once
+        spec = self._read_level(meta['path'])
+        if spec is None:
+            meta['validator'] = None
+            meta['error'] = 'the level file could not be read'
+            return
+        try:
+            meta['validator'] = compile_validator(spec)
+        except (KeyError, TypeError, ValueError, SyntaxError) as e:
+            meta['validator'] = None
+            meta['error'] = f'{type(e).__name__}: {e}'
+        for key, value in spec.items():
+            meta.setdefault(key, value)
+
     def get_level(self, id):
-        return self.levels.get(id)
+        meta = self.levels.get(id)
+        if meta is not None and 'path' in meta and 'validator' not in meta:
+            self._compile(meta)
+        return meta
+
+    def list_levels(self) -> List[Dict[str, Any]]:
+        # levels in play order, from the index alone
+        return sorted(self.levels.values(),
+                      key=lambda m: (m.get('week', 0), m.get('order', 0), m.get('id', '')))
 
     def validate(self, id, code_globals):
+        # code_globals: the namespace the executor ran the student's code in
         meta = self.get_level(id)
         if not meta:
             return False, 'Unknown level'
+        if meta.get('error'):
+            return False, f'This level could not be loaded ({meta["error"]})'
         validator: BaseValidator = meta.get('validator')
         if not validator:
             return False, 'No validator'
@@ -0,0 +1,209 @@
+"""
+Run Records - Record graded runs so their scores can be re-verified.
+
+A graded run is fully determined by the code, the challenge it was
+graded for, the band size, the seed of the code's `random` and the
+executor version, so each run is recorded with those, a digest of where
+it left the band and the score it got. Re-running a record must give
+the same digest and score; anything else means the record was altered,
+or the executor or the Band API now behave differently (which the
+executor version tells apart).
+
+Records are appended to a JSON Lines file. verify_records() re-runs a
+batch of them in a process pool and reports the ones that don't match,
+for auditing leaderboards and catching Band API regressions.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from gameplay.code_executor import EXECUTOR_VERSION
+from gameplay.code_metrics import code_hash
+from gameplay.grading import ChallengeGrader
+
+# Challenge fields a record keeps, enough to grade the run again
+CHALLENGE_FIELDS = ('id', 'setup_code', 'solution_check', 'target')
+
+# Scores closer than this count as the same
+SCORE_TOLERANCE = 1e-9
+
+# Records sent to a pool worker per job
+RECORDS_PER_CHUNK = 16
+
+# Grader of a pool worker process; never set in the verifying process
+_worker_grader: Optional[ChallengeGrader] = None
+
+
+def positions_digest(points: Sequence[Tuple[float, float]]) -> str:
+    """Hash member positions, rounded to a millionth of a yard.
+    
+    Args:
+        points: (x, y) of every member in ID order
+    
+    Returns:
+        Hex SHA-256 digest
+    """
+    # Adding 0.0 turns a rounded -0.0 into 0.0
+    text = ';'.join(f"{round(x, 6) + 0.0:.6f},{round(y, 6) + 0.0:.6f}" for x, y in points)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def make_record(challenge: Dict, code: str, verdict: Dict, points: float = 0.0) -> Dict:
+    """Create the record of a graded run.
+    
+    Args:
+        challenge: Challenge the code was graded for
+        code: Student code
+        verdict: Result of ChallengeGrader.grade
+        points: Pride Points the run earned (not re-verified: they
+            include the time bonus)
+    
+    Returns:
+        Dictionary with 'code_hash', 'band_size', 'seed',
+        'executor_version', 'positions_digest', 'score' and 'success',
+        plus 'challenge_id', 'points', 'timestamp' and what re-running
+        it takes: 'code' and 'challenge'
+    """
+    return {
+        'challenge_id': challenge['id'],
+        'code_hash': code_hash(code),
+        'band_size': verdict['band_size'],
+        'seed': verdict['seed'],
+        'executor_version': EXECUTOR_VERSION,
+        'positions_digest': positions_digest(verdict['positions']),
+        'score': verdict['score'],
+        'success': verdict['success'],
+        'points': points,
+        'timestamp': time.time(),
+        'code': code,
+        'challenge': {key: challenge[key] for key in CHALLENGE_FIELDS if key in challenge},
+    }
+
+
+def verify_record(record: Dict, grader: Optional[ChallengeGrader] = None) -> Dict:
+    """Run a record again and compare the results.
+    
+    Args:
+        record: Record made by make_record
+        grader: Grader to run it with; one without a cache by default
+    
+    Returns:
+        Dictionary with 'ok', 'challenge_id', 'code_hash', 'mismatches'
+        (field -> (recorded, now)) and 'version_changed' (whether the
+        record comes from another executor version)
+    """
+    grader = grader or ChallengeGrader(max_cached=0)
+    challenge = dict(record['challenge'], band_size=record['band_size'], seed=record['seed'])
+    verdict = grader.grade(challenge, record['code'])
+    now = {
+        'code_hash': code_hash(record['code']),
+        'positions_digest': positions_digest(verdict['positions']),
+        'score': verdict['score'],
+        'success': verdict['success'],
+    }
+    mismatches = {}
+    for field, value in now.items():
+        recorded = record.get(field)
+        if field == 'score' and recorded is not None:
+            same = abs(recorded - value) <= SCORE_TOLERANCE
+        else:
+            same = recorded == value
+        if not same:
+            mismatches[field] = (recorded, value)
+    return {
+        'ok': not mismatches,
+        'challenge_id': record.get('challenge_id'),
+        'code_hash': record.get('code_hash'),
+        'mismatches': mismatches,
+        'version_changed': record.get('executor_version') != EXECUTOR_VERSION,
+    }
+
+
+def _init_worker():
+    """Create the grader of a pool worker process."""
+    global _worker_grader
+    _worker_grader = ChallengeGrader(max_cached=0)
+
+
+def _verify_in_worker(record: Dict) -> Dict:
+    """Verify one record in a pool worker."""
+    return verify_record(record, _worker_grader)
+
+
+def verify_records(records: Iterable[Dict], workers: Optional[int] = None) -> List[Dict]:
+    """Re-run records in parallel and compare each with what it recorded.
+    
+    Args:
+        records: Records made by make_record
+        workers: Number of worker processes (default: CPU count)
+    
+    Returns:
+        One verify_record result per record, in order
+    
+    With a single worker (or record) the records are run in the calling
+    process.
+    """
+    records = list(records)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(records)))
+    if workers == 1:
+        grader = ChallengeGrader(max_cached=0)
+        return [verify_record(record, grader) for record in records]
+    
+    # Spawned workers start clean instead of copying the caller's state
+    context = multiprocessing.get_context('spawn')
+    pool = context.Pool(workers, initializer=_init_worker)
+    try:
+        results = pool.map(_verify_in_worker, records, chunksize=RECORDS_PER_CHUNK)
+        # Let the workers exit on their own instead of terminating them
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return results
+
+
+class RunLog:
+    """Graded runs appended to a JSON Lines file."""
+    
+    def __init__(self, path: Optional[str] = None):
+        """Create a log.
+        
+        Args:
+            path: File records are appended to; None keeps only the
+                last record
+        """
+        self.path = path
+        self.last: Optional[Dict] = None
+        
+    def append(self, record: Dict):
+        """Add a record, writing it to the file straight away."""
+        self.last = record
+        if self.path:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+        
+    def read(self) -> Iterator[Dict]:
+        """Read the records in the file, oldest first."""
+        if self.path and os.path.exists(self.path):
+            yield from read_records(self.path)
+
+
+def read_records(path: str) -> Iterator[Dict]:
+    """Read the records of a run log, oldest first.
+    
+    Lines that can't be read (e.g. cut off by a crash) are skipped.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and 'code' in record and 'challenge' in record:
+                yield record
@@ -10,6 +10,7 @@ import random
 from typing import List, Dict, Optional
 from gameplay.band_api import BandAPI
 from gameplay.scoring import PridePoints
+from config import TICKS_PER_COUNT
 
 
 class SandboxMode:
@@ -37,6 +38,7 @@ class SandboxMode:
         # Animation
         self.animation_speed = 1.0
         self.animation_playing = False
+        self.animation_ticks = 0
         
         # Initialize band
         self.band_api.create_band(self.band_size)
@@ -262,18 +264,17 @@ class SandboxMode:
         """Toggle animation playback."""
         self.animation_playing = not self.animation_playing
         
-    def update(self, dt: float):
-        """Update sandbox state.
+    def tick(self):
+        """Advance the sandbox simulation by one fixed tick.
         
-        Args:
-            dt: Delta time in seconds
+        The walking animation is derived from the integer tick count, so
+        it plays back identically at any frame rate.
         """
         if self.animation_playing:
-            # Update animations
-            members = self.band_api.get_all_members()
-            for member in members:
-                # Update step phase for walking animation
-                member.step_phase = (member.step_phase + dt * 2 * self.animation_speed) % 1.0
+            self.animation_ticks += 1
+            phase = (self.animation_ticks * self.animation_speed / TICKS_PER_COUNT) % 1.0
+            for member in self.band_api.get_all_members():
+                member.step_phase = phase
                 
     def get_sandbox_state(self) -> Dict:
         """Get the current sandbox state.
@@ -305,6 +306,7 @@ class SandboxMode:
         self.paint_section = 'brass'
         self.animation_speed = 1.0
         self.animation_playing = False
+        self.animation_ticks = 0
         self.saved_formations.clear()
         self.current_formation = None
         self.band_api.create_band(self.band_size)
@@ -0,0 +1,180 @@
+"""
+Score Events - Typed scoring events and the ledger that records them.
+
+Every award of Pride Points is a ScoreEvent with an explicit
+ScoreCategory, so where points land never depends on how a reason was
+worded. The ScoreLedger keeps the most recent events in a fixed-size
+ring buffer and running totals per category, updated as each event is
+recorded, so breakdowns cost the same however long a student has played.
+Its version counter changes on every change, for views that cache what
+they draw.
+
+With a path, each event is also appended to a JSON Lines file for
+analytics; read_events() reads it back.
+"""
+
+import json
+import time
+from enum import Enum
+from typing import Dict, Iterator, List, Optional
+
+# Events kept in memory; older ones only live on in the totals and file
+LEDGER_CAPACITY = 512
+
+
+class ScoreCategory(Enum):
+    """What a scoring event rewards."""
+    COMPLETION = 'completion'
+    CORRECT_FORMATION = 'correct_formation'
+    EFFICIENT_CODE = 'efficient_code'
+    CREATIVITY = 'creativity'
+    SPEED_BONUS = 'speed_bonus'
+    STREAK_BONUS = 'streak_bonus'
+    OTHER = 'other'
+
+
+# Keywords that place a free-text reason in a category, checked in order
+_REASON_KEYWORDS = (
+    (('formation',), ScoreCategory.CORRECT_FORMATION),
+    (('efficient', 'loop'), ScoreCategory.EFFICIENT_CODE),
+    (('creative', 'unique'), ScoreCategory.CREATIVITY),
+    (('fast', 'quick'), ScoreCategory.SPEED_BONUS),
+    (('streak',), ScoreCategory.STREAK_BONUS),
+    (('complete',), ScoreCategory.COMPLETION),
+)
+
+
+def category_for_reason(reason: str) -> ScoreCategory:
+    """Pick a category for a reason given without one.
+    
+    Args:
+        reason: Free-text reason, e.g. "Correct formation"
+    
+    Returns:
+        The first category whose keyword appears in the reason, or OTHER
+    """
+    text = reason.lower()
+    for keywords, category in _REASON_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return category
+    return ScoreCategory.OTHER
+
+
+class ScoreEvent:
+    """One award (or loss) of points."""
+    
+    def __init__(self, category: ScoreCategory, points: float, multiplier: float = 1.0,
+                 reason: str = "", source: Optional[str] = None, timestamp: Optional[float] = None):
+        """Create an event.
+        
+        Args:
+            category: What the points are for
+            points: Points before the multiplier
+            multiplier: Streak multiplier applied
+            reason: Text shown to the player
+            source: Lesson or challenge the points came from, e.g.
+                'challenge:2' or 'level:week1'
+            timestamp: Seconds since the epoch; now by default
+        """
+        self.category = category
+        self.points = points
+        self.multiplier = multiplier
+        self.reason = reason
+        self.source = source
+        self.timestamp = time.time() if timestamp is None else timestamp
+        
+    @property
+    def awarded(self) -> float:
+        """Points added to the total."""
+        return self.points * self.multiplier
+        
+    def to_dict(self) -> Dict:
+        """Get the event as a JSON-ready dictionary."""
+        return {'category': self.category.value, 'points': self.points, 'multiplier': self.multiplier,
+                'reason': self.reason, 'source': self.source, 'timestamp': self.timestamp}
+        
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ScoreEvent':
+        """Create an event from a dictionary made by to_dict."""
+        return cls(ScoreCategory(data['category']), data['points'], data.get('multiplier', 1.0),
+                   data.get('reason', ""), data.get('source'), data.get('timestamp'))
+        
+    def __repr__(self):
+        return f"ScoreEvent({self.category.value}, {self.awarded:+.1f}, {self.source})"
+
+
+class ScoreLedger:
+    """Recent scoring events in a ring buffer, with running totals."""
+    
+    def __init__(self, capacity: int = LEDGER_CAPACITY, path: Optional[str] = None):
+        """Create a ledger.
+        
+        Args:
+            capacity: Events kept in memory
+            path: JSON Lines file every event is appended to, if any
+        """
+        self.capacity = capacity
+        self.path = path
+        self._events: List[Optional[ScoreEvent]] = [None] * capacity
+        self._next = 0
+        self.recorded = 0
+        self._totals = {category: 0.0 for category in ScoreCategory}
+        self.total = 0.0
+        # Changes whenever the ledger does
+        self.version = 0
+        
+    def record(self, event: ScoreEvent):
+        """Add an event, update the totals and append it to the file."""
+        self._events[self._next] = event
+        self._next = (self._next + 1) % self.capacity
+        self.recorded += 1
+        awarded = event.awarded
+        self._totals[event.category] += awarded
+        self.total += awarded
+        self.version += 1
+        if self.path:
+            # One short append per event: events come at the pace of
+            # lessons, and nothing is lost if the game is closed
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(event.to_dict()) + '\n')
+        
+    def total_for(self, category: ScoreCategory) -> float:
+        """Get the points awarded in one category."""
+        return self._totals[category]
+        
+    def breakdown(self) -> Dict[str, float]:
+        """Get the points awarded per category, keyed by category value."""
+        return {category.value: total for category, total in self._totals.items()}
+        
+    def recent(self, count: Optional[int] = None) -> List[ScoreEvent]:
+        """Get the latest events still in memory, oldest first.
+        
+        Args:
+            count: Number of events; all kept events by default
+        """
+        kept = min(self.recorded, self.capacity)
+        count = kept if count is None else min(count, kept)
+        start = self._next - count
+        return [self._events[i % self.capacity] for i in range(start, self._next)]
+        
+    def reset(self):
+        """Forget the events and totals in memory (the file is kept)."""
+        self._events = [None] * self.capacity
+        self._next = 0
+        self.recorded = 0
+        self._totals = {category: 0.0 for category in ScoreCategory}
+        self.total = 0.0
+        self.version += 1
+
+
+def read_events(path: str) -> Iterator[ScoreEvent]:
+    """Read the events a ledger appended to a file, oldest first.
+    
+    Lines that can't be read (e.g. cut off by a crash) are skipped.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield ScoreEvent.from_dict(json.loads(line))
+            except (ValueError, KeyError, TypeError):
+                continue
@@ -3,30 +3,57 @@ Scoring System - Pride Points for Code of Pride.
 
 This module implements the "Pride Points" scoring system that rewards players 
 for completing challenges efficiently and creatively.
+
+The score panels are drawn into retained surfaces that are rebuilt only
+when what they show changes (a new ledger version, the streak, or a step
+of the count-up animation), so drawing the HUD costs one blit per frame.
 """
 
 import pygame
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from config import COLOR_BLUE, COLOR_GOLD, COLOR_BG, COLOR_TEXT
+from gameplay.score_events import ScoreCategory, ScoreEvent, ScoreLedger, category_for_reason
+
+# Share of a challenge's points a nearly right formation can earn
+PARTIAL_CREDIT = 0.5
+
+# Similarity score below which a formation earns no partial credit
+MIN_PARTIAL_SCORE = 0.4
+
+# Share of the remaining gap the displayed total closes per second
+COUNT_UP_RATE = 6.0
+
+# Gap below which the displayed total snaps to the real one
+COUNT_UP_SNAP = 0.05
+
+# Text surfaces kept for the panels
+MAX_CACHED_TEXT = 64
 
 
 class PridePoints:
     """A scoring system that rewards efficient and creative coding."""
     
-    def __init__(self):
+    def __init__(self, log_path: Optional[str] = None):
+        """Create a scorer.
+        
+        Args:
+            log_path: JSON Lines file every scoring event is appended to
+        """
         self.total_points = 0.0
         self.multiplier = 1.0
         self.streak = 0
         self.max_streak = 0
         
-        # Scoring categories
-        self.scores = {
-            'correct_formation': 0,
-            'efficient_code': 0,
-            'creativity': 0,
-            'speed_bonus': 0,
-            'streak_bonus': 0
-        }
+        # Every award as a typed event, with running totals per category
+        self.ledger = ScoreLedger(path=log_path)
+        
+        # Total shown in the panels; counts up to total_points in update()
+        self.displayed_points = 0.0
+        
+        # Retained panels: name -> (key they were drawn for, surface)
+        self._panels: Dict[str, Tuple[tuple, pygame.Surface]] = {}
+        self._text_cache: Dict[tuple, pygame.Surface] = {}
+        self.panel_builds = 0
         
         # Font for display
         self.font_medium = pygame.font.SysFont('arial', 16, bold=True)
@@ -42,41 +69,37 @@ class PridePoints:
             'negative': (200, 100, 100)
         }
         
-    def add_points(self, points: float, reason: str = "", show_feedback: bool = True):
+    def add_points(self, points: float, reason: str = "", show_feedback: bool = True,
+                   streak: bool = True, category: Optional[ScoreCategory] = None,
+                   source: Optional[str] = None):
         """Add points to the total score.
         
         Args:
             points: Number of points to add (can be negative)
             reason: Reason for the points (for feedback)
             show_feedback: Whether to show visual feedback
+            streak: Whether the points extend (or break) the streak;
+                bonuses that come with other points don't
+            category: What the points are for; picked from keywords in
+                the reason if not given
+            source: Lesson or challenge the points came from
         """
-        actual_points = points * self.multiplier
+        event = ScoreEvent(category or category_for_reason(reason), points, self.multiplier,
+                           reason, source)
+        self.ledger.record(event)
+        actual_points = event.awarded
         self.total_points += actual_points
         
         # Update streak
-        if actual_points > 0:
+        if streak and actual_points > 0:
             self.streak += 1
             self.max_streak = max(self.max_streak, self.streak)
-        else:
+        elif streak:
             self.streak = 0
             
         # Update multiplier based on streak
         self.multiplier = 1.0 + min(self.streak * 0.05, 0.5)  # Max 50% bonus
         
-        # Store reason for display
-        if reason:
-            # Simple categorization based on reason
-            if "formation" in reason.lower():
-                self.scores['correct_formation'] += actual_points
-            elif "efficient" in reason.lower() or "loop" in reason.lower():
-                self.scores['efficient_code'] += actual_points
-            elif "creative" in reason.lower() or "unique" in reason.lower():
-                self.scores['creativity'] += actual_points
-            elif "fast" in reason.lower() or "quick" in reason.lower():
-                self.scores['speed_bonus'] += actual_points
-            elif "streak" in reason.lower():
-                self.scores['streak_bonus'] += actual_points
-                
         return actual_points
         
     def reset_streak(self):
@@ -90,16 +113,28 @@ class PridePoints:
         self.multiplier = 1.0
         self.streak = 0
         self.max_streak = 0
-        for key in self.scores:
-            self.scores[key] = 0
-            
+        self.ledger.reset()
+        self.displayed_points = 0.0
+        
     def get_score_breakdown(self) -> Dict[str, float]:
         """Get a breakdown of scores by category.
         
         Returns:
             Dictionary with score categories and values
         """
-        return self.scores.copy()
+        return self.ledger.breakdown()
+        
+    def update(self, dt: float):
+        """Advance the count-up animation of the displayed total.
+        
+        Args:
+            dt: Delta time in seconds
+        """
+        gap = self.total_points - self.displayed_points
+        if abs(gap) < COUNT_UP_SNAP:
+            self.displayed_points = self.total_points
+        else:
+            self.displayed_points += gap * min(1.0, dt * COUNT_UP_RATE)
         
     def draw(self, surface: pygame.Surface, x: int, y: int):
         """Draw the score display.
@@ -108,81 +143,104 @@ class PridePoints:
             surface: Surface to draw on
             x, y: Position to draw at
         """
-        # Draw background
-        width, height = 200, 120
-        bg_rect = pygame.Rect(x, y, width, height)
-        s = pygame.Surface((width, height), pygame.SRCALPHA)
-        s.fill(self.colors['background'])
-        surface.blit(s, (x, y))
-        pygame.draw.rect(surface, self.colors['border'], bg_rect, 2)
+        key = (f"{self.displayed_points:.1f}", self.streak, self.multiplier)
+        surface.blit(self._panel('summary', key, self._build_summary), (x, y))
+        
+    def draw_detailed(self, surface: pygame.Surface, x: int, y: int):
+        """Draw a detailed score breakdown.
+        
+        Args:
+            surface: Surface to draw on
+            x, y: Position to draw at
+        """
+        key = (f"{self.displayed_points:.1f}", self.ledger.version, self.streak,
+               self.multiplier, self.max_streak)
+        surface.blit(self._panel('detailed', key, self._build_detailed), (x, y))
+        
+    def _panel(self, name: str, key: tuple, build) -> pygame.Surface:
+        """Get a retained panel, rebuilding it if its key changed."""
+        cached = self._panels.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        panel = build()
+        self._panels[name] = (key, panel)
+        self.panel_builds += 1
+        return panel
+        
+    def _text(self, font: pygame.font.Font, text: str, color) -> pygame.Surface:
+        """Render a line of text, reusing the surface of an earlier render."""
+        key = (id(font), text, color)
+        rendered = self._text_cache.get(key)
+        if rendered is None:
+            if len(self._text_cache) >= MAX_CACHED_TEXT:
+                self._text_cache.clear()
+            rendered = font.render(text, True, color)
+            self._text_cache[key] = rendered
+        return rendered
+        
+    def _background(self, width: int, height: int) -> pygame.Surface:
+        """Create a panel surface with its background and border."""
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill(self.colors['background'])
+        pygame.draw.rect(panel, self.colors['border'], panel.get_rect(), 2)
+        return panel
+        
+    def _build_summary(self) -> pygame.Surface:
+        """Render the score display panel."""
+        panel = self._background(200, 120)
         
         # Draw title
-        title = self.font_medium.render("Pride Points", True, self.colors['highlight'])
-        surface.blit(title, (x + 10, y + 5))
+        panel.blit(self._text(self.font_medium, "Pride Points", self.colors['highlight']), (10, 5))
         
         # Draw total points
-        points_text = f"Total: {self.total_points:.1f}"
-        text = self.font_medium.render(points_text, True, self.colors['text'])
-        surface.blit(text, (x + 10, y + 30))
+        points_text = f"Total: {self.displayed_points:.1f}"
+        panel.blit(self._text(self.font_medium, points_text, self.colors['text']), (10, 30))
         
         # Draw multiplier
         if self.multiplier > 1.0:
             mult_text = f"Multiplier: x{self.multiplier:.2f}"
-            text = self.font_small.render(mult_text, True, self.colors['highlight'])
-            surface.blit(text, (x + 10, y + 55))
+            panel.blit(self._text(self.font_small, mult_text, self.colors['highlight']), (10, 55))
             
         # Draw streak
         streak_text = f"Streak: {self.streak}"
-        text = self.font_small.render(streak_text, True, self.colors['text'])
-        surface.blit(text, (x + 10, y + 75))
-        
-    def draw_detailed(self, surface: pygame.Surface, x: int, y: int):
-        """Draw a detailed score breakdown.
+        panel.blit(self._text(self.font_small, streak_text, self.colors['text']), (10, 75))
+        return panel
         
-        Args:
-            surface: Surface to draw on
-            x, y: Position to draw at
-        """
-        # Draw background
-        width, height = 250, 180
-        bg_rect = pygame.Rect(x, y, width, height)
-        s = pygame.Surface((width, height), pygame.SRCALPHA)
-        s.fill(self.colors['background'])
-        surface.blit(s, (x, y))
-        pygame.draw.rect(surface, self.colors['border'], bg_rect, 2)
+    def _build_detailed(self) -> pygame.Surface:
+        """Render the score breakdown panel."""
+        width = 250
+        panel = self._background(width, 180)
         
         # Draw title
-        title = self.font_medium.render("Score Breakdown", True, self.colors['highlight'])
-        surface.blit(title, (x + 10, y + 5))
+        panel.blit(self._text(self.font_medium, "Score Breakdown", self.colors['highlight']), (10, 5))
         
         # Draw each category
         y_offset = 35
-        for category, points in self.scores.items():
+        for category, points in self.ledger.breakdown().items():
+            # Only categories that have points, so the list fits the panel
+            if not points:
+                continue
             # Format category name
             display_name = category.replace('_', ' ').title()
             # Draw category and points
-            cat_text = self.font_small.render(f"{display_name}:", True, self.colors['text'])
-            pts_text = self.font_small.render(f"{points:.1f}", True, 
-                                            self.colors['positive'] if points >= 0 else self.colors['negative'])
-            surface.blit(cat_text, (x + 10, y + y_offset))
-            surface.blit(pts_text, (x + width - 50, y + y_offset))
+            color = self.colors['positive'] if points >= 0 else self.colors['negative']
+            panel.blit(self._text(self.font_small, f"{display_name}:", self.colors['text']), (10, y_offset))
+            panel.blit(self._text(self.font_small, f"{points:.1f}", color), (width - 50, y_offset))
             y_offset += 20
             
         # Draw total
-        pygame.draw.line(surface, self.colors['border'], 
-                        (x + 10, y + y_offset), (x + width - 10, y + y_offset), 1)
+        pygame.draw.line(panel, self.colors['border'], (10, y_offset), (width - 10, y_offset), 1)
         y_offset += 10
-        total_text = self.font_medium.render(f"Total: {self.total_points:.1f}", True, self.colors['highlight'])
-        surface.blit(total_text, (x + 10, y + y_offset))
+        total_text = f"Total: {self.displayed_points:.1f}"
+        panel.blit(self._text(self.font_medium, total_text, self.colors['highlight']), (10, y_offset))
         
         # Draw multiplier and streak
         y_offset += 25
         mult_text = f"Multiplier: x{self.multiplier:.2f}"
         streak_text = f"Streak: {self.streak} (Max: {self.max_streak})"
-        mult_surf = self.font_small.render(mult_text, True, self.colors['text'])
-        streak_surf = self.font_small.render(streak_text, True, self.colors['text'])
-        surface.blit(mult_surf, (x + 10, y + y_offset))
-        surface.blit(streak_surf, (x + 10, y + y_offset + 20))
+        panel.blit(self._text(self.font_small, mult_text, self.colors['text']), (10, y_offset))
+        panel.blit(self._text(self.font_small, streak_text, self.colors['text']), (10, y_offset + 20))
+        return panel
         
     def calculate_efficiency_score(self, code_lines: int, expected_lines: int) -> float:
         """Calculate points based on code efficiency.
@@ -212,6 +270,21 @@ class PridePoints:
             penalty = base_points * (1 - 1/excess_ratio) * 0.3
             return max(5.0, base_points - penalty)
             
+    def calculate_formation_score(self, similarity: Dict, max_points: float) -> float:
+        """Calculate partial credit for a formation that missed its target.
+        
+        Args:
+            similarity: Result of gameplay.similarity.compare
+            max_points: Points for a correct solution
+        
+        Returns:
+            Up to half of max_points, scaled by how close the members
+            are to their spots; nothing if they are mostly off
+        """
+        if not similarity.get('ok') or similarity['score'] < MIN_PARTIAL_SCORE:
+            return 0.0
+        return max_points * PARTIAL_CREDIT * similarity['score']
+        
     def calculate_creativity_score(self, code_complexity: int) -> float:
         """Calculate points based on code creativity/complexity.
         
@@ -0,0 +1,306 @@
+"""
+Similarity - Compare the band's positions with a target formation.
+
+Members are matched to target spots so that the total squared distance
+is as small as possible; each member's error is the distance to its
+spot. Small bands (up to HUNGARIAN_LIMIT members) are matched exactly
+with the Hungarian algorithm in O(n^3); larger bands are matched
+greedily, closest pairs first, using a grid over the target spots so
+only nearby pairs are considered, which scores a 500-member formation
+in milliseconds. Members left over by the grid pass are matched among
+themselves.
+
+With `align`, the formation may be anywhere on the field and turned any
+way: the positions are moved onto the target by Procrustes alignment
+(translation and rotation, and size too with `scale`), alternating with
+re-matching until the matching stops changing.
+
+The score is the members' average of tolerance / (tolerance + error),
+so it is 1.0 for a perfect formation and gives partial credit for every
+member that is close to its spot.
+"""
+
+import math
+from collections import defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+from gameplay.formations import Point, TOLERANCE, positions
+
+# Largest band matched exactly; larger ones use the grid
+HUNGARIAN_LIMIT = 64
+
+# Alignment and re-matching rounds
+MAX_ALIGN_ROUNDS = 6
+
+
+def hungarian(cost: Sequence[Sequence[float]]) -> List[int]:
+    """Solve the assignment problem for a square cost matrix.
+    
+    Shortest augmenting paths with row and column potentials, O(n^3).
+    
+    Args:
+        cost: cost[i][j] is the cost of giving row i column j
+    
+    Returns:
+        The column assigned to each row
+    """
+    n = len(cost)
+    u = [0.0] * (n + 1)
+    v = [0.0] * (n + 1)
+    # owner[j]: row (1-based) holding column j; column 0 is the free row
+    owner = [0] * (n + 1)
+    way = [0] * (n + 1)
+    columns = range(1, n + 1)
+    for i in range(1, n + 1):
+        owner[0] = i
+        j0 = 0
+        minv = [math.inf] * (n + 1)
+        used = [False] * (n + 1)
+        while True:
+            used[j0] = True
+            i0 = owner[j0]
+            row = cost[i0 - 1]
+            ui = u[i0]
+            delta = math.inf
+            j1 = 0
+            for j in columns:
+                if not used[j]:
+                    cur = row[j - 1] - ui - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(n + 1):
+                if used[j]:
+                    u[owner[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+        # Flip the augmenting path
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+    assignment = [0] * n
+    for j in columns:
+        assignment[owner[j] - 1] = j - 1
+    return assignment
+
+
+def _squared(a: Point, b: Point) -> float:
+    """Squared distance between two points."""
+    dx = a[0] - b[0]
+    dy = a[1] - b[1]
+    return dx * dx + dy * dy
+
+
+def _exact_match(points: Sequence[Point], target: Sequence[Point],
+                 rows: Sequence[int], cols: Sequence[int]) -> Dict[int, int]:
+    """Optimally match points[rows] to target[cols] (equal counts)."""
+    cost = [[_squared(points[i], target[j]) for j in cols] for i in rows]
+    return {rows[r]: cols[c] for r, c in enumerate(hungarian(cost))}
+
+
+def _greedy_match(points: Sequence[Point], target: Sequence[Point],
+                  rows: Sequence[int], cols: Sequence[int]) -> Dict[int, int]:
+    """Match points[rows] to target[cols] closest pairs first, over all pairs."""
+    pairs = sorted((_squared(points[i], target[j]), i, j) for i in rows for j in cols)
+    matched: Dict[int, int] = {}
+    taken = set()
+    for _, i, j in pairs:
+        if i not in matched and j not in taken:
+            matched[i] = j
+            taken.add(j)
+            if len(matched) == len(rows):
+                break
+    return matched
+
+
+def _grid_match(points: Sequence[Point], target: Sequence[Point]) -> Dict[int, int]:
+    """Approximately match points to target, closest nearby pairs first.
+    
+    Target spots are bucketed in cells about one average spacing wide,
+    and only pairs in neighbouring cells are candidates.
+    """
+    n = len(target)
+    xs, ys = zip(*target)
+    width = max(xs) - min(xs)
+    height = max(ys) - min(ys)
+    # Spots per cell stay around one for a formation spread over its box,
+    # or along its length for a line
+    cell = math.sqrt(width * height / n) if width * height > 0 else max(width, height) / n
+    cell = max(cell, 1e-6)
+    grid = defaultdict(list)
+    for j, (x, y) in enumerate(target):
+        grid[(math.floor(x / cell), math.floor(y / cell))].append(j)
+    
+    pairs = []
+    for i, p in enumerate(points):
+        cx = math.floor(p[0] / cell)
+        cy = math.floor(p[1] / cell)
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for j in grid.get((gx, gy), ()):
+                    pairs.append((_squared(p, target[j]), i, j))
+    pairs.sort()
+    matched: Dict[int, int] = {}
+    taken = set()
+    for _, i, j in pairs:
+        if i not in matched and j not in taken:
+            matched[i] = j
+            taken.add(j)
+    
+    # Members with no free spot nearby
+    rows = [i for i in range(n) if i not in matched]
+    if rows:
+        cols = [j for j in range(n) if j not in taken]
+        rest = _exact_match if len(rows) <= HUNGARIAN_LIMIT else _greedy_match
+        matched.update(rest(points, target, rows, cols))
+    return matched
+
+
+def match(points: Sequence[Point], target: Sequence[Point]) -> List[int]:
+    """Match each point to a target spot, minimizing squared distances.
+    
+    Exact up to HUNGARIAN_LIMIT points, approximate above.
+    
+    Args:
+        points: Positions, as many as target
+        target: Target spots
+    
+    Returns:
+        The target index matched to each point
+    """
+    n = len(points)
+    if n <= HUNGARIAN_LIMIT:
+        matched = _exact_match(points, target, range(n), range(n))
+    else:
+        matched = _grid_match(points, target)
+    return [matched[i] for i in range(n)]
+
+
+def _centered(points: Sequence[Point]) -> Tuple[Point, List[Point]]:
+    """Centroid of the points and the points relative to it."""
+    n = len(points)
+    cx = sum(p[0] for p in points) / n
+    cy = sum(p[1] for p in points) / n
+    return (cx, cy), [(x - cx, y - cy) for x, y in points]
+
+
+def _principal_angle(points: Sequence[Point]) -> float:
+    """Direction of the principal axis of centered points, in radians."""
+    sxx = sum(x * x for x, _ in points)
+    syy = sum(y * y for _, y in points)
+    sxy = sum(x * y for x, y in points)
+    return 0.5 * math.atan2(2 * sxy, sxx - syy)
+
+
+def _transform(points: Sequence[Point], angle: float, size: float, offset: Point) -> List[Point]:
+    """Rotate and scale points about the origin, then move them by offset."""
+    c = size * math.cos(angle)
+    s = size * math.sin(angle)
+    ox, oy = offset
+    return [(x * c - y * s + ox, x * s + y * c + oy) for x, y in points]
+
+
+def _procrustes(points: Sequence[Point], target: Sequence[Point], assignment: List[int],
+                scale: bool) -> Tuple[float, float]:
+    """Best rotation (and scale) taking centered points onto their centered spots."""
+    dot = cross = norm = 0.0
+    for (x, y), j in zip(points, assignment):
+        tx, ty = target[j]
+        dot += x * tx + y * ty
+        cross += x * ty - y * tx
+        norm += x * x + y * y
+    angle = math.atan2(cross, dot)
+    size = math.hypot(dot, cross) / norm if scale and norm > 0 else 1.0
+    return angle, size
+
+
+def _aligned_match(points: Sequence[Point], target: Sequence[Point], scale: bool):
+    """Align points onto the target and match them.
+    
+    Returns:
+        (points moved onto the target, assignment)
+    """
+    center, local = _centered(points)
+    target_center, target_local = _centered(target)
+    spread = sum(x * x + y * y for x, y in local)
+    size = 1.0
+    if scale and spread > 0:
+        size = math.sqrt(sum(x * x + y * y for x, y in target_local) / spread)
+    # Start unturned (formations are usually square to the field), and
+    # with the principal axes lined up both ways round
+    turn = _principal_angle(target_local) - _principal_angle(local)
+    best = None
+    for angle in (0.0, turn, turn + math.pi):
+        assignment = None
+        for _ in range(MAX_ALIGN_ROUNDS):
+            moved = _transform(local, angle, size, target_center)
+            previous, assignment = assignment, match(moved, target)
+            if assignment == previous:
+                break
+            angle, fitted = _procrustes(local, target_local, assignment, scale)
+            size = fitted if scale else size
+        moved = _transform(local, angle, size, target_center)
+        error = sum(_squared(p, target[j]) for p, j in zip(moved, assignment))
+        if best is None or error < best[0]:
+            best = (error, moved, assignment)
+    return best[1], best[2]
+
+
+def compare(members: Sequence, target: Sequence[Point], align: bool = False,
+            scale: bool = False, tolerance: float = TOLERANCE) -> Dict:
+    """Compare band members' positions with a target formation.
+    
+    Args:
+        members: Band members, one per target spot
+        target: Target spots as (x, y) in yards
+        align: Let the formation be moved and turned onto the target
+        scale: With align, let it be resized too; errors are then in the
+            target's yards
+        tolerance: Error in yards that scores 0.5 for a member
+    
+    Returns:
+        Dictionary with 'ok' (whether the counts matched), 'score',
+        'mean_error', 'max_error', 'errors' (per member),
+        'assignment' (target index per member), 'sections' (per
+        section 'count', 'mean_error' and 'max_error'), 'method'
+        ('hungarian' or 'grid') and a 'reason' when not ok
+    """
+    n = len(members)
+    if n != len(target) or n == 0:
+        return {'ok': False, 'score': 0.0, 'mean_error': math.inf, 'max_error': math.inf,
+                'errors': [], 'assignment': [], 'sections': {}, 'method': None,
+                'reason': f"the formation needs {len(target)} members, not {n}"}
+    points = positions(members)
+    if align:
+        points, assignment = _aligned_match(points, target, scale)
+    else:
+        assignment = match(points, target)
+    errors = [math.sqrt(_squared(p, target[j])) for p, j in zip(points, assignment)]
+    
+    by_section: Dict[str, List[float]] = defaultdict(list)
+    for member, error in zip(members, errors):
+        by_section[getattr(member, 'section', None)].append(error)
+    sections = {name: {'count': len(errs), 'mean_error': sum(errs) / len(errs),
+                       'max_error': max(errs)}
+                for name, errs in by_section.items()}
+    
+    return {
+        'ok': True,
+        'score': sum(tolerance / (tolerance + e) for e in errors) / n,
+        'mean_error': sum(errors) / n,
+        'max_error': max(errors),
+        'errors': errors,
+        'assignment': assignment,
+        'sections': sections,
+        'method': 'hungarian' if n <= HUNGARIAN_LIMIT else 'grid',
+        'reason': None,
+    }
+
@@ -1,5 +1,15 @@
 # Simple validators for levels. Each validator accepts execution namespace (globals) and returns (ok, message)
-from typing import Tuple, Any
+from typing import Tuple, Any, Optional, Callable, Dict, List
+from .formations import RECOGNIZERS, TOLERANCE, positions
+from .similarity import compare
+from .code_executor import SAFE_BUILTINS
+
+# a compiled check takes the run's namespace and returns None when it
+# passes, or the message to show the student
+Check = Callable[[dict], Optional[str]]
+
+# type names a level file may require of a variable
+TYPES = {'list': list, 'int': int, 'number': (int, float), 'str': str, 'dict': dict, 'bool': bool}
 
 class BaseValidator:
     def validate(self, ns: dict) -> Tuple[bool, str]:
@@ -12,3 +22,134 @@ class Week1Validator(BaseValidator):
         if isinstance(val, list) and len(val) >= 3:
             return True, 'Good job - found brass_section'
         return False, 'Please create list named brass_section with at least 3 items'
+
+
+class FormationValidator(BaseValidator):
+    # expect band members (the first `count`, or one section) to stand in a
+    # line, circle or block, checked with the closed-form fits in formations
+    def __init__(self, shape: str, count: Optional[int] = None, section: Optional[str] = None,
+                 tolerance: float = TOLERANCE):
+        self.shape = shape
+        self.fit = RECOGNIZERS[shape]
+        self.count = count
+        self.section = section
+        self.tolerance = tolerance
+
+    def validate(self, ns: dict):
+        band = ns.get('band')
+        if band is None:
+            return False, 'No band to check'
+        members = band.get_section(self.section) if self.section else band.get_all_members()
+        if self.count is not None:
+            members = members[:self.count]
+        who = f'The {self.section} section' if self.section else f'The first {len(members)} members'
+        result = self.fit(positions(members), self.tolerance)
+        if result['ok']:
+            return True, f'{who} formed a {self.shape} (fit {result["score"]:.0%})'
+        return False, f'{who} should form a {self.shape}: {result["reason"]}'
+
+
+class LevelValidator(BaseValidator):
+    # runs the checks compiled from a level file, in order; the first
+    # failing check's message is shown
+    def __init__(self, checks: List[Check], success: str = 'Level complete!'):
+        self.checks = checks
+        self.success = success
+
+    def validate(self, ns: dict):
+        for check in self.checks:
+            message = check(ns)
+            if message:
+                return False, message
+        return True, self.success
+
+
+def _compile_expr(expr: str, level_id: str):
+    # syntax errors in level files surface when the level is compiled,
+    # not when a student runs code
+    return compile(expr, f'<level {level_id}>', 'eval')
+
+
+def _evaluate(code, ns: dict):
+    # level expressions see the same restricted builtins as student code
+    if '__builtins__' not in ns:
+        ns = dict(ns, __builtins__=SAFE_BUILTINS)
+    return eval(code, ns)
+
+
+def _require(name: str, type_name: Optional[str]) -> Check:
+    if type_name is not None and type_name not in TYPES:
+        raise ValueError(f'unknown type {type_name!r} for {name}')
+    expected = TYPES.get(type_name, object)
+
+    def check(ns):
+        if name not in ns:
+            return f'Please create a variable named {name}'
+        if not isinstance(ns[name], expected):
+            return f'{name} should be of type {type_name}'
+        return None
+    return check
+
+
+def _constraint(expr: str, message: str, level_id: str) -> Check:
+    code = _compile_expr(expr, level_id)
+
+    def check(ns):
+        try:
+            ok = _evaluate(code, ns)
+        except Exception:
+            ok = False
+        return None if ok else message
+    return check
+
+
+def _formation(spec: Dict[str, Any]) -> Check:
+    if spec['shape'] not in RECOGNIZERS:
+        raise ValueError(f'unknown formation {spec["shape"]!r}')
+    validator = FormationValidator(spec['shape'], spec.get('count'), spec.get('section'),
+                                   spec.get('tolerance', TOLERANCE))
+
+    def check(ns):
+        ok, message = validator.validate(ns)
+        return None if ok else message
+    return check
+
+
+def _target(spec: Dict[str, Any], level_id: str) -> Check:
+    # members (an expression, all members by default) must each stand
+    # within tolerance of a target spot
+    members = _compile_expr(spec.get('members', 'members'), level_id)
+    spots = [tuple(p) for p in spec['positions']]
+    align = spec.get('align', False)
+    scale = spec.get('scale', False)
+    tolerance = spec.get('tolerance', TOLERANCE)
+
+    def check(ns):
+        try:
+            chosen = list(_evaluate(members, ns))
+        except Exception:
+            return 'Could not find the members to check'
+        result = compare(chosen, spots, align, scale, tolerance)
+        if not result['ok']:
+            return f'The formation needs {len(spots)} members, not {len(chosen)}'
+        if result['max_error'] > tolerance:
+            return f'Members are up to {result["max_error"]:.1f} yards from their spots'
+        return None
+    return check
+
+
+def compile_validator(spec: Dict[str, Any]) -> LevelValidator:
+    # turn a level file's checks into closures once, when the level is
+    # loaded: required variables, then constraint expressions, then the
+    # formation and target checks on the band
+    level_id = spec.get('id', '?')
+    checks: List[Check] = []
+    for name, type_name in spec.get('requires', {}).items():
+        checks.append(_require(name, type_name))
+    for constraint in spec.get('constraints', []):
+        checks.append(_constraint(constraint['expr'], constraint['message'], level_id))
+    if 'formation' in spec:
+        checks.append(_formation(spec['formation']))
+    if 'target' in spec:
+        checks.append(_target(spec['target'], level_id))
+    return LevelValidator(checks, spec.get('success', 'Level complete!'))
@@ -13,6 +13,9 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import test modules
 from tests.test_core_systems import *
+from tests.test_rendering import *
+from tests.test_editor import *
+from tests.test_gameplay import *
 
 def run_all_tests():
     """Run all tests and report results."""
@@ -5,18 +5,22 @@ This module provides the main coding environment with split-screen layout
 for the code editor and field view.
 """
 
+import os
 import pygame
 from typing import List, Tuple, Optional
-from ui.editor import CodeEditor
+from ui.workspace import Workspace
 from ui.field_view import FieldView
 from ui.timeline import Timeline
 from gameplay.code_executor import CodeExecutor
 from gameplay.scoring import PridePoints
+from gameplay.score_events import ScoreCategory
 from gameplay.band_api import BandMember
+from gameplay.drill import Drill, DrillPlayback
 from config import (
     WINDOW_WIDTH, WINDOW_HEIGHT, EDITOR_X, EDITOR_Y, 
     EDITOR_WIDTH, EDITOR_HEIGHT, FIELD_OFFSET_X, FIELD_OFFSET_Y,
-    FIELD_PIXEL_WIDTH, FIELD_PIXEL_HEIGHT, COLOR_BG, COLOR_BLUE, COLOR_GOLD
+    FIELD_PIXEL_WIDTH, FIELD_PIXEL_HEIGHT, COLOR_BG, COLOR_BLUE, COLOR_GOLD,
+    TICKS_PER_COUNT, EXAMPLES_DIR, SCORE_LOG_PATH
 )
 
 
@@ -29,10 +33,14 @@ class EditorScene:
         self.game = game
         self.level_manager = level_manager
         
-        # Create UI components
-        self.editor = CodeEditor(
+        # Create UI components: a scratch buffer plus a tab per example
+        # script; example files are only read when their tab is opened
+        self.workspace = Workspace(
             pygame.Rect(EDITOR_X, EDITOR_Y, EDITOR_WIDTH, EDITOR_HEIGHT)
         )
+        self.workspace.new_tab('scratch.py')
+        if os.path.isdir(EXAMPLES_DIR):
+            self.workspace.open_folder(EXAMPLES_DIR)
         
         self.field_view = FieldView(
             FIELD_OFFSET_X, FIELD_OFFSET_Y, 
@@ -44,16 +52,22 @@ class EditorScene:
             WINDOW_WIDTH - 40, 80
         )
         
-        self.scorer = PridePoints()
+        self.scorer = PridePoints(log_path=SCORE_LOG_PATH)
         
         # Code executor
         self.executor = CodeExecutor()
         
         # State
+        self.level_id: Optional[str] = None
+        self.level: Optional[dict] = None
         self.selected_member: Optional[BandMember] = None
         self.show_detailed_scores = False
         self.last_execute_time = 0
         
+        # Fixed-tick simulation of the last run's drill
+        self.playback: Optional[DrillPlayback] = None
+        self.ticks = 0
+        
         # Font setup
         self.title_font = pygame.font.SysFont('arial', 24, bold=True)
         self.info_font = pygame.font.SysFont('arial', 14)
@@ -67,6 +81,11 @@ class EditorScene:
             'highlight': COLOR_GOLD
         }
         
+    @property
+    def editor(self):
+        """Code editor of the active workspace tab."""
+        return self.workspace.editor
+        
     def handle_event(self, event):
         """Handle pygame events.
         
@@ -77,8 +96,8 @@ class EditorScene:
         if self.timeline.handle_event(event):
             return None
             
-        # Handle editor events
-        self.editor.handle_event(event)
+        # Handle tab switching and editor events
+        self.workspace.handle_event(event)
         
         # Handle keyboard shortcuts
         if event.type == pygame.KEYDOWN:
@@ -100,6 +119,12 @@ class EditorScene:
             elif ctrl and event.key == pygame.K_d:
                 self.show_detailed_scores = not self.show_detailed_scores
                 return None
+            elif ctrl and event.key == pygame.K_t:
+                self.field_view.toggle_trails()
+                return None
+            elif ctrl and event.key == pygame.K_m:
+                self.field_view.toggle_heatmap()
+                return None
                 
         # Handle mouse events for field interaction
         if event.type == pygame.MOUSEBUTTONDOWN:
@@ -115,7 +140,7 @@ class EditorScene:
         return None
         
     def update(self, dt: float):
-        """Update scene state.
+        """Update per-frame UI state.
         
         Args:
             dt: Delta time in seconds
@@ -123,20 +148,47 @@ class EditorScene:
         # Update timeline
         self.timeline.update(dt)
         
-        # Update band member animations
+        # Count the displayed score up to the new total
+        self.scorer.update(dt)
+        
+    def tick(self):
+        """Advance the simulation by one fixed tick."""
+        self.ticks += 1
         members = self.executor.get_band_members()
+        
+        # March the drill of the last run
+        if self.playback is not None:
+            for member, (x, y) in zip(members, self.playback.tick()):
+                member.x = x
+                member.y = y
+        
+        # Step phase for the walking animation: one stride per count
+        phase = (self.ticks % TICKS_PER_COUNT) / TICKS_PER_COUNT
         for member in members:
-            # Update step phase for walking animation
-            member.step_phase = (member.step_phase + dt * 2) % 1.0
+            member.step_phase = phase
             
+        # Record trails and field coverage
+        self.field_view.record_tick(members)
+        
     def execute_code(self):
         """Execute the code in the editor."""
+        if self.editor is None:
+            return
         code = '\n'.join(self.editor.lines)
         success, output = self.executor.execute(code)
+        self.field_view.clear_overlay()
+        self._start_playback()
+        
+        # Check the level against the namespace the code just ran in
+        if success and self.level:
+            success, message = self.level_manager.validate(self.level_id, self.executor.namespace)
+            self.workspace.status = message
         
         if success:
             # Award points for successful execution
-            points = self.scorer.add_points(25.0, "Correct formation")
+            points = self.scorer.add_points(25.0, "Correct formation",
+                                            category=ScoreCategory.CORRECT_FORMATION,
+                                            source=f"level:{self.level_id}" if self.level_id else None)
             print(f"Awarded {points:.1f} points for correct formation")
         else:
             # Reset streak for errors
@@ -145,6 +197,17 @@ class EditorScene:
             
         self.last_execute_time = pygame.time.get_ticks()
         
+    def _start_playback(self):
+        """March the band from its opening set through the drill it just ran."""
+        band_api = self.executor.band_api
+        if not band_api.members:
+            self.playback = None
+            return
+        self.playback = DrillPlayback(Drill.from_band(band_api))
+        for member, (x, y) in zip(band_api.members, self.playback.positions):
+            member.x = x
+            member.y = y
+        
     def draw(self, surface: pygame.Surface):
         """Draw the editor scene.
         
@@ -158,9 +221,12 @@ class EditorScene:
         self._draw_panels(surface)
         
         # Draw UI components
-        self.editor.draw(surface)
+        self.workspace.draw(surface)
         members = self.executor.get_band_members()
-        self.field_view.draw(surface, members, self.selected_member)
+        positions = None
+        if self.playback is not None:
+            positions = self.playback.interpolated(self.state_manager.alpha)
+        self.field_view.draw(surface, members, self.selected_member, positions)
         self.timeline.draw(surface)
         self.scorer.draw(surface, 20, 20)
         
@@ -219,27 +285,22 @@ class EditorScene:
                         (0, WINDOW_HEIGHT - 20), (WINDOW_WIDTH, WINDOW_HEIGHT - 20), 1)
         
         # Status text
-        status_text = "Ctrl+R: Run Code | Ctrl+G: Toggle Grid | Ctrl+C: Toggle Coordinates | Ctrl+L: Toggle Labels | Ctrl+D: Toggle Score Details"
+        status_text = self.workspace.status or "Ctrl+R: Run Code | Ctrl+G: Toggle Grid | Ctrl+C: Toggle Coordinates | Ctrl+L: Toggle Labels | Ctrl+D: Toggle Score Details | Ctrl+T: Trails | Ctrl+M: Heatmap"
         text = self.info_font.render(status_text, True, (200, 200, 200))
         surface.blit(text, (10, WINDOW_HEIGHT - 17))
         
-    def resize(self, width: int, height: int):
-        """Handle window resize.
+    def enter(self, **params):
+        """Called when the scene is entered.
         
         Args:
-            width: New window width
-            height: New window height
+            **params: 'level_id' of the level to play, if any
         """
-        # Resize timeline
-        self.timeline.rect.width = width - 40
-        self.timeline.width = width - 40
-        
-        # Update status bar position
-        # (It's automatically positioned at the bottom)
-        
-    def enter(self):
-        """Called when the scene is entered."""
-        pass
+        self.level_id = params.get('level_id')
+        self.level = None
+        if self.level_manager and self.level_id:
+            self.level = self.level_manager.get_level(self.level_id)
+        if self.level:
+            self.workspace.status = f"{self.level.get('title', self.level_id)}: {self.level.get('description', '')}"
         
     def exit(self):
         """Called when the scene is exited."""
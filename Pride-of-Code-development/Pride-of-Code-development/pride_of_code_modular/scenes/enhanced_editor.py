@@ -10,10 +10,12 @@ from core.state_manager import State
 from config import (
     WINDOW_WIDTH, WINDOW_HEIGHT, COLOR_BG, COLOR_BLUE, COLOR_GOLD, COLOR_TEXT,
     EDITOR_X, EDITOR_Y, EDITOR_WIDTH, EDITOR_HEIGHT,
-    FIELD_OFFSET_X, FIELD_OFFSET_Y, FIELD_PIXEL_WIDTH, FIELD_PIXEL_HEIGHT
+    FIELD_OFFSET_X, FIELD_OFFSET_Y, FIELD_PIXEL_WIDTH, FIELD_PIXEL_HEIGHT,
+    TICKS_PER_COUNT
 )
 from ui.field_view import FieldView
 from gameplay.code_executor import CodeExecutor
+from gameplay.drill import Drill, DrillPlayback
 
 
 class EnhancedEditorScene(State):
@@ -45,6 +47,10 @@ class EnhancedEditorScene(State):
         self.is_running = False
         self.show_help = False
         
+        # Fixed-tick simulation of the last run's drill
+        self.playback = None
+        self.ticks = 0
+        
         # Initial sample code
         self.initial_code = [
             "# Pride of Code - Week 1: Variables & Movement",
@@ -95,6 +101,8 @@ class EnhancedEditorScene(State):
             elif ev.key == pygame.K_F1:
                 self.executor.reset()
                 self.executor.band_api.create_band(16)
+                self.field_view.clear_overlay()
+                self.playback = None
                 self.output_text = "Band reset to starting formation."
                 
             # F2 to toggle grid
@@ -105,6 +113,14 @@ class EnhancedEditorScene(State):
             elif ev.key == pygame.K_F3:
                 self.field_view.toggle_coordinates()
                 
+            # F4 to toggle marcher trails
+            elif ev.key == pygame.K_F4:
+                self.field_view.toggle_trails()
+            
+            # F5 to toggle the field coverage heatmap
+            elif ev.key == pygame.K_F5:
+                self.field_view.toggle_heatmap()
+        
     def run_code(self):
         """Execute the code from the editor."""
         if not hasattr(self.game, 'editor'):
@@ -121,17 +137,42 @@ class EnhancedEditorScene(State):
         # Execute code
         self.is_running = True
         success, output = self.executor.execute(code, initial_band_size=16)
+        self.field_view.clear_overlay()
         
-        if success:
+        # March from the opening set through the drill that was just run
+        band_api = self.executor.band_api
+        self.playback = DrillPlayback(Drill.from_band(band_api)) if band_api.members else None
+        if self.playback is not None:
+            for member, (x, y) in zip(band_api.members, self.playback.positions):
+                member.x = x
+                member.y = y
+        
+        if success and self.level_data:
+            # Grade the level on the namespace the code just ran in
+            passed, message = self.level_manager.validate(self.level_id, self.executor.namespace)
+            mark = "✓" if passed else "❌"
+            self.output_text = f"{mark} {message}\n\n{output}"
+        elif success:
             self.output_text = f"✓ Code executed successfully!\n\n{output}"
         else:
             self.output_text = f"❌ Error:\n{output}"
             
         self.is_running = False
         
-    def update(self, dt):
-        """Update scene state."""
-        pass
+    def tick(self):
+        """Advance the simulation by one fixed tick."""
+        self.ticks += 1
+        members = self.executor.get_band_members()
+        if self.playback is not None:
+            for member, (x, y) in zip(members, self.playback.tick()):
+                member.x = x
+                member.y = y
+        
+        # One stride of the walking animation per count
+        phase = (self.ticks % TICKS_PER_COUNT) / TICKS_PER_COUNT
+        for member in members:
+            member.step_phase = phase
+        self.field_view.record_tick(members)
         
     def draw(self, surface):
         """Render the scene."""
@@ -170,7 +211,8 @@ class EnhancedEditorScene(State):
         
         # Field view
         members = self.executor.get_band_members()
-        self.field_view.draw(surface, members)
+        positions = self.playback.interpolated(self.manager.alpha) if self.playback else None
+        self.field_view.draw(surface, members, None, positions)
         
         # Band member count
         count_text = self.font_small.render(
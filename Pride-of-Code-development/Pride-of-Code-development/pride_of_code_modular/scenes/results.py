@@ -6,11 +6,23 @@ class ResultsScene(State):
         self.manager = manager
         self.game = game
         self.font = pygame.font.SysFont('arial', 24)
+        # retained frame, redrawn only when the message or screen size changes
+        self._frame = None
+        self._frame_key = None
 
     def enter(self, **params):
         self.message = params.get('message', 'Results')
 
     def draw(self, surface):
-        surface.fill((40,30,40))
+        key = (self.message, surface.get_size())
+        if self._frame_key != key:
+            self._frame = self._render(surface.get_size())
+            self._frame_key = key
+        surface.blit(self._frame, (0, 0))
+
+    def _render(self, size):
+        frame = pygame.Surface(size)
+        frame.fill((40,30,40))
         txt = self.font.render(self.message, True, (240,240,240))
-        surface.blit(txt, (60,60))
+        frame.blit(txt, (60,60))
+        return frame
@@ -0,0 +1,43 @@
+"""
+Build Daily Challenges Script - Generate and check a term of daily challenges.
+
+Generates the challenge for every day of a term, grades each reference
+solution, and saves the term so the game only has to look days up:
+
+    python scripts/build_daily_challenges.py
+    python scripts/build_daily_challenges.py --start 2026-09-01 --days 180
+"""
+
+import os
+import sys
+import argparse
+import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DAILY_CHALLENGES_PATH
+from gameplay.daily_challenges import DailyChallenges, TERM_DAYS, term_start
+
+
+def main():
+    """Parse arguments, then build and save the term."""
+    parser = argparse.ArgumentParser(description="Generate and check a term of daily challenges.")
+    parser.add_argument("--start", type=datetime.date.fromisoformat, default=None,
+                        help="First day as YYYY-MM-DD (default: start of the current term)")
+    parser.add_argument("--days", type=int, default=TERM_DAYS, help="Number of days")
+    parser.add_argument("--out", default=DAILY_CHALLENGES_PATH, help="JSON file to write")
+    args = parser.parse_args()
+
+    start = args.start or term_start(datetime.date.today())
+    try:
+        term = DailyChallenges(args.out).build_term(start, args.days)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Built {len(term)} challenges from {start.isoformat()} into {args.out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Export Drill Script - Render a student's drill to frames without a window.
+
+Runs a drill program through the code executor and exports every frame,
+either as numbered PNG files or as raw RGB24 frames on stdout:
+
+    python scripts/export_drill.py examples/formation_circle.py --out frames/
+    python scripts/export_drill.py my_show.py --raw | ffmpeg -f rawvideo \\
+        -pix_fmt rgb24 -s 600x400 -r 30 -i - show.mp4
+"""
+
+import os
+import sys
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from config import FIELD_PIXEL_WIDTH, FIELD_PIXEL_HEIGHT
+from gameplay.code_executor import CodeExecutor
+from gameplay.drill import Drill
+from ui.drill_export import export_drill
+
+
+def frame_size(value: str):
+    """Parse a WIDTHxHEIGHT frame size for argparse."""
+    try:
+        width, height = (int(v) for v in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {value!r}")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"frame size must be positive, got {value!r}")
+    return width, height
+
+
+def main():
+    """Parse arguments, run the drill program and export its frames."""
+    parser = argparse.ArgumentParser(description="Export a drill as PNG or raw RGB frames.")
+    parser.add_argument("script", help="Python drill program to run")
+    parser.add_argument("--out", help="Directory for PNG frames")
+    parser.add_argument("--raw", action="store_true", help="Write raw RGB24 frames to stdout")
+    parser.add_argument("--band-size", type=int, default=16, help="Number of band members")
+    parser.add_argument("--counts", type=int, default=8, help="Counts to reach the final set")
+    parser.add_argument("--fps", type=int, default=30, help="Frames per second")
+    parser.add_argument("--tempo", type=int, default=120, help="Tempo in counts per minute")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--size", type=frame_size, default=(FIELD_PIXEL_WIDTH, FIELD_PIXEL_HEIGHT),
+                        help="Frame size as WIDTHxHEIGHT")
+    args = parser.parse_args()
+    
+    if not args.out and not args.raw:
+        parser.error("choose --out DIR or --raw")
+    
+    with open(args.script, "r", encoding="utf-8") as f:
+        code = f.read()
+    
+    executor = CodeExecutor()
+    success, output = executor.execute(code, initial_band_size=args.band_size)
+    if not success:
+        print(output, file=sys.stderr)
+        return 1
+    
+    drill = Drill.from_band(executor.band_api, counts=args.counts)
+    width, height = args.size
+    frames_per_count = max(1, round(args.fps * 60 / args.tempo))
+    
+    frames = export_drill(
+        drill,
+        out_dir=None if args.raw else args.out,
+        stream=sys.stdout.buffer if args.raw else None,
+        width=width, height=height,
+        frames_per_count=frames_per_count,
+        workers=args.workers,
+    )
+    print(f"Exported {frames} frames ({drill.total_counts} counts)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
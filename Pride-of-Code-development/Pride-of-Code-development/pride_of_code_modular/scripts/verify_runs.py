@@ -0,0 +1,43 @@
+"""
+Verify Runs Script - Re-run recorded challenge runs and flag mismatches.
+
+Reads a run log, re-grades every record in a process pool and reports
+the records whose positions or score come out differently, e.g. to
+audit the leaderboard or to check a Band API change:
+
+    python scripts/verify_runs.py
+    python scripts/verify_runs.py run_records.jsonl --workers 4
+"""
+
+import os
+import sys
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import RUN_LOG_PATH
+from gameplay.run_records import read_records, verify_records
+
+
+def main():
+    """Parse arguments, verify the records and report mismatches."""
+    parser = argparse.ArgumentParser(description="Re-run recorded challenge runs and flag mismatches.")
+    parser.add_argument("log", nargs="?", default=RUN_LOG_PATH, help="Run log (JSON Lines)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    records = list(read_records(args.log))
+    results = verify_records(records, workers=args.workers)
+    failed = [r for r in results if not r['ok']]
+    for result in failed:
+        note = " (recorded with another executor version)" if result['version_changed'] else ""
+        print(f"Challenge {result['challenge_id']}, code {result['code_hash'][:12]}{note}:")
+        for field, (recorded, now) in result['mismatches'].items():
+            print(f"    {field}: recorded {recorded}, now {now}")
+    print(f"Verified {len(results)} runs, {len(failed)} mismatched", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,8 @@ import unittest
 import pygame
 import sys
 import os
+import shutil
+import tempfile
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -17,11 +19,13 @@ from gameplay.code_executor import CodeExecutor
 from ui.editor import CodeEditor
 from ui.field_view import FieldView
 from gameplay.scoring import PridePoints
+from gameplay.score_events import ScoreCategory, ScoreEvent, ScoreLedger, read_events
 from gameplay.lessons import LessonManager
 from gameplay.campaign import CampaignMode
 from gameplay.challenges import ChallengeMode
 from gameplay.sandbox import SandboxMode
 from story.engine import StoryEngine
+from core.clock import FixedStepClock
 
 
 class TestBandAPI(unittest.TestCase):
@@ -200,6 +204,68 @@ class TestScoringSystem(unittest.TestCase):
         self.scorer.reset_streak()
         self.assertEqual(self.scorer.streak, 0)
         self.assertEqual(self.scorer.multiplier, 1.0)
+        
+    def test_categories(self):
+        """Test that points land in the given category, or the reason's."""
+        self.scorer.add_points(10.0, "Challenge completed")
+        self.scorer.add_points(5.0, "Nice work", category=ScoreCategory.SPEED_BONUS, source='challenge:1')
+        self.scorer.add_points(2.0, "Nice work")
+        breakdown = self.scorer.get_score_breakdown()
+        self.assertEqual(breakdown['completion'], 10.0)
+        self.assertAlmostEqual(breakdown['speed_bonus'], 5.0 * 1.05)
+        self.assertAlmostEqual(breakdown['other'], 2.0 * 1.10)
+        self.assertAlmostEqual(sum(breakdown.values()), self.scorer.total_points)
+        event = self.scorer.ledger.recent(2)[0]
+        self.assertEqual((event.category, event.multiplier, event.source),
+                         (ScoreCategory.SPEED_BONUS, 1.05, 'challenge:1'))
+        
+    def test_ledger(self):
+        """Test the ring buffer, running totals, version and event file."""
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        path = os.path.join(folder, 'events.jsonl')
+        ledger = ScoreLedger(capacity=3, path=path)
+        for i in range(5):
+            ledger.record(ScoreEvent(ScoreCategory.CREATIVITY, i, source=f's{i}'))
+        self.assertEqual([e.points for e in ledger.recent()], [2, 3, 4])
+        self.assertEqual([e.points for e in ledger.recent(2)], [3, 4])
+        # Totals include events that have left the buffer
+        self.assertEqual(ledger.total_for(ScoreCategory.CREATIVITY), 10)
+        self.assertEqual(ledger.version, 5)
+        
+        self.assertEqual([e.source for e in read_events(path)], ['s0', 's1', 's2', 's3', 's4'])
+        ledger.reset()
+        self.assertEqual(ledger.recent(), [])
+        self.assertEqual(ledger.total, 0)
+        self.assertEqual(len(list(read_events(path))), 5)
+        
+    def test_hud_cache(self):
+        """Test that the panels are only rebuilt when what they show changes."""
+        surface = pygame.Surface((400, 300))
+        for _ in range(3):
+            self.scorer.draw(surface, 20, 20)
+            self.scorer.draw_detailed(surface, 120, 20)
+        self.assertEqual(self.scorer.panel_builds, 2)
+        
+        self.scorer.add_points(10.0, "Challenge completed")
+        self.scorer.draw(surface, 20, 20)
+        self.scorer.draw_detailed(surface, 120, 20)
+        self.assertEqual(self.scorer.panel_builds, 4)
+        self.scorer.reset_streak()
+        self.scorer.draw(surface, 20, 20)
+        self.assertEqual(self.scorer.panel_builds, 5)
+        
+    def test_count_up(self):
+        """Test that the displayed total counts up to the real one."""
+        self.scorer.add_points(100.0, "Challenge completed")
+        self.assertEqual(self.scorer.displayed_points, 0.0)
+        self.scorer.update(1 / 60)
+        self.assertTrue(0.0 < self.scorer.displayed_points < 100.0)
+        for _ in range(120):
+            self.scorer.update(1 / 60)
+        self.assertEqual(self.scorer.displayed_points, 100.0)
+        self.scorer.reset()
+        self.assertEqual(self.scorer.displayed_points, 0.0)
 
 
 class TestCurriculum(unittest.TestCase):
@@ -270,5 +336,39 @@ class TestStoryEngine(unittest.TestCase):
         self.assertGreater(len(dialogue), 0)
 
 
+
+class TestFixedStepClock(unittest.TestCase):
+    """Test the fixed-step simulation clock."""
+    
+    def test_ticks_independent_of_frame_rate(self):
+        """Test that the same elapsed time gives the same ticks at any frame rate."""
+        slow, fast = FixedStepClock(16), FixedStepClock(16)
+        slow_ticks = sum(slow.advance(1 / 32) for _ in range(32))
+        fast_ticks = sum(fast.advance(1 / 128) for _ in range(128))
+        self.assertEqual(slow_ticks, 16)
+        self.assertEqual(fast_ticks, 16)
+        
+    def test_alpha(self):
+        """Test the interpolation fraction between ticks."""
+        clock = FixedStepClock(10)
+        self.assertEqual(clock.advance(0.25), 2)
+        self.assertAlmostEqual(clock.alpha, 0.5)
+        
+    def test_stall_is_capped(self):
+        """Test that a long stall does not run an unbounded number of ticks."""
+        clock = FixedStepClock(60, max_ticks_per_frame=5)
+        self.assertEqual(clock.advance(10.0), 5)
+        self.assertEqual(clock.advance(0.0), 0)
+        
+    def test_sandbox_tick(self):
+        """Test that the sandbox walking animation is driven by ticks."""
+        sandbox = SandboxMode()
+        sandbox.toggle_animation()
+        for _ in range(4):
+            sandbox.tick()
+        member = sandbox.band_api.get_member(0)
+        self.assertEqual(member.step_phase, 4 / 8)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
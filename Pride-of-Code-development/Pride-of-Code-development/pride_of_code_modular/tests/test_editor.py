@@ -0,0 +1,652 @@
+"""
+Test Editor - Unit tests for the code editor.
+
+This module contains unit tests for the editor's lexer and buffer handling.
+"""
+
+import unittest
+import random
+import time
+import ast
+import shutil
+import tempfile
+import pygame
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ui.editor import CodeEditor
+from ui.lexer import IncrementalLexer, lex_line
+from ui.syntax_checker import check_source
+from ui.text_buffer import LineBuffer
+from ui.autocomplete import PrefixTrie, CompletionIndex
+from ui.search import SearchIndex
+from ui.workspace import Workspace
+
+
+def full_lex(lines):
+    """Lex a whole buffer from scratch."""
+    state = None
+    result = []
+    for line in lines:
+        spans, state = lex_line(line, state)
+        result.append(spans)
+    return result
+
+
+class TestLexer(unittest.TestCase):
+    """Test the incremental lexer."""
+    
+    def test_triple_quoted_string_spans_lines(self):
+        """Test that triple-quoted strings carry state across lines."""
+        spans, state = lex_line('doc = """start', None)
+        self.assertEqual(state, '"""')
+        self.assertEqual(spans[-1], ('"""start', 'string'))
+        spans, state = lex_line('still inside', state)
+        self.assertEqual(spans, [('still inside', 'string')])
+        spans, state = lex_line('end""" + x', state)
+        self.assertIsNone(state)
+        self.assertEqual(spans[0], ('end"""', 'string'))
+        
+    def test_keywords_and_builtins(self):
+        """Test keyword, builtin and call highlighting."""
+        spans = dict((text, kind) for text, kind in lex_line('for i in range(n): band.turn(x)')[0])
+        self.assertEqual(spans['for'], 'keyword')
+        self.assertEqual(spans['range'], 'function')
+        self.assertEqual(spans['turn'], 'function')
+        self.assertEqual(spans['n'], 'text')
+        
+    def test_edit_relexes_until_convergence(self):
+        """Test that an edit only re-tokenizes the lines it affects."""
+        lines = [f"x{i} = {i}" for i in range(1000)]
+        lexer = IncrementalLexer()
+        lexer.line_spans(lines, 999)
+        before = list(lexer.entries)
+        
+        lines[10] = "x10 = 'changed'"
+        lexer.lines_changed(10, 1, 1)
+        lexer.line_spans(lines, 999)
+        changed = [i for i, (a, b) in enumerate(zip(before, lexer.entries)) if a is not b]
+        self.assertEqual(changed, [10])
+        
+    def test_state_change_propagates(self):
+        """Test that opening a string re-tokenizes the following lines."""
+        lines = ['a = 1', 'b = 2', 'c = 3']
+        lexer = IncrementalLexer()
+        lexer.line_spans(lines, 2)
+        lines[0] = 'a = """'
+        lexer.lines_changed(0, 1, 1)
+        self.assertEqual(lexer.line_spans(lines, 2), [('c = 3', 'string')])
+        
+    def test_random_edits_match_full_lex(self):
+        """Test that the cache always agrees with lexing from scratch."""
+        rng = random.Random(7)
+        pieces = ['x = 1', '"""', "s = '''", "'''", 'def f():', '# note', '']
+        lines = [rng.choice(pieces) for _ in range(60)]
+        lexer = IncrementalLexer()
+        for _ in range(300):
+            first = rng.randrange(len(lines))
+            removed = rng.randint(0, min(3, len(lines) - first - 1))
+            added = [rng.choice(pieces) for _ in range(rng.randint(1, 3))]
+            lines[first:first + removed] = added
+            lexer.lines_changed(first, removed, len(added))
+            index = rng.randrange(len(lines))
+            self.assertEqual(lexer.line_spans(lines, index), full_lex(lines)[index])
+
+
+class TestLineBuffer(unittest.TestCase):
+    """Test the chunked line buffer."""
+    
+    def test_random_splices_match_list(self):
+        """Test that the buffer always agrees with a plain list."""
+        rng = random.Random(11)
+        expected = [f"line {i}" for i in range(50)]
+        buffer = LineBuffer(expected, chunk_size=4)
+        for step in range(500):
+            first = rng.randint(0, len(expected))
+            removed = rng.randint(0, min(12, len(expected) - first))
+            added = [f"new {step}.{k}" for k in range(rng.choice([0, 1, 1, 2, 15]))]
+            expected[first:first + removed] = added
+            buffer.replace(first, removed, added)
+            self.assertEqual(len(buffer), len(expected))
+            if expected:
+                index = rng.randrange(len(expected))
+                self.assertEqual(buffer[index], expected[index])
+                buffer[index] = expected[index] = 'set'
+        self.assertEqual(list(buffer), expected)
+        self.assertEqual(buffer[3:17], expected[3:17])
+        self.assertTrue(all(len(chunk) <= 8 for chunk in buffer._chunks))
+        
+    def test_large_paste_stays_chunked(self):
+        """Test that pasting a long script only splices the touched chunks."""
+        pygame.init()
+        editor = CodeEditor(pygame.Rect(0, 0, 400, 300), lines=[f"x{i} = {i}" for i in range(10000)])
+        editor._use_scrap = False
+        editor._clipboard = '\n'.join(f"band.step({i})" for i in range(10000))
+        editor.cursor = [5000, 0]
+        editor.paste()
+        self.assertEqual(len(editor.lines), 19999)
+        self.assertEqual(editor.lines[5000], 'band.step(0)')
+        self.assertEqual(editor.lines[14999], 'band.step(9999)x5000 = 5000')
+        self.assertTrue(all(len(chunk) <= 2 * editor.lines.chunk_size for chunk in editor.lines._chunks))
+        editor.undo()
+        self.assertEqual(len(editor.lines), 10000)
+        self.assertEqual(editor.lines[5000], 'x5000 = 5000')
+
+
+class TestEditorBuffer(unittest.TestCase):
+    """Test editing through the CodeEditor."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        pygame.init()
+        self.editor = CodeEditor(pygame.Rect(0, 0, 400, 300), lines=['a = 1', 'b = 2'])
+        self.surface = pygame.Surface((400, 300))
+        
+    def test_highlighting_follows_edits(self):
+        """Test that drawing after edits uses up-to-date tokens."""
+        self.editor.draw(self.surface)
+        self.editor.cursor = [0, 0]
+        self.editor.insert_text('"""')
+        self.editor.draw(self.surface)
+        self.assertEqual(self.editor.lexer.line_spans(self.editor.lines, 1), [('b = 2', 'string')])
+        
+    def test_assigning_lines_resets_cache(self):
+        """Test that replacing the buffer drops stale tokens."""
+        self.editor.draw(self.surface)
+        self.editor.lines = ['if True:', '    pass', 'x = 3']
+        self.editor.draw(self.surface)
+        self.assertEqual(self.editor.lexer.line_spans(self.editor.lines, 0)[0], ('if', 'keyword'))
+
+        
+    def test_line_surfaces_are_cached(self):
+        """Test that redrawing an unchanged buffer reuses line surfaces."""
+        self.editor.draw(self.surface)
+        cached = dict(self.editor._line_surfaces)
+        self.editor.move_cursor(1, 0)
+        self.editor.draw(self.surface)
+        self.assertEqual(dict(self.editor._line_surfaces), cached)
+        
+        # Editing a line renders only that line again
+        self.editor.cursor = [0, 5]
+        self.editor.insert_text('0')
+        self.editor.draw(self.surface)
+        self.assertEqual(len(self.editor._line_surfaces), len(cached) + 1)
+        self.assertIn(('a = 10', None), self.editor._line_surfaces)
+        
+    def test_column_offsets_match_font(self):
+        """Test column/pixel mapping for proportional fonts."""
+        text = 'band.move_to(Wii, 10)'
+        self.editor.draw(self.surface)
+        if self.editor._advance is None:
+            for col in range(len(text) + 1):
+                self.assertEqual(self.editor._col_to_x(text, col), self.editor.font.size(text[:col])[0])
+        for col in range(len(text) + 1):
+            x = self.editor._col_to_x(text, col)
+            self.assertEqual(self.editor._x_to_col(text, x), col)
+        self.assertEqual(self.editor._x_to_col(text, -50), 0)
+        self.assertEqual(self.editor._x_to_col(text, 10 ** 6), len(text))
+        
+    def test_monospace_uses_fixed_advance(self):
+        """Test that a fixed advance replaces per-line offsets."""
+        self.editor.draw(self.surface)
+        self.editor._advance = 10
+        self.assertEqual(self.editor._col_to_x('abcdef', 4), 40)
+        self.assertEqual(self.editor._x_to_col('abcdef', 24), 2)
+        self.assertEqual(self.editor._x_to_col('abcdef', 26), 3)
+        self.assertEqual(self.editor._x_to_col('abcdef', 500), 6)
+        self.editor._line_offsets.clear()
+        self.editor.draw(self.surface)
+        self.assertEqual(len(self.editor._line_offsets), 0)
+        
+    def test_click_sets_cursor_column(self):
+        """Test that clicking in a line places the cursor at the nearest column."""
+        self.editor.draw(self.surface)
+        x = self.editor.rect.x + self.editor.gutter_width + 6 + self.editor._col_to_x('b = 2', 4)
+        y = self.editor.rect.y + self.editor.font.get_linesize() + 2
+        self.editor.handle_event(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(x + 1, y), button=1))
+        self.assertEqual(self.editor.cursor, [1, 4])
+
+
+class TestUndoRedo(unittest.TestCase):
+    """Test the editor's operation-based undo log."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        pygame.init()
+        self.editor = CodeEditor(pygame.Rect(0, 0, 400, 300), lines=['def f():', '    return 1'])
+        
+    def type(self, text):
+        """Type text one key at a time."""
+        for ch in text:
+            if ch == '\n':
+                self.editor.new_line()
+            else:
+                self.editor.insert_text(ch)
+        
+    def test_typing_is_one_step_per_word(self):
+        """Test that consecutive keystrokes merge into one undo step."""
+        self.editor.cursor = [1, 12]
+        self.type(' + 20')
+        self.assertEqual(self.editor.lines[1], '    return 1 + 20')
+        self.assertEqual(len(self.editor.undo_stack), 2)
+        self.editor.undo()
+        self.assertEqual(self.editor.lines[1], '    return 1 +')
+        self.editor.undo()
+        self.assertEqual(self.editor.lines[1], '    return 1')
+        self.assertEqual(self.editor.cursor, [1, 12])
+        
+    def test_undo_redo_round_trip(self):
+        """Test that every step undoes and redoes to the same text."""
+        original = list(self.editor.lines)
+        self.editor.cursor = [0, 8]
+        self.type('\nx = 1\n')
+        self.editor.backspace()
+        self.editor.backspace()
+        self.editor.selection = ((0, 4), (1, 5))
+        self.editor.insert_text('g')
+        self.editor._indent_selection()
+        self.editor.delete()
+        edited = list(self.editor.lines)
+        
+        steps = len(self.editor.undo_stack)
+        for _ in range(steps):
+            self.editor.undo()
+        self.assertEqual(self.editor.lines, original)
+        for _ in range(steps):
+            self.editor.redo()
+        self.assertEqual(self.editor.lines, edited)
+        
+    def test_memory_follows_edit_size(self):
+        """Test that the log stores edits, not copies of the buffer."""
+        self.editor.lines = [f"x{i} = {i}" for i in range(2000)]
+        for i in range(100):
+            self.editor.cursor = [i * 10, 0]
+            self.editor.insert_text('#')
+        stored = sum(len(text) for group in self.editor.undo_stack for _, _, _, text in group.ops)
+        self.assertEqual(stored, 100)
+        
+        editor = CodeEditor(pygame.Rect(0, 0, 400, 300), lines=['a'], max_undos=3)
+        for i in range(10):
+            editor.cursor = [0, 0]
+            editor.new_line()
+        self.assertEqual(len(editor.undo_stack), 3)
+        
+    def test_paste_and_copy_use_real_newlines(self):
+        """Test multi-line clipboard round trips."""
+        self.editor._use_scrap = False
+        self.editor.selection = ((0, 4), (1, 4))
+        self.editor.copy()
+        self.assertEqual(self.editor._clipboard, 'f():\n    ')
+        self.editor._clipboard = 'a\r\nb\nc'
+        self.editor.cursor = [1, 4]
+        self.editor.selection = None
+        self.editor.paste()
+        self.assertEqual(self.editor.lines, ['def f():', '    a', 'b', 'creturn 1'])
+        self.assertEqual(self.editor.cursor, [3, 1])
+        self.editor.undo()
+        self.assertEqual(self.editor.lines, ['def f():', '    return 1'])
+
+
+class TestSyntaxChecking(unittest.TestCase):
+    """Test background syntax and lint checking."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        pygame.init()
+        self.editor = CodeEditor(pygame.Rect(0, 0, 400, 300), lines=['a = 1', 'b = 2'])
+        self.editor.syntax_delay = 0.0
+        self.surface = pygame.Surface((400, 300))
+        
+    def test_check_source_reports_line(self):
+        """Test errors and warnings on multi-line code."""
+        info = check_source('x = 1\ny = (\n')
+        self.assertEqual(info['error']['line'], 1)
+        self.assertIsNone(info['tree'])
+        
+        # Rejected by the compiler rather than the parser
+        info = check_source('x = 1\nreturn x')
+        self.assertEqual(info['error']['line'], 1)
+        
+        info = check_source('x = 1\nif x is 1:\n    pass')
+        self.assertIsNone(info['error'])
+        self.assertEqual(info['warnings'][0][0], 1)
+        self.assertIsNotNone(info['tree'])
+        
+    def test_editing_checks_in_background(self):
+        """Test that an edit is checked once the worker reports back."""
+        self.editor.cursor = [1, 5]
+        self.editor.insert_text('(')
+        self.assertIsNone(self.editor.syntax_error)
+        self.editor.draw(self.surface)
+        self.assertTrue(self.editor.syntax_checker.wait())
+        self.editor.draw(self.surface)
+        self.assertEqual(self.editor.syntax_error['line'], 1)
+        
+        self.editor.backspace()
+        self.editor.draw(self.surface)
+        self.assertTrue(self.editor.syntax_checker.wait())
+        self.editor.draw(self.surface)
+        self.assertIsNone(self.editor.syntax_error)
+        self.assertIsNotNone(self.editor.syntax_tree)
+        
+    def test_stale_results_are_dropped(self):
+        """Test that a result for an older buffer version is ignored."""
+        self.editor.cursor = [0, 5]
+        self.editor.insert_text(' +')
+        self.editor.draw(self.surface)
+        self.assertTrue(self.editor.syntax_checker.wait())
+        
+        # Fixed again before the broken version's result was applied
+        self.editor.backspace()
+        self.editor.backspace()
+        self.editor.draw(self.surface)
+        self.assertIsNone(self.editor.syntax_error)
+        
+    def test_diagnostics_shown_inline(self):
+        """Test that static analysis results reach the editor."""
+        self.editor.lines = ['a = 1', 'band.form_cirle(brass, 50, 26, 5)', 'print(b)']
+        self.editor.draw(self.surface)
+        self.assertTrue(self.editor.syntax_checker.wait())
+        self.editor.draw(self.surface)
+        self.assertEqual([d['line'] for d in self.editor.diagnostics], [1, 2])
+        self.editor.cursor = [2, 0]
+        self.editor.draw(self.surface)
+        self.assertTrue(self.editor._info_surface[0].startswith("Line 3: Name 'b' is not defined"))
+        
+    def test_typing_waits_for_pause(self):
+        """Test that no check runs while the user keeps typing."""
+        self.editor.syntax_delay = 60.0
+        self.editor.lines = [f"x{i} = {i}" for i in range(5000)]
+        self.editor.cursor = [2500, 0]
+        for ch in 'abc(':
+            self.editor.insert_text(ch)
+            self.editor.draw(self.surface)
+        self.assertFalse(self.editor.syntax_checker.busy)
+        self.assertIsNone(self.editor.syntax_error)
+        
+        # An explicit check still runs synchronously
+        ok, msg = self.editor.check_syntax()
+        self.assertFalse(ok)
+        self.assertEqual(self.editor.syntax_error['line'], 2500)
+
+
+class TestSearch(unittest.TestCase):
+    """Test find and replace."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        pygame.init()
+        self.editor = CodeEditor(pygame.Rect(0, 0, 400, 300), lines=[
+            'band.move_to(m1, 10, 20)',
+            'x = 1',
+            'band.move_to(m2, 30, 40)',
+        ])
+        
+    def key(self, key, mod=0):
+        """Send a key press with the given modifiers held."""
+        pygame.key.set_mods(mod)
+        self.editor.handle_event(pygame.event.Event(pygame.KEYDOWN, key=key, mod=mod, unicode=''))
+        pygame.key.set_mods(0)
+        
+    def test_index_rescans_only_edited_lines(self):
+        """Test that an edit only drops the matches of changed lines."""
+        lines = [f"step({i})" for i in range(100)]
+        index = SearchIndex()
+        index.set_pattern('step')
+        self.assertEqual(index.count(lines), 100)
+        before = list(index.matches)
+        lines[50] = 'turn(50)'
+        index.lines_changed(50, 1, 1)
+        self.assertEqual(index.count(lines), 99)
+        changed = [i for i, (a, b) in enumerate(zip(before, index.matches)) if a is not b]
+        self.assertEqual(changed, [50])
+        
+    def test_find_wraps_and_skips_empty_matches(self):
+        """Test forward, backward and wrapping searches."""
+        lines = ['ab ab', 'cd', 'ab']
+        index = SearchIndex()
+        index.set_pattern('ab')
+        self.assertEqual(index.find(lines, 0, 1), (0, 3, 5))
+        self.assertEqual(index.find(lines, 2, 2), (0, 0, 2))
+        self.assertEqual(index.find(lines, 0, 3, backwards=True), (0, 0, 2))
+        self.assertEqual(index.find(lines, 0, 0, backwards=True), (2, 0, 2))
+        index.set_pattern('x*', regex=True)
+        self.assertIsNone(index.find(lines, 0, 0))
+        index.set_pattern('(', regex=True)
+        self.assertIsNotNone(index.error)
+        
+    def test_incremental_find(self):
+        """Test typing into the find bar and stepping through matches."""
+        self.key(pygame.K_f, pygame.KMOD_CTRL)
+        self.assertEqual(self.editor.find_mode, 'find')
+        for ch in 'm2':
+            self.editor.handle_event(pygame.event.Event(pygame.TEXTINPUT, text=ch))
+        self.assertEqual(self.editor.selection, ((2, 13), (2, 15)))
+        self.assertEqual(self.editor.lines[0], 'band.move_to(m1, 10, 20)')
+        
+        # Searching again from where the bar was opened
+        self.key(pygame.K_BACKSPACE)
+        self.assertEqual(self.editor.selection, ((0, 5), (0, 6)))
+        self.key(pygame.K_RETURN)
+        self.assertEqual(self.editor.selection, ((0, 13), (0, 14)))
+        self.key(pygame.K_RETURN, pygame.KMOD_SHIFT)
+        self.assertEqual(self.editor.selection, ((0, 5), (0, 6)))
+        self.editor.draw(pygame.Surface((400, 300)))
+        self.assertIn('4 matches', self.editor._find_surface[0])
+        self.key(pygame.K_ESCAPE)
+        self.assertIsNone(self.editor.find_mode)
+        
+    def test_replace_current_and_all(self):
+        """Test replacing one match, then all of them as one undo step."""
+        self.key(pygame.K_e, pygame.KMOD_CTRL)
+        self.editor.find_text = r'move_to\((\w+)'
+        self.editor.find_regex = True
+        self.editor._update_search()
+        self.editor.find_field = 'replace'
+        self.editor.replace_text = r'move_to(\1_new'
+        self.editor.replace_current()
+        self.assertEqual(self.editor.lines[0], 'band.move_to(m1_new, 10, 20)')
+        self.assertEqual(self.editor.selection, ((2, 5), (2, 15)))
+        self.editor.undo()
+        
+        steps = len(self.editor.undo_stack)
+        self.assertEqual(self.editor.replace_all(), 2)
+        self.assertEqual(self.editor.lines[2], 'band.move_to(m2_new, 30, 40)')
+        self.assertEqual(len(self.editor.undo_stack), steps + 1)
+        self.editor.undo()
+        self.assertEqual(self.editor.lines[0], 'band.move_to(m1, 10, 20)')
+        self.assertEqual(self.editor.lines[2], 'band.move_to(m2, 30, 40)')
+        
+    def test_replace_all_large_buffer(self):
+        """Test replace-all over many lines keeps caches consistent."""
+        self.editor.lines = [f"band.turn(m{i}, 'left')" for i in range(3000)]
+        self.editor.open_find('replace')
+        self.editor.find_text = 'left'
+        self.editor._update_search()
+        self.editor.replace_text = 'right'
+        self.assertEqual(self.editor.replace_all(), 3000)
+        self.assertEqual(self.editor.search.count(self.editor.lines), 0)
+        self.assertEqual(self.editor.lexer.line_spans(self.editor.lines, 2999)[-2], ("'right'", 'string'))
+        self.editor.undo()
+        self.assertEqual(self.editor.lines[1500], "band.turn(m1500, 'left')")
+        self.assertEqual(self.editor.search.count(self.editor.lines), 3000)
+
+
+class TestAutocomplete(unittest.TestCase):
+    """Test completion sources and the editor popup."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        pygame.init()
+        self.index = CompletionIndex()
+        
+    def test_trie_add_remove(self):
+        """Test sorted prefix lookups as words come and go."""
+        trie = PrefixTrie(['form_line', 'form_circle', 'form_block', 'formation'])
+        self.assertEqual(trie.complete('form_'), ['form_block', 'form_circle', 'form_line'])
+        self.assertEqual(trie.complete('form', limit=2), ['form_block', 'form_circle'])
+        trie.add('formation')
+        trie.remove('formation')
+        self.assertIn('formation', trie)
+        trie.remove('formation')
+        self.assertNotIn('formation', trie)
+        self.assertNotIn('a', trie.root.children['f'].children['o'].children['r'].children['m'].children)
+        self.assertEqual(len(trie), 3)
+        
+    def test_sources_by_context(self):
+        """Test API methods, member attributes, globals and section names."""
+        self.assertEqual(self.index.complete('form_c', owner='band'), ['form_circle'])
+        self.assertIn('section', self.index.complete('se', owner='m'))
+        self.assertEqual(self.index.complete('woo'), ['woodwind'])
+        self.assertEqual(self.index.complete('perc', in_string=True), ['percussion'])
+        self.assertNotIn('open', self.index.complete('op'))
+        
+    def test_buffer_symbols_follow_edits(self):
+        """Test that buffer symbols are added and removed incrementally."""
+        self.index.update_symbols(ast.parse('def wedge(size):\n    spacing = 2'))
+        self.assertEqual(self.index.complete('wed'), ['wedge'])
+        self.assertEqual(self.index.complete('spa'), ['spacing'])
+        self.index.update_symbols(ast.parse('def wedge_two(size):\n    pass'))
+        self.assertEqual(self.index.complete('wed'), ['wedge_two'])
+        self.assertEqual(self.index.complete('spa'), [])
+        
+    def test_editor_popup(self):
+        """Test opening, navigating and accepting the popup."""
+        editor = CodeEditor(pygame.Rect(0, 0, 400, 300), lines=[''])
+        for ch in 'band.form_':
+            editor.insert_text(ch)
+        self.assertEqual(editor.completion_items, ['form_block', 'form_circle', 'form_line'])
+        editor.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_DOWN, mod=0, unicode=''))
+        editor.draw(pygame.Surface((400, 300)))
+        editor.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_TAB, mod=0, unicode=''))
+        self.assertEqual(editor.lines[0], 'band.form_circle')
+        self.assertEqual(editor.completion_items, [])
+        
+        editor.insert_text("(brass, 'gu")
+        self.assertEqual(editor.completion_items, ['guard'])
+        editor.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_ESCAPE, mod=0, unicode=''))
+        self.assertEqual(editor.completion_items, [])
+        self.assertEqual(editor.lines[0], "band.form_circle(brass, 'gu")
+        
+    @unittest.skipUnless(os.environ.get('PRIDE_BENCHMARK'), "set PRIDE_BENCHMARK=1 to run")
+    def test_lookup_cost(self):
+        """Benchmark: report completion lookup time with many buffer symbols."""
+        source = '\n'.join(f"marcher_{i} = {i}" for i in range(10000))
+        self.index.update_symbols(ast.parse(source))
+        lookups = 1000
+        start = time.perf_counter()
+        for i in range(lookups):
+            self.index.complete('marcher_' + str(i % 10))
+        elapsed = (time.perf_counter() - start) / lookups * 1e6
+        print(f"\nCompletionIndex.complete: {elapsed:.1f} us per lookup (10,000 symbols)")
+
+
+class TestWorkspace(unittest.TestCase):
+    """Test tabs, lazy loading, background saves and cache eviction."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        pygame.init()
+        self.folder = tempfile.mkdtemp()
+        for i in range(3):
+            with open(os.path.join(self.folder, f"student_{i}.py"), 'w', newline='') as f:
+                f.write(f"band.form_line({i})\r\nx = {i}\r\n")
+        self.workspace = Workspace(pygame.Rect(0, 0, 400, 300))
+        self.surface = pygame.Surface((400, 300))
+        
+    def tearDown(self):
+        """Remove the temporary folder."""
+        shutil.rmtree(self.folder)
+        
+    def test_folder_opens_lazily(self):
+        """Test that only the shown tab reads its file."""
+        self.assertEqual(self.workspace.open_folder(self.folder), 3)
+        self.assertEqual([t.title for t in self.workspace.tabs], ['student_0.py', 'student_1.py', 'student_2.py'])
+        self.assertEqual([t.loaded for t in self.workspace.tabs], [True, False, False])
+        self.assertEqual(list(self.workspace.editor.lines), ['band.form_line(0)', 'x = 0', ''])
+        
+        # Opening an already open file shows its tab
+        self.assertEqual(self.workspace.open_file(os.path.join(self.folder, 'student_2.py')), 2)
+        self.assertEqual(len(self.workspace.tabs), 3)
+        self.assertTrue(self.workspace.tabs[2].loaded)
+        self.assertEqual(self.workspace.open_folder(self.folder), 0)
+        
+    def test_save_is_atomic_and_keeps_line_endings(self):
+        """Test that Ctrl+S writes in the background and clears the modified mark."""
+        self.workspace.open_folder(self.folder)
+        tab = self.workspace.tabs[0]
+        editor = self.workspace.editor
+        editor.cursor = [1, 5]
+        editor.insert_text('0')
+        self.assertTrue(tab.modified)
+        editor.on_save_requested()
+        self.assertTrue(self.workspace.saver.wait())
+        self.workspace.poll()
+        self.assertFalse(tab.modified)
+        self.assertEqual(self.workspace.status, 'Saved student_0.py')
+        with open(tab.path, newline='') as f:
+            self.assertEqual(f.read(), "band.form_line(0)\r\nx = 00\r\n")
+        # No temporary files are left behind
+        self.assertEqual(sorted(os.listdir(self.folder)), ['student_0.py', 'student_1.py', 'student_2.py'])
+        
+    def test_save_error_is_reported(self):
+        """Test that a failed write leaves the tab modified."""
+        self.workspace.open_folder(self.folder)
+        tab = self.workspace.tabs[0]
+        self.workspace.editor.insert_text('y = 1')
+        tab.path = os.path.join(self.folder, 'missing', 'student_0.py')
+        self.workspace.save()
+        self.assertTrue(self.workspace.saver.wait())
+        self.workspace.poll()
+        self.assertTrue(tab.modified)
+        self.assertTrue(self.workspace.status.startswith('Could not save'))
+        
+    def test_inactive_caches_evicted_over_budget(self):
+        """Test that least recently shown tabs lose their caches first."""
+        self.workspace.open_folder(self.folder)
+        for i in range(3):
+            self.workspace.activate(i)
+            self.workspace.draw(self.surface)
+        sizes = [t.editor.cache_size() for t in self.workspace.tabs]
+        self.assertTrue(all(sizes))
+        
+        # Room for two tabs' caches: the oldest one goes
+        self.workspace.memory_budget = sizes[1] + sizes[2]
+        self.workspace.activate(1)
+        self.assertEqual([t.editor.cache_size() > 0 for t in self.workspace.tabs], [False, True, True])
+        
+        # An evicted tab redraws from its text, undo history intact
+        self.workspace.memory_budget = 0
+        self.workspace.activate(0)
+        self.workspace.draw(self.surface)
+        self.assertEqual([t.editor.cache_size() > 0 for t in self.workspace.tabs], [True, False, False])
+        self.assertEqual(self.workspace.editor.lexer.line_spans(self.workspace.editor.lines, 1)[0], ('x', 'text'))
+        
+    def test_close_tab(self):
+        """Test that closing the shown tab shows its neighbour."""
+        self.workspace.open_folder(self.folder)
+        self.workspace.activate(1)
+        self.workspace.close_tab(1)
+        self.assertEqual(self.workspace.tabs[self.workspace.active].title, 'student_2.py')
+        self.workspace.close_tab(0)
+        self.assertEqual(self.workspace.active, 0)
+        self.workspace.close_tab(0)
+        self.assertIsNone(self.workspace.editor)
+        
+    @unittest.skipUnless(os.environ.get('PRIDE_BENCHMARK'), "set PRIDE_BENCHMARK=1 to run")
+    def test_open_folder_cost(self):
+        """Benchmark: report the time to open a folder of 200 student files."""
+        for i in range(200):
+            with open(os.path.join(self.folder, f"class_{i:03}.py"), 'w') as f:
+                f.write('band.form_line(0)\n' * 100)
+        start = time.perf_counter()
+        self.workspace.open_folder(self.folder)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"\nWorkspace.open_folder: {elapsed:.1f} ms for {len(self.workspace.tabs)} files")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,758 @@
+"""
+Test Gameplay - Unit tests for gameplay analysis and grading.
+
+This module contains unit tests for checking and grading student code.
+"""
+
+import unittest
+import ast
+import datetime
+import itertools
+import json
+import math
+import random
+import shutil
+import tempfile
+import timeit
+import pygame
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gameplay.code_analysis import CodeAnalyzer
+from gameplay.formations import fit_line, fit_circle, fit_block, recognize
+from gameplay.band_api import BandAPI
+from gameplay.challenges import ChallengeMode
+from gameplay.grading import ChallengeGrader
+from gameplay.code_metrics import MetricsCache, code_hash, measure
+from gameplay.similarity import compare, hungarian
+from gameplay.leaderboard import LeaderboardStore
+from gameplay.validators import FormationValidator
+from gameplay.level_manager import LevelManager
+from gameplay.code_executor import CodeExecutor
+from gameplay.daily_challenges import DailyChallenges, generate_challenge, term_start
+from gameplay.run_records import RunLog, make_record, read_records, verify_record, verify_records
+
+
+class TestCodeAnalysis(unittest.TestCase):
+    """Test static analysis of student code."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.analyzer = CodeAnalyzer()
+        
+    def messages(self, source):
+        """Analyze source and return (line, message) pairs."""
+        return [(d['line'], d['msg']) for d in self.analyzer.analyze(ast.parse(source))]
+        
+    def test_clean_code_has_no_diagnostics(self):
+        """Test that valid band code passes."""
+        source = (
+            "def arc(section, radius=5):\n"
+            "    band.form_circle(section, 50, 26, radius)\n"
+            "for i, m in enumerate(members):\n"
+            "    band.move_to(m, i * 2, 10)\n"
+            "arc(brass)\n"
+            "squares = [x * x for x in range(4)]\n"
+            "print(len(squares))\n"
+        )
+        self.assertEqual(self.messages(source), [])
+        
+    def test_undefined_names(self):
+        """Test names resolved against the executor namespace and scopes."""
+        source = (
+            "def wedge(size):\n"
+            "    return size + spacing\n"
+            "band.form_line(woodwinds, 0, 0, 10, 0)\n"
+        )
+        self.assertEqual(self.messages(source), [
+            (1, "Name 'spacing' is not defined"),
+            (2, "Name 'woodwinds' is not defined"),
+        ])
+        
+    def test_band_call_signatures(self):
+        """Test unknown commands and wrong arguments."""
+        source = (
+            "band.form_cirle(brass, 50, 26, 5)\n"
+            "band.form_circle(brass, 50, 26)\n"
+            "band.turn(members[0], direction='left')\n"
+            "band.next_set(8, 4)\n"
+        )
+        messages = self.messages(source)
+        self.assertEqual(len(messages), 3)
+        self.assertIn('did you mean band.form_circle', messages[0][1])
+        self.assertIn("missing a required argument: 'radius'", messages[1][1])
+        self.assertEqual(messages[2][0], 3)
+        
+    def test_unchanged_functions_are_reused(self):
+        """Test that only edited functions are analyzed again."""
+        functions = [f"def f{i}(x):\n    return x + y{i}\n" for i in range(5)]
+        self.analyzer.analyze(ast.parse(''.join(functions)))
+        self.analyzer.cache_hits = 0
+        
+        # Edit one function and shift the rest down a line
+        functions[2] = "def f2(x):\n    return x\n"
+        diagnostics = self.analyzer.analyze(ast.parse('\n' + ''.join(functions)))
+        self.assertEqual(self.analyzer.cache_hits, 4)
+        self.assertEqual([d['line'] for d in diagnostics], [2, 4, 8, 10])
+        self.assertEqual(diagnostics[0]['col'], 15)
+        
+        # Clean functions are cached too
+        self.analyzer.cache_hits = 0
+        self.analyzer.analyze(ast.parse('\n' + ''.join(functions)))
+        self.assertEqual(self.analyzer.cache_hits, 5)
+
+
+class TestFormations(unittest.TestCase):
+    """Test the closed-form formation recognizers."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.rng = random.Random(7)
+        self.band = BandAPI()
+        self.band.create_band(16)
+        
+    def jitter(self, points, amount):
+        """Move every point by up to `amount` yards in each direction."""
+        return [(x + self.rng.uniform(-amount, amount), y + self.rng.uniform(-amount, amount)) for x, y in points]
+        
+    def test_line_fit(self):
+        """Test total least squares on a tilted line, with and without noise."""
+        points = [(10 + 3 * i, 5 + 2 * i) for i in range(8)]
+        result = fit_line(points)
+        self.assertTrue(result['ok'])
+        self.assertAlmostEqual(result['score'], 1.0)
+        self.assertAlmostEqual(result['angle'], math.degrees(math.atan2(2, 3)))
+        self.assertTrue(fit_line(self.jitter(points, 0.2))['ok'])
+        self.assertFalse(fit_line(self.jitter(points, 3.0))['ok'])
+        self.assertFalse(fit_line([(5, 5)] * 4)['ok'])
+        
+    def test_circle_fit(self):
+        """Test the algebraic circle fit and its radius spread."""
+        points = [(50 + 12 * math.cos(a / 3), 26 + 12 * math.sin(a / 3)) for a in range(19)]
+        result = fit_circle(points)
+        self.assertTrue(result['ok'])
+        self.assertAlmostEqual(result['radius'], 12)
+        self.assertAlmostEqual(result['center'][0], 50)
+        self.assertTrue(fit_circle(self.jitter(points, 0.2))['ok'])
+        self.assertFalse(fit_circle([(i, 2 * i) for i in range(6)])['ok'])
+        # An ellipse has a clear spread of radii
+        self.assertFalse(fit_circle([(50 + 15 * math.cos(a / 3), 26 + 8 * math.sin(a / 3)) for a in range(19)])['ok'])
+        # So does a short arc, which is rejected outright
+        self.assertEqual(fit_circle(points[:4])['reason'], "members only cover part of the circle")
+        
+    def test_block_fit(self):
+        """Test lattice detection for field-aligned, partial and turned blocks."""
+        self.band.form_block(self.band.members[:10], 20, 20, 3, spacing=4)
+        result = fit_block([(m.x, m.y) for m in self.band.members[:10]])
+        self.assertTrue(result['ok'])
+        self.assertEqual((result['rows'], result['cols']), (3, 4))
+        self.assertAlmostEqual(result['spacing'][0], 4.0)
+        self.assertAlmostEqual(result['spacing'][1], 4.0)
+        
+        c, s = math.cos(0.4), math.sin(0.4)
+        turned = [(30 + 3 * (i % 6) * c - 3 * (i // 6) * s, 10 + 3 * (i % 6) * s + 3 * (i // 6) * c) for i in range(22)]
+        result = fit_block(self.jitter(turned, 0.1))
+        self.assertTrue(result['ok'])
+        self.assertAlmostEqual(result['angle'], math.degrees(0.4), delta=1.0)
+        
+        # Gaps, stacked members and lines are not blocks
+        self.assertFalse(fit_block([(x, y) for x in (0, 5, 10) for y in (0, 5, 10) if (x, y) != (5, 5)][:7])['ok'])
+        self.assertFalse(fit_block([(0, 0), (0, 0), (5, 0), (5, 5)])['ok'])
+        self.assertFalse(fit_block([(i, 0) for i in range(8)])['ok'])
+        
+    def test_recognize_band_commands(self):
+        """Test that the band API's formations are recognized as such."""
+        members = self.band.members
+        self.band.form_line(members, 10, 10, 80, 40)
+        self.assertEqual(recognize([(m.x, m.y) for m in members])['shape'], 'line')
+        self.band.form_circle(members, 50, 26, 15)
+        self.assertEqual(recognize([(m.x, m.y) for m in members])['shape'], 'circle')
+        self.band.form_block(members, 20, 10, 4)
+        self.assertEqual(recognize([(m.x, m.y) for m in members])['shape'], 'block')
+        
+    def test_challenge_and_lesson_checks(self):
+        """Test ChallengeMode's formation checks and the lesson validator."""
+        pygame.init()
+        challenges = ChallengeMode()
+        members = self.band.members
+        self.band.form_circle(members[:8], 50, 26, 10)
+        self.assertTrue(challenges._is_circle_formation(members[:8]))
+        self.assertFalse(challenges._is_line_formation(members[:8]))
+        
+        # Trumpets in a line and trombones in a circle make a complex pattern
+        for i, member in enumerate(members[:12]):
+            member.instrument = 'trumpet' if i % 2 == 0 else 'trombone'
+        self.band.form_line(members[:12:2], 10, 5, 40, 5)
+        self.band.form_circle(members[1:12:2], 60, 30, 8)
+        self.assertTrue(challenges._is_complex_pattern(members[:12]))
+        self.band.form_line(members[:12], 10, 5, 40, 5)
+        self.assertFalse(challenges._is_complex_pattern(members[:12]))
+        
+        validator = FormationValidator('line', count=3)
+        self.assertTrue(validator.validate({'band': self.band})[0])
+        self.band.move_to(members[1], 30, 30)
+        ok, message = validator.validate({'band': self.band})
+        self.assertFalse(ok)
+        self.assertIn('should form a line', message)
+        
+    @unittest.skipUnless(os.environ.get('PRIDE_BENCHMARK'), "set PRIDE_BENCHMARK=1 to run")
+    def test_fit_cost(self):
+        """Benchmark: report the time to fit each shape to 1,000 members."""
+        shapes = {
+            'line': [(i * 0.1, i * 0.05) for i in range(1000)],
+            'circle': [(50 + 20 * math.cos(i / 159.2), 26 + 20 * math.sin(i / 159.2)) for i in range(1000)],
+            'block': [(i % 40 * 2.5, i // 40 * 2.0) for i in range(1000)],
+        }
+        print()
+        for name, points in shapes.items():
+            for fit in (fit_line, fit_circle, fit_block):
+                elapsed = min(timeit.repeat(lambda: fit(points), number=20, repeat=5)) / 20 * 1000
+                print(f"{fit.__name__} on a {name} of 1,000: {elapsed:.3f} ms")
+
+
+class TestGrading(unittest.TestCase):
+    """Test grading challenges by running submissions."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        pygame.init()
+        self.challenges = {c['id']: c for c in ChallengeMode().challenges}
+        self.grader = ChallengeGrader(timeout=0.5)
+        
+    def test_solutions_are_run(self):
+        """Test that the band the code leaves behind is what gets graded."""
+        verdict = self.grader.grade(self.challenges[2], "band.form_line(members, 10, 10, 50, 10)")
+        self.assertTrue(verdict['success'])
+        self.assertEqual(verdict['fits'][0]['shape'], 'line')
+        
+        # Mentioning a band command is not enough
+        verdict = self.grader.grade(self.challenges[2], "# band.form_line\nprint('done')")
+        self.assertFalse(verdict['success'])
+        self.assertIn('off the line', verdict['message'])
+        self.assertEqual(verdict['output'], 'done\n')
+        
+        code = "band.form_line(members[::2], 10, 5, 40, 5)\nband.form_circle(members[1::2], 60, 30, 8)"
+        self.assertTrue(self.grader.grade(self.challenges[5], code)['success'])
+        
+    def test_verdict_cache(self):
+        """Test that equivalent code is graded once, and timeouts are not cached."""
+        self.assertEqual(code_hash("x = 1  # one\n"), code_hash("\nx=1\n"))
+        self.assertNotEqual(code_hash("x = 1"), code_hash("x = 2"))
+        
+        self.grader.grade(self.challenges[3], "band.form_circle(members, 50, 26, 10)")
+        verdict = self.grader.grade(self.challenges[3], "# Circle\nband.form_circle(members,50,26,10)")
+        self.assertTrue(verdict['success'])
+        self.assertEqual(self.grader.cache_hits, 1)
+        # The same code is a different submission for another challenge
+        self.grader.grade(self.challenges[2], "band.form_circle(members, 50, 26, 10)")
+        self.assertEqual(self.grader.cache_hits, 1)
+        
+        for _ in range(2):
+            verdict = self.grader.grade(self.challenges[2], "while True:\n    pass")
+            self.assertFalse(verdict['success'])
+            self.assertIn('Timeout', verdict['message'])
+        self.assertEqual(self.grader.cache_hits, 1)
+
+
+class TestCodeMetrics(unittest.TestCase):
+    """Test measuring code from its syntax tree."""
+    
+    def test_counts(self):
+        """Test statement, loop, definition and complexity counts."""
+        source = (
+            '"""Spread the band out."""\n'
+            "# comments don't count\n"
+            "def spread(group, gap):\n"
+            "    for i, m in enumerate(group):\n"
+            "        if i % 2 == 0 and gap > 0:\n"
+            "            band.move_to(m, i * gap, 10)\n"
+            "    return [m.x for m in group if m.x > 0]\n"
+            "spread(brass, 4)\n"
+        )
+        metrics = measure(ast.parse(source))
+        self.assertEqual(metrics['statements'], 6)
+        self.assertEqual(metrics['loops'], 1)
+        self.assertEqual(metrics['comprehensions'], 1)
+        self.assertEqual(metrics['functions'], 1)
+        self.assertEqual(metrics['classes'], 0)
+        # for, if, and, comprehension and its if
+        self.assertEqual(metrics['complexity'], 6)
+        self.assertEqual(metrics['loop_candidates'], [])
+        
+    def test_loop_candidates(self):
+        """Test that runs of similar calls are found, in any block."""
+        source = (
+            "band.move_to(members[0], 10, 10)\n"
+            "band.move_to(members[1], 14, 10)\n"
+            "band.move_to(members[2], 18, 10)\n"
+            "print('done')\n"
+            "if True:\n"
+            "    band.turn(members[0], 'left')\n"
+            "    band.turn(members[1], 'left')\n"
+            "    band.turn(members[2], 'left')\n"
+            "    band.turn(members[3], direction='left')\n"
+        )
+        candidates = measure(ast.parse(source))['loop_candidates']
+        self.assertEqual(candidates, [
+            {'call': 'band.move_to', 'line': 0, 'count': 3},
+            {'call': 'band.turn', 'line': 5, 'count': 3},
+        ])
+        
+    def test_memoized_by_hash(self):
+        """Test that reformatted code is measured once."""
+        cache = MetricsCache()
+        first = cache.for_code("x = 1\nprint(x)\n")
+        self.assertIs(cache.for_code("x=1   # one\n\nprint( x )"), first)
+        self.assertEqual(cache.cache_hits, 1)
+        self.assertIsNone(cache.for_code("x = ("))
+        
+    def test_scoring_uses_metrics(self):
+        """Test that graded submissions earn efficiency and creativity points."""
+        pygame.init()
+        challenges = ChallengeMode(run_log_path=None)
+        challenges.current_challenge = next(c for c in challenges.challenges if c['id'] == 1)
+        challenges.challenge_start_time = 0
+        result = challenges.submit_solution("band.move_to(member, 50, 30)")
+        self.assertTrue(result['success'])
+        self.assertEqual(result['metrics']['statements'], 1)
+        breakdown = challenges.scorer.get_score_breakdown()
+        self.assertGreater(breakdown['efficient_code'], 0)
+        self.assertGreater(breakdown['creativity'], 0)
+        # Bonuses don't count as extra streak steps
+        self.assertEqual(challenges.scorer.streak, 1)
+        
+        code = "\n".join(f"band.move_to(members[{i}], {10 + 4 * i}, 10)" for i in range(5))
+        challenges.current_challenge = next(c for c in challenges.challenges if c['id'] == 2)
+        result = challenges.submit_solution(code)
+        self.assertEqual(result['hints'], ['Line 1: 5 band.move_to calls in a row could be a loop'])
+
+
+class TestSimilarity(unittest.TestCase):
+    """Test comparing the band with a target formation."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.rng = random.Random(7)
+        self.band = BandAPI()
+        self.band.create_band(16)
+        
+    def test_hungarian_is_optimal(self):
+        """Test the assignment against every permutation of small matrices."""
+        for n in range(1, 7):
+            cost = [[self.rng.random() for _ in range(n)] for _ in range(n)]
+            assignment = hungarian(cost)
+            best = min(sum(cost[i][p[i]] for i in range(n)) for p in itertools.permutations(range(n)))
+            self.assertAlmostEqual(sum(cost[i][assignment[i]] for i in range(n)), best)
+        
+    def test_compare_with_target(self):
+        """Test errors, sections and alignment against a target block."""
+        members = self.band.members
+        self.band.form_block(members, 20, 10, 4, 4.0)
+        target = [(20 + 4.0 * (i % 4), 10 + 4.0 * (i // 4)) for i in range(16)]
+        self.rng.shuffle(target)
+        result = compare(members, target)
+        self.assertEqual(result['method'], 'hungarian')
+        self.assertAlmostEqual(result['max_error'], 0.0)
+        self.assertAlmostEqual(result['score'], 1.0)
+        
+        # One member two yards out
+        self.band.move_to(members[5], members[5].x + 2, members[5].y)
+        result = compare(members, target)
+        self.assertAlmostEqual(result['max_error'], 2.0)
+        self.assertAlmostEqual(result['mean_error'], 2.0 / 16)
+        section = members[5].section
+        self.assertAlmostEqual(result['sections'][section]['max_error'], 2.0)
+        self.assertEqual(sum(s['count'] for s in result['sections'].values()), 16)
+        self.assertLess(result['score'], 1.0)
+        self.assertGreater(result['score'], 0.9)
+        
+        # Turned, moved and resized, it only matches when aligned
+        self.band.form_circle(members[:8], 60, 30, 12)
+        circle = [(10 * math.cos(i * math.pi / 4 + 0.3), 10 * math.sin(i * math.pi / 4 + 0.3)) for i in range(8)]
+        self.assertGreater(compare(members[:8], circle)['mean_error'], 10)
+        self.assertAlmostEqual(compare(members[:8], circle, align=True, scale=True)['max_error'], 0.0)
+        self.assertAlmostEqual(compare(members[:8], circle, align=True)['max_error'], 2.0)
+        
+        self.assertFalse(compare(members[:3], circle)['ok'])
+        
+    def test_large_band_uses_grid(self):
+        """Test the grid matching on a shuffled 500-member block."""
+        band = BandAPI()
+        band.create_band(500)
+        target = [(i % 25 * 2.0, i // 25 * 2.0) for i in range(500)]
+        for member, (x, y) in zip(band.members, target):
+            member.x = x + self.rng.uniform(-0.3, 0.3)
+            member.y = y + self.rng.uniform(-0.3, 0.3)
+        self.rng.shuffle(band.members)
+        result = compare(band.members, target)
+        self.assertEqual(result['method'], 'grid')
+        self.assertLess(result['max_error'], 0.5)
+        self.assertEqual(sorted(result['assignment']), list(range(500)))
+        
+    def test_partial_credit(self):
+        """Test that a formation close to its target earns part of the points."""
+        pygame.init()
+        challenges = ChallengeMode(run_log_path=None)
+        challenges.current_challenge = next(c for c in challenges.challenges if c['id'] == 2)
+        challenges.challenge_start_time = 0
+        # Four members in a line and one a little off it
+        code = "band.form_line(members, 10, 10, 26, 10)\nband.move_to(members[2], 18, 12)"
+        result = challenges.submit_solution(code)
+        self.assertFalse(result['success'])
+        self.assertGreater(result['points'], 0)
+        self.assertLess(result['points'], challenges.current_challenge['points'] / 2)
+        self.assertEqual(challenges.scorer.streak, 0)
+        
+        result = challenges.submit_solution("band.form_line(members, 10, 10, 26, 30)")
+        self.assertTrue(result['success'])
+        self.assertAlmostEqual(result['similarity']['score'], 1.0)
+        
+    @unittest.skipUnless(os.environ.get('PRIDE_BENCHMARK'), "set PRIDE_BENCHMARK=1 to run")
+    def test_compare_cost(self):
+        """Benchmark: report the time to score formations of 64 and 500."""
+        print()
+        for n in (64, 500):
+            band = BandAPI()
+            band.create_band(n)
+            target = [(i % 20 * 2.0, i // 20 * 2.0) for i in range(n)]
+            for member, (x, y) in zip(band.members, target):
+                member.x = x + self.rng.gauss(0, 0.2) + 5
+                member.y = y + self.rng.gauss(0, 0.2)
+            for align in (False, True):
+                elapsed = min(timeit.repeat(lambda: compare(band.members, target, align=align),
+                                            number=1, repeat=5)) * 1000
+                print(f"compare {n} members (align={align}): {elapsed:.1f} ms")
+
+
+class TestLeaderboard(unittest.TestCase):
+    """Test the SQLite leaderboard store."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.store = LeaderboardStore(batch_size=3)
+        
+    def tearDown(self):
+        """Clean up after each test method."""
+        self.store.close()
+        
+    def test_boards_and_ranks(self):
+        """Test the overall, per-challenge and daily boards."""
+        self.store.add('ana', 30, 1, '2026-03-01')
+        self.store.add('ben', 50, 2, '2026-03-01')
+        self.store.add('cy', 40, 1, '2026-03-02')
+        self.store.add('ana', 45, 2, '2026-03-02')
+        self.store.add('dee', 40, 1, '2026-03-02')
+        
+        self.assertEqual([e['name'] for e in self.store.top(3)], ['ben', 'ana', 'cy'])
+        self.assertEqual([e['name'] for e in self.store.top(challenge_id=1)], ['cy', 'dee', 'ana'])
+        self.assertEqual([e['score'] for e in self.store.top(date='2026-03-02')], [45, 40, 40])
+        self.assertEqual(self.store.count(challenge_id=1, date='2026-03-02'), 2)
+        
+        # Ranked by best score; ties share a place
+        self.assertEqual(self.store.rank('ana'), 2)
+        self.assertEqual(self.store.rank('ana', challenge_id=1), 3)
+        self.assertEqual(self.store.rank('dee', challenge_id=1), 1)
+        self.assertIsNone(self.store.rank('ben', challenge_id=1))
+        
+    def test_batched_writes_persist(self):
+        """Test that buffered entries are written and survive reopening."""
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        path = os.path.join(folder, 'board.db')
+        store = LeaderboardStore(path, batch_size=10)
+        for i in range(12):
+            store.add(f'p{i}', i)
+        # The first ten went in one transaction; two are still buffered
+        self.assertEqual(store.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0], 10)
+        store.close()
+        
+        store = LeaderboardStore(path)
+        self.assertEqual(store.count(), 12)
+        self.assertEqual(store.top(1)[0]['name'], 'p11')
+        store.close()
+        
+    def test_challenge_mode_uses_store(self):
+        """Test ChallengeMode's leaderboard methods."""
+        pygame.init()
+        challenges = ChallengeMode()
+        challenges.leaderboard = self.store
+        challenges.add_to_leaderboard('ana', 20, 3)
+        challenges.add_to_leaderboard('ben', 35)
+        self.assertEqual([e['name'] for e in challenges.get_leaderboard()], ['ben', 'ana'])
+        self.assertEqual(challenges.get_player_rank('ana', challenge_id=3), 1)
+        
+    @unittest.skipUnless(os.environ.get('PRIDE_BENCHMARK'), "set PRIDE_BENCHMARK=1 to run")
+    def test_store_cost(self):
+        """Benchmark: report insert, top-k and rank times on 100,000 entries."""
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        store = LeaderboardStore(os.path.join(folder, 'board.db'))
+        rng = random.Random(3)
+        elapsed = timeit.timeit(lambda: [store.add(f'p{i}', rng.random() * 100, i % 20 + 1,
+                                                   f'2026-03-{i % 28 + 1:02d}') for i in range(100000)],
+                                number=1)
+        store.flush()
+        print(f"\ninsert 100,000 entries: {elapsed * 1000:.0f} ms")
+        checks = {
+            'top 10 overall': lambda: store.top(10),
+            'top 10 of a challenge': lambda: store.top(10, challenge_id=7),
+            'top 10 of a day': lambda: store.top(10, date='2026-03-14'),
+            'rank of a player': lambda: store.rank('p5000'),
+            'single insert': lambda: (store.add('new', 50), store.flush()),
+        }
+        for name, check in checks.items():
+            elapsed = min(timeit.repeat(check, number=20, repeat=3)) / 20 * 1000
+            print(f"{name}: {elapsed:.3f} ms")
+        store.close()
+
+
+class TestLevels(unittest.TestCase):
+    """Test levels loaded from data files."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        self.levels_dir = os.path.join(self.folder, 'levels')
+        os.mkdir(self.levels_dir)
+        self.index_path = os.path.join(self.folder, 'index.json')
+        self.executor = CodeExecutor()
+        
+    def write_level(self, spec):
+        """Write a level file named after the level's id."""
+        with open(os.path.join(self.levels_dir, spec['id'] + '.json'), 'w', encoding='utf-8') as f:
+            json.dump(spec, f)
+        
+    def run_level(self, levels, level_id, code):
+        """Run code and validate the level on the resulting namespace."""
+        self.assertTrue(self.executor.execute(code)[0])
+        return levels.validate(level_id, self.executor.namespace)
+        
+    def test_repo_levels_compile(self):
+        """Test that every shipped level file loads and compiles."""
+        levels = LevelManager(index_path=None)
+        self.assertIn('week1', levels.levels)
+        for meta in levels.list_levels():
+            level = levels.get_level(meta['id'])
+            self.assertIsNone(level.get('error'), meta['id'])
+            self.assertIsNotNone(level['validator'], meta['id'])
+        self.assertEqual(self.run_level(levels, 'week1', "brass_section = [1, 2, 3]")[0], True)
+        
+    def test_checks(self):
+        """Test required variables, constraints, formations and targets."""
+        self.write_level({
+            'id': 'lists', 'title': 'Lists',
+            'requires': {'count': 'int', 'names': 'list'},
+            'constraints': [{'expr': 'len(names) == count', 'message': 'count should match names'}],
+            'success': 'Done!',
+        })
+        self.write_level({
+            'id': 'spot', 'title': 'Spot',
+            'formation': {'shape': 'line', 'count': 2},
+            'target': {'members': 'members[:2]', 'positions': [[10, 10], [20, 10]]},
+        })
+        levels = LevelManager(self.levels_dir, self.index_path)
+        self.assertEqual(self.run_level(levels, 'lists', "names = ['a']"),
+                         (False, 'Please create a variable named count'))
+        self.assertEqual(self.run_level(levels, 'lists', "names = ['a']\ncount = 'one'"),
+                         (False, 'count should be of type int'))
+        self.assertEqual(self.run_level(levels, 'lists', "names = ['a']\ncount = 2"),
+                         (False, 'count should match names'))
+        self.assertEqual(self.run_level(levels, 'lists', "names = ['a', 'b']\ncount = 2"), (True, 'Done!'))
+        
+        ok, message = self.run_level(levels, 'spot', "band.form_line(members[:2], 20, 10, 10, 10)")
+        self.assertTrue(ok)
+        ok, message = self.run_level(levels, 'spot', "band.form_line(members[:2], 20, 12, 10, 12)")
+        self.assertFalse(ok)
+        self.assertIn('2.0 yards', message)
+        
+    def test_index_cache(self):
+        """Test that the index is reused until a level file changes."""
+        for i in range(3):
+            self.write_level({'id': f'l{i}', 'title': f'Level {i}', 'week': 3 - i})
+        levels = LevelManager(self.levels_dir, self.index_path)
+        self.assertEqual([m['id'] for m in levels.list_levels()], ['l2', 'l1', 'l0'])
+        self.assertTrue(os.path.exists(self.index_path))
+        
+        # A warm start reads titles from the index, not the files
+        with open(self.index_path, encoding='utf-8') as f:
+            index = json.load(f)
+        index['files']['l0.json']['level']['title'] = 'From the index'
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        self.assertEqual(LevelManager(self.levels_dir, self.index_path).levels['l0']['title'], 'From the index')
+        
+        # A changed file is read again
+        self.write_level({'id': 'l0', 'title': 'Renamed level', 'week': 3})
+        os.utime(os.path.join(self.levels_dir, 'l0.json'), ns=(1, 1))
+        self.assertEqual(LevelManager(self.levels_dir, self.index_path).levels['l0']['title'], 'Renamed level')
+        
+    def test_broken_level(self):
+        """Test that a level with a bad expression fails to validate, not to load."""
+        self.write_level({'id': 'bad', 'constraints': [{'expr': 'len(', 'message': '?'}]})
+        with open(os.path.join(self.levels_dir, 'junk.json'), 'w') as f:
+            f.write('{not json')
+        levels = LevelManager(self.levels_dir, self.index_path)
+        self.assertEqual(list(levels.levels), ['bad'])
+        ok, message = levels.validate('bad', {})
+        self.assertFalse(ok)
+        self.assertIn('SyntaxError', message)
+        
+    @unittest.skipUnless(os.environ.get('PRIDE_BENCHMARK'), "set PRIDE_BENCHMARK=1 to run")
+    def test_load_cost(self):
+        """Benchmark: report the time to load an index of 200 levels."""
+        for i in range(200):
+            self.write_level({'id': f'level{i}', 'title': f'Level {i}', 'week': i // 10, 'order': i % 10,
+                              'formation': {'shape': 'line'},
+                              'constraints': [{'expr': 'len(members) > 0', 'message': 'No band'}]})
+        cold = timeit.timeit(lambda: LevelManager(self.levels_dir, self.index_path), number=1)
+        warm = min(timeit.repeat(lambda: LevelManager(self.levels_dir, self.index_path), number=5, repeat=3)) / 5
+        levels = LevelManager(self.levels_dir, self.index_path)
+        compile_all = timeit.timeit(lambda: [levels.get_level(f'level{i}') for i in range(200)], number=1)
+        print(f"\n200 levels: cold index {cold * 1000:.1f} ms, warm index {warm * 1000:.1f} ms, "
+              f"compiling all {compile_all * 1000:.1f} ms")
+
+
+class TestDailyChallenges(unittest.TestCase):
+    """Test the seeded daily challenge generator and its term cache."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        self.path = os.path.join(self.folder, 'daily.json')
+        self.day = datetime.date(2026, 10, 19)
+        
+    def test_generation_is_seeded(self):
+        """Test that a date always gives the same challenge, and days differ."""
+        challenge = generate_challenge(self.day)
+        self.assertEqual(challenge, generate_challenge(self.day))
+        self.assertEqual(challenge['id'], 20261019)
+        self.assertEqual(challenge['date'], '2026-10-19')
+        week = [generate_challenge(self.day + datetime.timedelta(days=i)) for i in range(7)]
+        self.assertEqual(len({c['reference'] for c in week}), 7)
+        
+    def test_term_is_built_once(self):
+        """Test that a term is built in one batch, saved and then looked up."""
+        daily = DailyChallenges(self.path)
+        challenge = daily.get(self.day)
+        self.assertEqual(challenge, generate_challenge(self.day))
+        self.assertEqual(len(daily.challenges), 120)
+        self.assertIn(term_start(self.day).isoformat(), daily.challenges)
+        
+        # A new calendar reads the saved term instead of generating it
+        with open(self.path, encoding='utf-8') as f:
+            payload = json.load(f)
+        payload['challenges'][self.day.isoformat()]['title'] = 'From the file'
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        self.assertEqual(DailyChallenges(self.path).get(self.day)['title'], 'From the file')
+        
+    def test_submissions(self):
+        """Test grading the daily challenge in challenge mode."""
+        pygame.init()
+        mode = ChallengeMode(run_log_path=None)
+        mode.daily = DailyChallenges(None, mode.grader)
+        challenge = mode.get_daily_challenge(self.day)
+        self.assertEqual(challenge['id'], 20261019)
+        self.assertTrue(mode.submit_solution(challenge['reference'])['success'])
+        
+        # The right shape a little off its spots is only partly right
+        spots = challenge['target']['positions']
+        moved = '\n'.join(f"band.move_to(members[{i}], {x + 0.7}, {y})" for i, (x, y) in enumerate(spots))
+        result = mode.submit_solution(moved)
+        self.assertFalse(result['success'])
+        self.assertGreater(result['points'], 0)
+        
+    @unittest.skipUnless(os.environ.get('PRIDE_BENCHMARK'), "set PRIDE_BENCHMARK=1 to run")
+    def test_term_cost(self):
+        """Benchmark: report the time to build a term and to look up a day."""
+        daily = DailyChallenges(self.path)
+        build = timeit.timeit(lambda: daily.build_term(term_start(self.day)), number=1)
+        lookup = min(timeit.repeat(lambda: daily.get(self.day), number=10000, repeat=5)) / 10000
+        print(f"\nDaily challenges: {build * 1000:.1f} ms to build and check a term, "
+              f"{lookup * 1e6:.2f} us per lookup")
+
+
+class TestRunRecords(unittest.TestCase):
+    """Test recording graded runs and verifying them again."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.grader = ChallengeGrader()
+        self.challenge = generate_challenge(datetime.date(2026, 10, 19))
+        
+    def record(self, code):
+        """Grade code for the test challenge and record the run."""
+        verdict = self.grader.grade(self.challenge, code)
+        return make_record(self.challenge, code, verdict, points=10.0)
+        
+    def test_seeded_runs_repeat(self):
+        """Test that code using random lands the band in the same place every run."""
+        code = "for m in members:\n    band.move_to(m, random.randint(0, 100), random.randint(0, 50))"
+        first = self.record(code)
+        again = self.record(code + "\n")
+        self.assertEqual(first['positions_digest'], again['positions_digest'])
+        self.assertEqual(first['seed'], 20261019)
+        self.assertEqual(first['band_size'], 16)
+        self.assertTrue(verify_record(first)['ok'])
+        
+    def test_mismatches_are_flagged(self):
+        """Test that altered records and changed behavior are reported."""
+        record = self.record(self.challenge['reference'])
+        self.assertTrue(record['success'])
+        self.assertTrue(verify_record(record)['ok'])
+        
+        tampered = dict(record, score=0.5, success=False)
+        result = verify_record(tampered)
+        self.assertFalse(result['ok'])
+        self.assertEqual(result['mismatches']['score'], (0.5, record['score']))
+        self.assertEqual(set(result['mismatches']), {'score', 'success'})
+        
+        # A different band leaves the members somewhere else
+        moved = dict(record, band_size=12, executor_version=0)
+        result = verify_record(moved)
+        self.assertIn('positions_digest', result['mismatches'])
+        self.assertTrue(result['version_changed'])
+        
+    def test_log_and_pool(self):
+        """Test the run log file and verifying it in a process pool."""
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        log = RunLog(os.path.join(folder, 'runs.jsonl'))
+        good = self.record(self.challenge['reference'])
+        log.append(good)
+        log.append(dict(good, positions_digest='0' * 64))
+        with open(log.path, 'a', encoding='utf-8') as f:
+            f.write('{"cut off')
+        records = list(read_records(log.path))
+        self.assertEqual(len(records), 2)
+        results = verify_records(records, workers=2)
+        self.assertEqual([r['ok'] for r in results], [True, False])
+        
+    def test_challenge_mode_records_runs(self):
+        """Test that every submission is recorded."""
+        pygame.init()
+        challenges = ChallengeMode(run_log_path=None)
+        challenges.current_challenge = self.challenge
+        result = challenges.submit_solution(self.challenge['reference'])
+        self.assertIs(challenges.runs.last, result['record'])
+        self.assertEqual(result['record']['points'], result['points'])
+        self.assertTrue(verify_record(result['record'])['ok'])
+        
+    @unittest.skipUnless(os.environ.get('PRIDE_BENCHMARK'), "set PRIDE_BENCHMARK=1 to run")
+    def test_verify_cost(self):
+        """Benchmark: report the time to verify 400 runs in one and several processes."""
+        days = [generate_challenge(datetime.date(2026, 9, 1) + datetime.timedelta(days=i)) for i in range(400)]
+        records = [make_record(c, c['reference'], self.grader.grade(c, c['reference'])) for c in days]
+        print()
+        for workers in (1, os.cpu_count() or 1):
+            elapsed = timeit.timeit(lambda: verify_records(records, workers=workers), number=1)
+            print(f"verify_records, 400 runs, {workers} worker(s): {elapsed * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,293 @@
+"""
+Test Rendering - Unit tests for the field renderer.
+
+This module contains unit tests and microbenchmarks for the field view.
+"""
+
+import unittest
+import io
+import os
+import time
+import tempfile
+import pygame
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gameplay.band_api import BandAPI
+from gameplay.drill import Drill, DrillPlayback
+from gameplay.sandbox import SandboxMode
+from core.display import Display
+from ui.field_view import FieldView
+from ui.drill_export import export_drill
+
+
+class TestFieldView(unittest.TestCase):
+    """Test the field view renderer."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        pygame.init()
+        self.field_view = FieldView(0, 0, 600, 400)
+        self.surface = pygame.Surface((600, 400))
+        self.band_api = BandAPI()
+        self.band_api.create_band(16)
+        
+    def test_batched_transform_matches_scalar(self):
+        """Test that the array transform agrees with the per-point helpers."""
+        members = self.band_api.get_all_members()
+        xs, ys = self.field_view.yards_to_pixels([m.x for m in members], [m.y for m in members])
+        for member, px, py in zip(members, xs, ys):
+            self.assertEqual(px, self.field_view._yard_to_pixel_x(member.x))
+            self.assertEqual(py, self.field_view._yard_to_pixel_y(member.y))
+        
+        # The screen offset is folded into the same pass
+        xs, ys = self.field_view.yards_to_pixels((m.x for m in members), (m.y for m in members), (30, 40))
+        for member, px, py in zip(members, xs, ys):
+            self.assertEqual(px, self.field_view._yard_to_pixel_x(member.x) + 30)
+            self.assertEqual(py, self.field_view._yard_to_pixel_y(member.y) + 40)
+            
+    def test_sprites_are_cached(self):
+        """Test that marcher sprites are built once and reused."""
+        members = self.band_api.get_all_members()
+        self.field_view.draw(self.surface, members, members[0])
+        cached = len(self.field_view._sprite_cache)
+        self.field_view.draw(self.surface, members, members[0])
+        self.assertEqual(len(self.field_view._sprite_cache), cached)
+        self.assertLessEqual(cached, 8)  # 4 sections x (selected, unselected)
+        
+    @unittest.skipUnless(os.environ.get('PRIDE_BENCHMARK'), "set PRIDE_BENCHMARK=1 to run")
+    def test_per_marcher_draw_cost(self):
+        """Microbenchmark: report the per-marcher cost of FieldView.draw."""
+        self.band_api.create_band(512)
+        members = self.band_api.get_all_members()
+        self.field_view.show_grid = False
+        self.field_view.draw(self.surface, members)  # warm the sprite atlas
+        
+        frames = 20
+        start = time.perf_counter()
+        for _ in range(frames):
+            self.field_view.draw(self.surface, members)
+        elapsed = time.perf_counter() - start
+        
+        per_marcher_us = elapsed / (frames * len(members)) * 1e6
+        print(f"\nFieldView.draw: {per_marcher_us:.2f} us per marcher ({len(members)} marchers)")
+        
+    def test_grid_is_cached(self):
+        """Test that the grid overlay is rendered once and reused."""
+        members = self.band_api.get_all_members()
+        self.field_view.draw(self.surface, members)
+        grid = self.field_view.grid_surface
+        self.assertIsNotNone(grid)
+        self.field_view.draw(self.surface, members)
+        self.assertIs(self.field_view.grid_surface, grid)
+        
+        # Changing the step count invalidates the cache
+        self.field_view.grid_steps = 2
+        self.field_view.draw(self.surface, members)
+        self.assertIsNot(self.field_view.grid_surface, grid)
+
+
+class TestFieldOverlay(unittest.TestCase):
+    """Test marcher trails and the coverage heatmap."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        pygame.init()
+        self.field_view = FieldView(0, 0, 600, 400)
+        self.surface = pygame.Surface((600, 400))
+        self.band_api = BandAPI()
+        self.band_api.create_band(4)
+        self.members = self.band_api.get_all_members()
+        
+    def test_heat_only_for_moving_marchers(self):
+        """Test that standing marchers add no heat after their first tick."""
+        overlay = self.field_view.overlay
+        self.field_view.record_tick(self.members)
+        total = sum(overlay.heat)
+        self.field_view.record_tick(self.members)
+        self.assertEqual(sum(overlay.heat), total)
+        
+        self.band_api.move_to(self.members[0], 50, 26)
+        self.field_view.record_tick(self.members)
+        self.assertGreater(overlay.heat[26 * overlay.cols + 50], 0)
+        
+    def test_heat_surface_shares_buffer(self):
+        """Test that heat writes show up in the wrapped surface."""
+        overlay = self.field_view.overlay
+        self.band_api.move_to(self.members[0], 10, 5)
+        self.field_view.record_tick(self.members)
+        self.assertGreater(overlay.heat_surface.get_at((10, 5)).a, 0)
+        self.assertEqual(overlay.heat_surface.get_at((90, 50)).a, 0)
+        
+    def test_trails_are_bounded(self):
+        """Test that trails keep only the last N counts of ticks."""
+        overlay = self.field_view.overlay
+        for i in range(overlay.trail_length * 3):
+            self.band_api.move_to(self.members[0], i % 100, 20)
+            self.field_view.record_tick(self.members)
+        self.assertEqual(len(overlay.trails[self.members[0].id]), overlay.trail_length)
+        
+        self.field_view.show_trails = True
+        self.field_view.show_heatmap = True
+        self.field_view.draw(self.surface, self.members)
+        self.field_view.clear_overlay()
+        self.assertEqual(sum(overlay.heat), 0)
+        self.assertFalse(overlay.trails)
+
+
+class TestDisplay(unittest.TestCase):
+    """Test logical-resolution display scaling."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        pygame.display.init()
+        self.display = Display((400, 200), hardware_scaling=False)
+        
+    def tearDown(self):
+        """Clean up after each test method."""
+        pygame.display.quit()
+        
+    def resize(self, width, height):
+        self.display.handle_resize(pygame.event.Event(pygame.VIDEORESIZE, w=width, h=height))
+        
+    def test_letterbox_mapping(self):
+        """Test that window coordinates map back into the logical surface."""
+        self.resize(800, 600)  # 2x scale, 100px bars top and bottom
+        self.assertEqual(self.display.scale, 2.0)
+        self.assertEqual(self.display.viewport, pygame.Rect(0, 100, 800, 400))
+        self.assertEqual(self.display.to_logical((0, 100)), (0, 0))
+        self.assertEqual(self.display.to_logical((799, 499)), (399, 199))
+        
+    def test_translate_event(self):
+        """Test that mouse positions and motion are scaled to logical units."""
+        self.resize(800, 600)
+        ev = pygame.event.Event(pygame.MOUSEMOTION, pos=(400, 300), rel=(10, -6), buttons=(0, 0, 0))
+        logical = self.display.translate_event(ev)
+        self.assertEqual(logical.pos, (200, 100))
+        self.assertEqual(logical.rel, (5, -3))
+        key = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a)
+        self.assertIs(self.display.translate_event(key), key)
+        
+    def test_present_scales_into_viewport(self):
+        """Test that the logical frame fills the viewport and bars are cleared."""
+        self.resize(800, 600)
+        self.display.window.fill((255, 0, 0))  # stale pixels from before the resize
+        self.display.surface.fill((0, 200, 0))
+        self.display.present()
+        self.assertEqual(self.display.window.get_at((400, 300))[:3], (0, 200, 0))
+        self.assertEqual(self.display.window.get_at((400, 50))[:3], (0, 0, 0))
+        
+    @unittest.skipUnless(os.environ.get('PRIDE_BENCHMARK'), "set PRIDE_BENCHMARK=1 to run")
+    def test_present_cost(self):
+        """Benchmark: report software-scaled present() cost per window size."""
+        pygame.display.quit()
+        pygame.display.init()
+        self.display = Display((1400, 800), hardware_scaling=False)
+        for width, height in [(1400, 800), (1920, 1080), (3840, 2160)]:
+            self.resize(width, height)
+            self.display.present()
+            frames = 20
+            start = time.perf_counter()
+            for _ in range(frames):
+                self.display.present()
+            elapsed = (time.perf_counter() - start) / frames * 1000
+            print(f"\nDisplay.present at {width}x{height}: {elapsed:.2f} ms")
+
+
+class TestDrill(unittest.TestCase):
+    """Test drill sets and interpolation."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.band_api = BandAPI()
+        self.band_api.create_band(4)
+        
+    def test_sets_from_band(self):
+        """Test that next_set records sets and the final formation."""
+        self.band_api.form_line(self.band_api.members, 20, 20, 50, 20)
+        self.band_api.next_set(4)
+        self.band_api.form_line(self.band_api.members, 20, 30, 50, 30)
+        drill = Drill.from_band(self.band_api, counts=8)
+        self.assertEqual(drill.set_counts, [0, 4, 12])
+        self.assertEqual(drill.total_counts, 12)
+        
+    def test_positions_interpolate_between_sets(self):
+        """Test that positions are interpolated linearly within a set."""
+        drill = Drill([(0, [(0.0, 0.0)]), (4, [(40.0, 20.0)])])
+        self.assertEqual(drill.positions_at(0), [(0.0, 0.0)])
+        self.assertEqual(drill.positions_at(1), [(10.0, 5.0)])
+        self.assertEqual(drill.positions_at(99), [(40.0, 20.0)])
+        
+    def test_playback_ticks(self):
+        """Test fixed-tick playback and interpolation between ticks."""
+        drill = Drill([(0, [(0.0, 0.0)]), (2, [(16.0, 8.0)])])
+        playback = DrillPlayback(drill, ticks_per_count=4)
+        self.assertEqual(playback.total_ticks, 8)
+        self.assertEqual(playback.tick(), [(2.0, 1.0)])
+        self.assertEqual(playback.interpolated(0.5), [(1.0, 0.5)])
+        for _ in range(20):
+            playback.tick()
+        self.assertTrue(playback.finished)
+        self.assertEqual(playback.interpolated(0.5), [(16.0, 8.0)])
+        
+    def test_from_formations(self):
+        """Test building a drill from saved sandbox formations."""
+        sandbox = SandboxMode()
+        band = sandbox.band_api
+        sandbox.save_formation('start')
+        band.form_line(band.members, 20, 30, 50, 30)
+        sandbox.save_formation('end')
+        drill = Drill.from_formations(sandbox.get_saved_formations(), counts=4)
+        self.assertEqual(drill.set_counts, [0, 4])
+        self.assertEqual(drill.sets[-1], band.get_positions())
+        self.assertEqual(drill.sections, [m.section for m in band.members])
+        self.assertEqual(drill.frame_count(3), 13)
+
+
+class TestDrillExport(unittest.TestCase):
+    """Test the headless drill exporter."""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        band_api = BandAPI()
+        band_api.create_band(8)
+        band_api.form_circle(band_api.members, 50, 26, 10)
+        self.drill = Drill.from_band(band_api, counts=2)
+        
+    def test_raw_export_frame_count(self):
+        """Test that raw export writes every RGB frame."""
+        stream = io.BytesIO()
+        frames = export_drill(self.drill, stream=stream, width=120, height=80,
+                              frames_per_count=3, workers=1)
+        self.assertEqual(frames, 2 * 3 + 1)
+        self.assertEqual(len(stream.getvalue()), frames * 120 * 80 * 3)
+        
+    def test_png_export(self):
+        """Test that PNG export writes numbered frames."""
+        with tempfile.TemporaryDirectory() as out_dir:
+            frames = export_drill(self.drill, out_dir=out_dir, width=120, height=80,
+                                  frames_per_count=2, workers=1)
+            self.assertEqual(sorted(os.listdir(out_dir))[-1], f"frame_{frames - 1:05d}.png")
+        
+    def test_multiprocess_export_is_ordered(self):
+        """Test that worker processes produce the same stream as one process."""
+        single, multi = io.BytesIO(), io.BytesIO()
+        export_drill(self.drill, stream=single, width=60, height=40,
+                     frames_per_count=2, workers=1, counts_per_chunk=1)
+        export_drill(self.drill, stream=multi, width=60, height=40,
+                     frames_per_count=2, workers=2, counts_per_chunk=1)
+        self.assertEqual(single.getvalue(), multi.getvalue())
+        
+    def test_multiprocess_png_export(self):
+        """Test that PNG export with workers writes every frame and returns."""
+        with tempfile.TemporaryDirectory() as out_dir:
+            frames = export_drill(self.drill, out_dir=out_dir, width=60, height=40,
+                                  frames_per_count=2, workers=2, counts_per_chunk=1)
+            self.assertEqual(len(os.listdir(out_dir)), frames)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+"""
+Autocomplete - Prefix-trie completion for the code editor.
+
+Completions come from three fixed sources, the Band API's public
+methods, band member attributes and the names the code executor puts
+in scope for student code, plus the symbols defined in the buffer
+itself. Each source lives in its own trie; the buffer trie is updated
+from the editor's background AST pass by inserting and removing only
+the names that changed.
+
+A lookup walks the prefix and then collects words in sorted order,
+stopping as soon as it has enough, so its cost depends on the prefix
+and the result limit rather than on the number of known words.
+"""
+
+import ast
+import keyword
+from typing import Dict, List, Optional, Iterable, Set
+
+from gameplay.band_api import BandAPI, BandMember
+from gameplay.code_executor import CodeExecutor, SECTIONS
+
+# Completions shown in the popup at most
+MAX_COMPLETIONS = 8
+
+
+class _Node:
+    """Trie node; `count` is how many times the word ending here was added."""
+    
+    __slots__ = ('children', 'count', 'below')
+    
+    def __init__(self):
+        self.children: Dict[str, '_Node'] = {}
+        self.count = 0
+        # Number of words ending in this subtree, to prune empty branches
+        self.below = 0
+
+
+class PrefixTrie:
+    """Multiset of words supporting sorted prefix lookups."""
+    
+    def __init__(self, words: Iterable[str] = ()):
+        self.root = _Node()
+        for word in words:
+            self.add(word)
+        
+    def __len__(self) -> int:
+        return self.root.below
+        
+    def __contains__(self, word: str) -> bool:
+        node = self._find(word)
+        return node is not None and node.count > 0
+        
+    def _find(self, prefix: str) -> Optional[_Node]:
+        node = self.root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+        
+    def add(self, word: str):
+        """Add one occurrence of a word."""
+        node = self.root
+        node.below += 1
+        for ch in word:
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = _Node()
+            node = child
+            node.below += 1
+        node.count += 1
+        
+    def remove(self, word: str):
+        """Remove one occurrence of a word, if present."""
+        if word not in self:
+            return
+        node = self.root
+        node.below -= 1
+        for ch in word:
+            child = node.children[ch]
+            child.below -= 1
+            if child.below == 0:
+                # Nothing left below: drop the whole branch
+                del node.children[ch]
+                return
+            node = child
+        node.count -= 1
+        
+    def complete(self, prefix: str, limit: int = MAX_COMPLETIONS) -> List[str]:
+        """Get up to `limit` words starting with prefix, in sorted order.
+        
+        Args:
+            prefix: Typed prefix
+            limit: Maximum number of words returned
+        """
+        node = self._find(prefix)
+        if node is None:
+            return []
+        result: List[str] = []
+        # Depth-first in key order; the stack holds (node, word so far)
+        stack = [(node, prefix)]
+        while stack and len(result) < limit:
+            node, word = stack.pop()
+            if node.count:
+                result.append(word)
+            for ch in sorted(node.children, reverse=True):
+                stack.append((node.children[ch], word + ch))
+        return result
+
+
+def defined_names(tree: ast.AST) -> Set[str]:
+    """Collect the names a module defines: assignments, loops, functions,
+    classes, parameters and imports.
+    
+    Args:
+        tree: Parsed module
+    """
+    names: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            names.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                names.add((alias.asname or alias.name).split('.')[0])
+    return names
+
+
+class CompletionIndex:
+    """Completion sources for student code, queried by context."""
+    
+    def __init__(self):
+        namespace = CodeExecutor().build_namespace()
+        self.api_methods = PrefixTrie(
+            name for name in dir(BandAPI) if not name.startswith('_') and callable(getattr(BandAPI, name)))
+        self.member_attributes = PrefixTrie(
+            name for name in vars(BandMember(0, 0.0, 0.0)) if not name.startswith('_'))
+        self.globals = PrefixTrie(
+            [name for name in namespace if not name.startswith('_')]
+            + list(namespace['__builtins__']) + keyword.kwlist)
+        self.sections = PrefixTrie(SECTIONS)
+        self.buffer_symbols = PrefixTrie()
+        self._symbols: Set[str] = set()
+        
+    def update_symbols(self, tree: ast.AST):
+        """Sync the buffer-symbol trie with a newly parsed buffer.
+        
+        Args:
+            tree: AST of the current buffer
+        """
+        names = defined_names(tree)
+        for name in self._symbols - names:
+            self.buffer_symbols.remove(name)
+        for name in names - self._symbols:
+            self.buffer_symbols.add(name)
+        self._symbols = names
+        
+    def complete(self, prefix: str, owner: Optional[str] = None, in_string: bool = False,
+                 limit: int = MAX_COMPLETIONS) -> List[str]:
+        """Get completions for a word being typed.
+        
+        Args:
+            prefix: Identifier characters typed so far
+            owner: Name before the '.' for attribute access, e.g. 'band'
+            in_string: Whether the word is inside a string literal
+            limit: Maximum number of completions
+        """
+        if in_string:
+            words = self.sections.complete(prefix, limit)
+        elif owner == 'band':
+            words = self.api_methods.complete(prefix, limit)
+        elif owner is not None:
+            words = self.member_attributes.complete(prefix, limit)
+        else:
+            if not prefix:
+                return []
+            words = sorted(set(self.globals.complete(prefix, limit) +
+                               self.buffer_symbols.complete(prefix, limit)))[:limit]
+        # Nothing to offer if the word is already complete
+        return [] if words == [prefix] else words
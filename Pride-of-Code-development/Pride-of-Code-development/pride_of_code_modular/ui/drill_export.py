@@ -0,0 +1,178 @@
+"""
+Drill Export - Headless frame export for marching drills.
+
+This module renders a drill frame by frame without opening a window.
+It reuses the normal FieldView on an offscreen Surface under SDL's dummy
+video driver, splits the count range across worker processes and writes
+the frames in order, either as numbered PNG files or as a raw RGB stream
+that can be piped straight into a video encoder.
+"""
+
+import os
+import multiprocessing
+from multiprocessing.util import Finalize
+from collections import deque
+from typing import List, Tuple, Optional, BinaryIO
+
+import pygame
+
+from config import FIELD_PIXEL_WIDTH, FIELD_PIXEL_HEIGHT
+from gameplay.band_api import BandMember
+from gameplay.drill import Drill
+
+
+class DrillRenderer:
+    """Renders drill frames onto an offscreen surface."""
+    
+    def __init__(self, drill: Drill, width: int = FIELD_PIXEL_WIDTH, height: int = FIELD_PIXEL_HEIGHT,
+                 frames_per_count: int = 15):
+        # Imported here so worker processes only touch the font system
+        # after the dummy video driver has been selected
+        from ui.field_view import FieldView
+        
+        self.drill = drill
+        self.frames_per_count = max(1, int(frames_per_count))
+        self.surface = pygame.Surface((width, height))
+        self.field_view = FieldView(0, 0, width, height)
+        self.field_view.show_section_labels = False
+        
+        # Reused member objects; only their positions change per frame
+        self.members = [
+            BandMember(i, x, y, section)
+            for i, ((x, y), section) in enumerate(zip(drill.sets[0], drill.sections))
+        ]
+        for member, facing in zip(self.members, drill.facings):
+            member.facing = facing
+        
+    @property
+    def frame_count(self) -> int:
+        """Number of frames in the whole drill."""
+        return self.drill.frame_count(self.frames_per_count)
+        
+    def render_frame(self, frame: int) -> pygame.Surface:
+        """Render a single frame and return the offscreen surface."""
+        positions = self.drill.positions_at(frame / self.frames_per_count)
+        for member, (x, y) in zip(self.members, positions):
+            member.x = x
+            member.y = y
+        self.field_view.draw(self.surface, self.members)
+        return self.surface
+
+
+# ----------------- Worker process helpers -----------------
+
+# Renderer of a pool worker process; never set in the exporting process
+_worker_renderer: Optional[DrillRenderer] = None
+
+
+def _init_worker(drill: Drill, width: int, height: int, frames_per_count: int):
+    """Set up a headless pygame and a renderer in a worker process.
+    
+    Only the font module is initialized: frames are drawn onto offscreen
+    surfaces, so the worker never starts SDL's video or event subsystems
+    and SDL never installs its own SIGINT/SIGTERM handlers, which would
+    otherwise keep the pool from shutting its workers down.
+    """
+    global _worker_renderer
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    os.environ['SDL_NO_SIGNAL_HANDLERS'] = '1'
+    pygame.font.init()
+    _worker_renderer = DrillRenderer(drill, width, height, frames_per_count)
+    Finalize(None, pygame.quit, exitpriority=10)
+
+
+def _render_frames(renderer: DrillRenderer, first: int, last: int, out_dir: Optional[str]):
+    """Render frames [first, last) with the given renderer.
+    
+    PNG frames are written directly. Raw frames are returned so the
+    exporting process can write them to the stream in order.
+    """
+    if out_dir is not None:
+        for frame in range(first, last):
+            surface = renderer.render_frame(frame)
+            pygame.image.save(surface, os.path.join(out_dir, f"frame_{frame:05d}.png"))
+        return last - first
+    return b''.join(
+        pygame.image.tostring(renderer.render_frame(frame), 'RGB')
+        for frame in range(first, last)
+    )
+
+
+def _render_chunk(first: int, last: int, out_dir: Optional[str]):
+    """Render frames [first, last) in a pool worker."""
+    return _render_frames(_worker_renderer, first, last, out_dir)
+
+
+def _chunks(frame_count: int, frames_per_count: int, counts_per_chunk: int) -> List[Tuple[int, int]]:
+    """Split the frame range into chunks of whole counts."""
+    step = max(1, counts_per_chunk) * frames_per_count
+    return [(i, min(i + step, frame_count)) for i in range(0, frame_count, step)]
+
+
+def export_drill(drill: Drill, out_dir: Optional[str] = None, stream: Optional[BinaryIO] = None,
+                 width: int = FIELD_PIXEL_WIDTH, height: int = FIELD_PIXEL_HEIGHT,
+                 frames_per_count: int = 15, workers: Optional[int] = None,
+                 counts_per_chunk: int = 2) -> int:
+    """Export every frame of a drill without opening a window.
+    
+    Args:
+        drill: Drill to render
+        out_dir: Directory for numbered PNG frames (frame_00000.png, ...)
+        stream: Binary stream for raw RGB24 frames (used if out_dir is None)
+        width, height: Frame size in pixels
+        frames_per_count: Frames rendered per count (15 = 30 fps at 120 BPM)
+        workers: Number of worker processes (default: CPU count)
+        counts_per_chunk: Counts rendered by a worker per job
+    
+    Returns:
+        Number of frames written
+    
+    With a single worker the frames are rendered in the calling process.
+    Only pygame.font is initialized for that, so no window is opened
+    whatever video driver the caller has selected.
+    """
+    if out_dir is None and stream is None:
+        raise ValueError("Either out_dir or stream is required")
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+    
+    frames_per_count = max(1, int(frames_per_count))
+    frame_count = drill.frame_count(frames_per_count)
+    chunks = _chunks(frame_count, frames_per_count, counts_per_chunk)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(chunks)))
+    init_args = (drill, width, height, frames_per_count)
+    
+    def write(result):
+        if out_dir is None:
+            stream.write(result)
+    
+    if workers == 1:
+        pygame.font.init()
+        renderer = DrillRenderer(*init_args)
+        for first, last in chunks:
+            write(_render_frames(renderer, first, last, out_dir))
+        return frame_count
+    
+    # Keep a bounded number of chunks in flight so raw frames never pile
+    # up in memory faster than the stream consumes them
+    max_pending = workers * 2
+    pending = deque()
+    # Spawned (not forked) workers never inherit the parent's window
+    context = multiprocessing.get_context('spawn')
+    pool = context.Pool(workers, initializer=_init_worker, initargs=init_args)
+    try:
+        for first, last in chunks:
+            if len(pending) >= max_pending:
+                write(pending.popleft().get())
+            pending.append(pool.apply_async(_render_chunk, (first, last, out_dir)))
+        while pending:
+            write(pending.popleft().get())
+        # Let the workers exit on their own instead of terminating them
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return frame_count
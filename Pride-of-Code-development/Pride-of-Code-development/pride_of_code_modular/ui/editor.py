@@ -1,22 +1,63 @@
-import pygame, ast, keyword
+import pygame, time
+from bisect import bisect_left
+from collections import OrderedDict, deque
 from typing import List, Tuple, Optional
+from ui.lexer import IncrementalLexer
+from ui.syntax_checker import SyntaxChecker, check_source
+from ui.text_buffer import LineBuffer
+from ui.autocomplete import CompletionIndex
+from ui.search import SearchIndex
+from gameplay.code_analysis import CodeAnalyzer
 
 # Enhanced CodeEditor with selection, clipboard (internal + pygame.scrap fallback),
 # smart indentation, line numbers gutter, and clickable breakpoints.
 
+class EditGroup:
+    # one undo step: the edits it made and the cursor/selection before it
+    __slots__ = ('kind', 'ops', 'cursor', 'selection')
+
+    def __init__(self, kind, cursor, selection):
+        self.kind = kind
+        self.ops = []
+        self.cursor = cursor
+        self.selection = selection
+
 class CodeEditor:
     def __init__(self, rect: pygame.Rect, font=None, lines:List[str]=None, max_undos=500):
         self.rect = rect
         self.font = font or pygame.font.SysFont('consolas', 18)
+        # per-line token cache and buffer version; must exist before lines is assigned
+        self.lexer = IncrementalLexer()
+        self.search = SearchIndex()
+        self._version = 0
+        # undo log (bounded, oldest steps fall off) and redo stack
+        self.max_undos = max_undos
+        self.undo_stack = deque(maxlen=max_undos)
+        self.redo_stack = []
+        self._group = None
+        self._group_end = None
+        self._replaying = False
         self.lines = lines or ['# Welcome to Code of Pride!', '# Write Python code to control the marching band', '']
         self.cursor = [0, 0]  # line index, column index
         self.scroll = 0  # top visible line
-        self.max_undos = max_undos
-        self.undo_stack = []
-        self.redo_stack = []
         self.blink = 0.0
         self.blink_visible = True
         self.syntax_error = None
+        self.lint_warnings = []
+        # AST of the last buffer version that parsed, for later analysis
+        self.syntax_tree = None
+        # undefined names / band command misuse found in that tree
+        self.diagnostics = []
+        self._diagnostics_by_line = {}
+
+        # syntax checking runs on a worker thread once typing pauses for
+        # syntax_delay seconds; results carry the buffer version they were
+        # taken from and are dropped if the buffer changed since
+        self.syntax_delay = 0.15
+        self.analyzer = CodeAnalyzer()
+        self.syntax_checker = SyntaxChecker(self.analyzer)
+        self._checked_version = -1
+        self._last_edit = 0.0
 
         # selection: tuple((line,col),(line,col)) or None; selection is inclusive of start, exclusive of end
         self.selection: Optional[Tuple[Tuple[int,int], Tuple[int,int]]] = None
@@ -26,6 +67,19 @@ class CodeEditor:
         self.gutter_width = 48
         self.breakpoints = set()
 
+        # rendered surfaces: one composited surface per line (LRU, keyed by
+        # line text + lexer state, which fix the colors), gutter numbers and
+        # the status message; all dropped when the font changes
+        self.max_cached_lines = 512
+        self._line_surfaces = OrderedDict()
+        self._gutter_surfaces = {}
+        self._info_surface = (None, None)
+        self._cache_font = None
+        # column -> pixel mapping: a fixed advance for monospace fonts,
+        # else cumulative x offsets per line text (LRU like the surfaces)
+        self._advance = None
+        self._line_offsets = OrderedDict()
+
         # internal clipboard as fallback if pygame.scrap isn't available/initialized
         self._clipboard = ""
 
@@ -43,10 +97,34 @@ class CodeEditor:
             'function': (220,220,170),
             'class': (78,201,176),
             'error_bg': (80,20,20),
+            'diagnostic_error': (230,90,90),
+            'diagnostic_warning': (220,180,70),
             'selection_bg': (80,100,160),
-            'bracket': (180,120,180)
+            'match_bg': (90,80,40),
+            'bracket': (180,120,180),
+            'popup_bg': (44,44,58),
+            'popup_border': (90,90,120)
         }
 
+        # completion popup: trie lookups over the band API, injected
+        # globals and the buffer's own symbols (fed by the syntax pass)
+        self.completions = CompletionIndex()
+        self.completion_items = []
+        self.completion_selected = 0
+        self._completion_prefix = ''
+        self._completion_surfaces = {}
+
+        # find / replace bar (Ctrl+F / Ctrl+E); matches come from the
+        # per-line index in self.search, kept in step with edits
+        self.find_mode = None  # None, 'find' or 'replace'
+        self.find_field = 'find'
+        self.find_text = ''
+        self.replace_text = ''
+        self.find_regex = False
+        self.find_case = False
+        self._find_origin = (0, 0)
+        self._find_surface = (None, None)
+
         # try to init pygame.scrap for system clipboard if available
         self._use_scrap = False
         try:
@@ -57,37 +135,196 @@ class CodeEditor:
         except Exception:
             self._use_scrap = False
 
+    # ----------------- Buffer change tracking -----------------
+    @property
+    def lines(self) -> LineBuffer:
+        # chunked line storage; reads like a list of strings
+        return self._lines
+
+    @lines.setter
+    def lines(self, value: List[str]):
+        # wholesale replacement (scene setup, loading a file): drop line
+        # caches and the undo history, whose positions no longer apply
+        self._lines = LineBuffer(value)
+        self.lexer.reset(len(value))
+        self.search.reset(len(value))
+        self._version += 1
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self._group = None
+
+    def _lines_changed(self, first: int, removed: int, added: int):
+        # lines [first, first+removed) were replaced by `added` new lines
+        self.lexer.lines_changed(first, removed, added)
+        self.search.lines_changed(first, removed, added)
+        self._version += 1
+
+    # ----------------- Syntax checking -----------------
+    def _schedule_syntax_check(self):
+        # O(1) per keystroke: the snapshot is only taken once typing pauses
+        self._last_edit = time.perf_counter()
+
+    def poll_syntax(self):
+        # apply finished results and hand the worker a snapshot when idle
+        result = self.syntax_checker.poll()
+        if result is not None:
+            version, info = result
+            if version == self._version:
+                self._apply_syntax_result(info)
+        if self._checked_version == self._version or self.syntax_checker.busy:
+            return
+        if time.perf_counter() - self._last_edit < self.syntax_delay:
+            return
+        self._checked_version = self._version
+        self.syntax_checker.submit(self._version, '\n'.join(self.lines))
+
+    def _apply_syntax_result(self, info):
+        self.syntax_error = info['error']
+        self.lint_warnings = info['warnings']
+        self.diagnostics = info['diagnostics']
+        self._diagnostics_by_line = {}
+        for d in self.diagnostics:
+            self._diagnostics_by_line.setdefault(d['line'], []).append(d)
+        if info['tree'] is not None and info['tree'] is not self.syntax_tree:
+            self.syntax_tree = info['tree']
+            self.completions.update_symbols(self.syntax_tree)
+
+    # ----------------- Edit primitives -----------------
+    # every text change goes through _insert/_delete, which keep the line
+    # caches in sync and log the change to the current undo group
+
+    def _end_of(self, line: int, col: int, text: str) -> Tuple[int, int]:
+        # position just past `text` inserted at (line, col)
+        nl = text.count('\n')
+        if not nl:
+            return (line, col + len(text))
+        return (line + nl, len(text) - text.rfind('\n') - 1)
+
+    def _text_range(self, start, end) -> str:
+        (l1,c1),(l2,c2) = start, end
+        if l1 == l2:
+            return self.lines[l1][c1:c2]
+        parts = [self.lines[l1][c1:]] + self.lines[l1+1:l2] + [self.lines[l2][:c2]]
+        return '\n'.join(parts)
+
+    def _insert(self, line: int, col: int, text: str) -> Tuple[int, int]:
+        # insert text (may contain newlines) at (line, col); returns its end
+        cur = self.lines[line]
+        parts = text.split('\n')
+        if len(parts) == 1:
+            self.lines[line] = cur[:col] + text + cur[col:]
+        else:
+            parts[0] = cur[:col] + parts[0]
+            parts[-1] = parts[-1] + cur[col:]
+            self.lines.replace(line, 1, parts)
+        self._lines_changed(line, 1, len(parts))
+        self._log('insert', line, col, text)
+        return self._end_of(line, col, text)
+
+    def _delete(self, start, end) -> str:
+        # delete the text between two positions and return it
+        (l1,c1),(l2,c2) = start, end
+        text = self._text_range(start, end)
+        if l1 == l2:
+            line = self.lines[l1]
+            self.lines[l1] = line[:c1] + line[c2:]
+        else:
+            self.lines.replace(l1, l2 - l1 + 1, [self.lines[l1][:c1] + self.lines[l2][c2:]])
+        self._lines_changed(l1, l2 - l1 + 1, 1)
+        self._log('delete', l1, c1, text)
+        return text
+
+    def _replace_lines(self, changes):
+        # rewrite whole lines (replace-all) with one cache notification for
+        # the range instead of one per line; changes are (index, text) in order
+        for i, new in changes:
+            old = self.lines[i]
+            self.lines[i] = new
+            self._log('delete', i, 0, old)
+            self._log('insert', i, 0, new)
+        first, last = changes[0][0], changes[-1][0]
+        self._lines_changed(first, last - first + 1, last - first + 1)
+
     # ----------------- Undo/Redo -----------------
-    def push_undo(self):
-        state = (list(self.lines), tuple(self.cursor), None if self.selection is None else (tuple(self.selection[0]), tuple(self.selection[1])))
-        self.undo_stack.append(state)
-        if len(self.undo_stack) > self.max_undos:
-            self.undo_stack.pop(0)
+    # the undo stack holds EditGroups: the (op, line, col, text) edits one
+    # user action made, so memory follows the size of the edits rather than
+    # the size of the file; consecutive typing or backspacing is merged
+    def _begin_edit(self, kind: Optional[str] = None, merge: bool = True):
+        # start an undo step; 'type'/'backspace'/'delete' steps continue the
+        # previous one of the same kind while the cursor is where it left off
+        group = self._group
+        if (merge and kind is not None and group is not None and group.kind == kind
+                and self.undo_stack and self.undo_stack[-1] is group
+                and self._group_end == tuple(self.cursor) and not self._has_selection()):
+            return
+        self._group = EditGroup(kind, tuple(self.cursor), self.selection)
+        self.undo_stack.append(self._group)
         self.redo_stack.clear()
 
+    def _log(self, op: str, line: int, col: int, text: str):
+        group = self._group
+        if group is None or self._replaying:
+            return
+        if group.ops:
+            last_op, last_line, last_col, last_text = group.ops[-1]
+            if op == last_op == 'insert' and self._end_of(last_line, last_col, last_text) == (line, col):
+                group.ops[-1] = (op, last_line, last_col, last_text + text)
+                op = None
+            elif op == last_op == 'delete' and (last_line, last_col) == (line, col):
+                # forward delete at the same spot
+                group.ops[-1] = (op, line, col, last_text + text)
+                op = None
+            elif op == last_op == 'delete' and self._end_of(line, col, text) == (last_line, last_col):
+                # backspace just before the last deletion
+                group.ops[-1] = (op, line, col, text + last_text)
+                op = None
+        if op is not None:
+            group.ops.append((op, line, col, text))
+        # where the cursor ends up after the step so far
+        op, line, col, text = group.ops[-1]
+        self._group_end = self._end_of(line, col, text) if op == 'insert' else (line, col)
+
+    def _apply(self, ops, inverse: bool):
+        # replay ops (or undo them in reverse) without logging them again
+        self._replaying = True
+        try:
+            pos = None
+            for op, line, col, text in (reversed(ops) if inverse else ops):
+                if (op == 'insert') != inverse:
+                    pos = self._insert(line, col, text)
+                else:
+                    self._delete((line, col), self._end_of(line, col, text))
+                    pos = (line, col)
+        finally:
+            self._replaying = False
+        return pos
+
     def undo(self):
         if not self.undo_stack:
             return
-        state = self.undo_stack.pop()
-        self.redo_stack.append((list(self.lines), tuple(self.cursor), None if self.selection is None else (tuple(self.selection[0]), tuple(self.selection[1]))))
-        self.lines, cur, sel = state
-        self.cursor = list(cur)
-        self.selection = None if sel is None else (tuple(sel[0]), tuple(sel[1]))
+        group = self.undo_stack.pop()
+        self._apply(group.ops, inverse=True)
+        self.redo_stack.append(group)
+        self._group = None
+        self.cursor = list(group.cursor)
+        self.selection = group.selection
         self._ensure_cursor_valid()
         self._ensure_scroll_for_cursor()
-        self.check_syntax_quiet()
+        self._schedule_syntax_check()
 
     def redo(self):
         if not self.redo_stack:
             return
-        state = self.redo_stack.pop()
-        self.push_undo()
-        self.lines, cur, sel = state
-        self.cursor = list(cur)
-        self.selection = None if sel is None else (tuple(sel[0]), tuple(sel[1]))
+        group = self.redo_stack.pop()
+        pos = self._apply(group.ops, inverse=False)
+        self.undo_stack.append(group)
+        self._group = None
+        if pos is not None:
+            self.cursor = list(pos)
+        self.selection = None
         self._ensure_cursor_valid()
         self._ensure_scroll_for_cursor()
-        self.check_syntax_quiet()
+        self._schedule_syntax_check()
 
     # ----------------- Clipboard helpers -----------------
     def _set_clipboard(self, text: str):
@@ -129,69 +366,53 @@ class CodeEditor:
         sel = self._normalize_selection()
         if not sel:
             return ''
-        (l1,c1),(l2,c2) = sel
-        if l1 == l2:
-            return self.lines[l1][c1:c2]
-        parts = [self.lines[l1][c1:]] + self.lines[l1+1:l2] + [self.lines[l2][:c2]]
-        return '\\n'.join(parts)
+        return self._text_range(*sel)
 
-    def _delete_selection(self):
+    def _remove_selection(self):
+        # delete the selection as part of the current undo step
         sel = self._normalize_selection()
         if not sel:
             return
-        (l1,c1),(l2,c2) = sel
-        self.push_undo()
-        if l1 == l2:
-            line = self.lines[l1]
-            self.lines[l1] = line[:c1] + line[c2:]
-            self.cursor = [l1, c1]
-        else:
-            first = self.lines[l1][:c1]
-            last = self.lines[l2][c2:]
-            # remove middle lines
-            del self.lines[l1+1:l2+1]
-            self.lines[l1] = first + last
-            self.cursor = [l1, c1]
+        self._delete(*sel)
+        self.cursor = list(sel[0])
         self._clear_selection()
+
+    def _delete_selection(self):
+        if not self._has_selection():
+            return
+        self._begin_edit()
+        self._remove_selection()
         self._ensure_cursor_valid()
         self._ensure_scroll_for_cursor()
-        self.check_syntax_quiet()
+        self._schedule_syntax_check()
 
     # ----------------- Basic editing ops -----------------
     def insert_text(self, text: str):
-        if self._has_selection():
-            self._delete_selection()
-        self.push_undo()
-        line = self.lines[self.cursor[0]]
-        col = self.cursor[1]
-        new = line[:col] + text + line[col:]
-        self.lines[self.cursor[0]] = new
-        self.cursor[1] += len(text)
+        lidx, col = self.cursor
+        line = self.lines[lidx]
+        # typing merges into one undo step, broken at the start of each word gap
+        word_gap = text.isspace() and col > 0 and not line[col-1].isspace()
+        self._begin_edit('type', merge=len(text) == 1 and not word_gap)
+        self._remove_selection()
+        self.cursor = list(self._insert(self.cursor[0], self.cursor[1], text))
         self._ensure_scroll_for_cursor()
-        self.check_syntax_quiet()
+        self._schedule_syntax_check()
+        self._update_completions()
 
     def new_line(self):
         # smart indentation: inherit leading whitespace; add extra indent if previous endswith ':'
+        self._begin_edit()
+        self._remove_selection()
         lidx, col = self.cursor
-        line = self.lines[lidx]
-        left = line[:col]
-        right = line[col:]
-        indent = ''
-        for ch in left:
-            if ch in (' ', '\\t'):
-                indent += ch
-            else:
-                break
+        left = self.lines[lidx][:col]
+        indent = left[:len(left) - len(left.lstrip(' \t'))]
         # if the current visible left ends with ':' add 4 spaces
         extra = ''
         if left.rstrip().endswith(':'):
             extra = '    '
-        self.push_undo()
-        self.lines[lidx] = left
-        self.lines.insert(lidx+1, indent + extra + right.lstrip('\\n'))
-        self.cursor = [lidx+1, len(indent)+len(extra)]
+        self.cursor = list(self._insert(lidx, col, '\n' + indent + extra))
         self._ensure_scroll_for_cursor()
-        self.check_syntax_quiet()
+        self._schedule_syntax_check()
 
     def backspace(self):
         if self._has_selection():
@@ -199,24 +420,21 @@ class CodeEditor:
         lidx, col = self.cursor
         if lidx == 0 and col == 0:
             return
-        self.push_undo()
+        self._begin_edit('backspace')
         if col > 0:
             line = self.lines[lidx]
             # smart unindent: if preceding chars are 4 spaces and at line start, remove 4
             if col >=4 and line[col-4:col] == '    ' and line[:col-4].rstrip()=='':
-                self.lines[lidx] = line[:col-4] + line[col:]
-                self.cursor[1] -= 4
+                start = (lidx, col-4)
             else:
-                self.lines[lidx] = line[:col-1] + line[col:]
-                self.cursor[1] -= 1
+                start = (lidx, col-1)
         else:
             # join with previous line
-            prev = self.lines[lidx-1]
-            cur = self.lines.pop(lidx)
-            self.cursor = [lidx-1, len(prev)]
-            self.lines[self.cursor[0]] = prev + cur
+            start = (lidx-1, len(self.lines[lidx-1]))
+        self._delete(start, (lidx, col))
+        self.cursor = list(start)
         self._ensure_scroll_for_cursor()
-        self.check_syntax_quiet()
+        self._schedule_syntax_check()
 
     def delete(self):
         if self._has_selection():
@@ -224,13 +442,172 @@ class CodeEditor:
         lidx, col = self.cursor
         line = self.lines[lidx]
         if col < len(line):
-            self.push_undo()
-            self.lines[lidx] = line[:col] + line[col+1:]
+            self._begin_edit('delete')
+            self._delete((lidx, col), (lidx, col+1))
+        elif lidx+1 < len(self.lines):
+            self._begin_edit('delete')
+            self._delete((lidx, col), (lidx+1, 0))
+        self._schedule_syntax_check()
+
+    # ----------------- Find / replace -----------------
+    def open_find(self, mode: str = 'find'):
+        # mode is 'find' or 'replace'; a one-line selection seeds the search
+        self.find_mode = mode
+        self.find_field = 'find'
+        sel = self._normalize_selection()
+        if sel and sel[0][0] == sel[1][0] and sel[0] != sel[1]:
+            self.find_text = self._get_selection_text()
+            self._find_origin = sel[0]
         else:
-            if lidx+1 < len(self.lines):
-                self.push_undo()
-                self.lines[lidx] = line + self.lines.pop(lidx+1)
-        self.check_syntax_quiet()
+            self._find_origin = tuple(self.cursor)
+        self._update_search()
+
+    def close_find(self):
+        self.find_mode = None
+        self.search.set_pattern('')
+
+    def _update_search(self, jump: bool = True):
+        self.search.set_pattern(self.find_text, self.find_regex, self.find_case)
+        if jump:
+            self._select_match(self.search.find(self.lines, *self._find_origin))
+
+    def _select_match(self, match):
+        if match is None:
+            return
+        li, start, end = match
+        self.selection = ((li, start), (li, end))
+        self.cursor = [li, end]
+        self._ensure_scroll_for_cursor()
+
+    def _current_match(self):
+        # the selection, if it is exactly one match of the pattern
+        sel = self._normalize_selection()
+        if not sel or sel[0][0] != sel[1][0]:
+            return None
+        li = sel[0][0]
+        if (sel[0][1], sel[1][1]) in self.search.line_matches(self.lines, li):
+            return li, sel[0][1], sel[1][1]
+        return None
+
+    def find_next(self, backwards: bool = False):
+        sel = self._normalize_selection()
+        if sel:
+            line, col = sel[0] if backwards else sel[1]
+        else:
+            line, col = self.cursor
+        self._select_match(self.search.find(self.lines, line, col, backwards))
+
+    def replace_current(self):
+        # replace the selected match and move on to the next one
+        match = self._current_match()
+        if match is None:
+            self.find_next()
+            return
+        li, start, end = match
+        new = self.search.expand(self.lines[li], start, end, self.replace_text, self.find_regex)
+        self._begin_edit()
+        self._remove_selection()
+        self.cursor = list(self._insert(li, start, new))
+        self._ensure_scroll_for_cursor()
+        self._schedule_syntax_check()
+        self.find_next()
+
+    def replace_all(self) -> int:
+        # one pass over the buffer, one undo step; returns lines changed
+        changes = self.search.replace_all(self.lines, self.replace_text, self.find_regex)
+        if not changes:
+            return 0
+        self._begin_edit()
+        self._replace_lines(changes)
+        self._clear_selection()
+        self._ensure_cursor_valid()
+        self._ensure_scroll_for_cursor()
+        self._schedule_syntax_check()
+        return len(changes)
+
+    def _find_key(self, ev, ctrl, shift, alt) -> bool:
+        # keys handled by the open find bar; returns True if consumed
+        if ev.key == pygame.K_ESCAPE:
+            self.close_find(); return True
+        if ev.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+            if self.find_mode == 'replace' and ctrl:
+                self.replace_all()
+            elif self.find_mode == 'replace' and self.find_field == 'replace':
+                self.replace_current()
+            else:
+                self.find_next(backwards=bool(shift))
+            return True
+        if ev.key == pygame.K_TAB and self.find_mode == 'replace':
+            self.find_field = 'replace' if self.find_field == 'find' else 'find'
+            return True
+        if ev.key == pygame.K_BACKSPACE:
+            if self.find_field == 'find':
+                self.find_text = self.find_text[:-1]
+                self._update_search()
+            else:
+                self.replace_text = self.replace_text[:-1]
+            return True
+        if alt and ev.key in (pygame.K_r, pygame.K_c):
+            # Alt+R regex, Alt+C match case
+            if ev.key == pygame.K_r:
+                self.find_regex = not self.find_regex
+            else:
+                self.find_case = not self.find_case
+            self._update_search()
+            return True
+        return False
+
+    def _find_input(self, text: str):
+        if self.find_field == 'find':
+            self.find_text += text
+            self._update_search()
+        else:
+            self.replace_text += text
+
+    # ----------------- Autocompletion -----------------
+    def _update_completions(self):
+        # complete the identifier left of the cursor, by context
+        lidx, col = self.cursor
+        text = self.lines[lidx]
+        start = col
+        while start > 0 and (text[start-1].isalnum() or text[start-1] == '_'):
+            start -= 1
+        prefix = text[start:col]
+        owner = None
+        if start > 0 and text[start-1] == '.':
+            o = start - 1
+            while o > 0 and (text[o-1].isalnum() or text[o-1] == '_'):
+                o -= 1
+            owner = text[o:start-1]
+        # inside a string literal (not just past its closing quote) only
+        # section names are offered
+        in_string = False
+        pos = 0
+        for part, ttype in self.lexer.line_spans(self.lines, lidx):
+            end = pos + len(part)
+            if pos < col <= end:
+                closed = col == end and len(part) > 1 and part[-1] in '"\''
+                in_string = ttype == 'string' and not closed
+                break
+            pos = end
+        if prefix[:1].isdigit() or (in_string and not prefix):
+            self.completion_items = []
+        else:
+            self.completion_items = self.completions.complete(prefix, owner, in_string)
+        self._completion_prefix = prefix
+        self.completion_selected = 0
+
+    def close_completions(self):
+        self.completion_items = []
+
+    def accept_completion(self):
+        if not self.completion_items:
+            return
+        word = self.completion_items[self.completion_selected]
+        suffix = word[len(self._completion_prefix):]
+        if suffix:
+            self.insert_text(suffix)
+        self.close_completions()
 
     # ----------------- Cursor movement and selection -----------------
     def move_cursor(self, dline:int, dcol:int, extend_selection=False, absolute=False):
@@ -289,6 +666,27 @@ class CodeEditor:
             ctrl = mod & pygame.KMOD_CTRL
             shift = mod & pygame.KMOD_SHIFT
 
+            if ctrl and ev.key == pygame.K_f:
+                self.open_find('find'); return
+            if ctrl and ev.key == pygame.K_e:
+                self.open_find('replace'); return
+            if self.find_mode and self._find_key(ev, ctrl, shift, mod & pygame.KMOD_ALT):
+                return
+
+            # completion popup keys; anything else closes it
+            if self.completion_items:
+                if ev.key == pygame.K_ESCAPE:
+                    self.close_completions(); return
+                if ev.key in (pygame.K_TAB, pygame.K_RETURN):
+                    self.accept_completion(); return
+                if ev.key in (pygame.K_UP, pygame.K_DOWN):
+                    step = 1 if ev.key == pygame.K_DOWN else -1
+                    self.completion_selected = (self.completion_selected + step) % len(self.completion_items)
+                    return
+                if ev.key == pygame.K_BACKSPACE:
+                    self.backspace(); self._update_completions(); return
+                self.close_completions()
+
             if ctrl and ev.key == pygame.K_z:
                 self.undo(); return
             if ctrl and ev.key == pygame.K_y:
@@ -352,12 +750,16 @@ class CodeEditor:
 
         # text input (for SDL2 text events)
         if ev.type == pygame.TEXTINPUT:
-            self.insert_text(ev.text)
+            if self.find_mode:
+                self._find_input(ev.text)
+            else:
+                self.insert_text(ev.text)
             return
 
         # mouse events
         if ev.type == pygame.MOUSEBUTTONDOWN:
             mx, my = ev.pos
+            self.close_completions()
             # gutter click toggles breakpoint
             if self._in_gutter(mx, my):
                 line = self._line_from_y(my)
@@ -374,17 +776,7 @@ class CodeEditor:
                 line_idx = self.scroll + rel_y // fh
                 line_idx = max(0, min(line_idx, len(self.lines)-1))
                 rel_x = mx - (self.rect.x + self.gutter_width) - 6
-                # approximate col by measuring widths
-                s = self.lines[line_idx]
-                acc = 0
-                col = 0
-                for i,ch in enumerate(s):
-                    w = self.font.size(ch)[0]
-                    if acc + w/2 >= rel_x:
-                        col = i; break
-                    acc += w
-                else:
-                    col = len(s)
+                col = self._x_to_col(self.lines[line_idx], rel_x)
                 self.cursor = [line_idx, col]
                 self.selection = ((line_idx, col), (line_idx, col))
                 self.selecting_with_mouse = True
@@ -398,16 +790,7 @@ class CodeEditor:
                 line_idx = self.scroll + rel_y // fh
                 line_idx = max(0, min(line_idx, len(self.lines)-1))
                 rel_x = mx - (self.rect.x + self.gutter_width) - 6
-                s = self.lines[line_idx]
-                acc = 0
-                col = 0
-                for i,ch in enumerate(s):
-                    w = self.font.size(ch)[0]
-                    if acc + w/2 >= rel_x:
-                        col = i; break
-                    acc += w
-                else:
-                    col = len(s)
+                col = self._x_to_col(self.lines[line_idx], rel_x)
                 # update selection end
                 if self.selection:
                     start, _ = self.selection
@@ -426,38 +809,38 @@ class CodeEditor:
     # ----------------- Indent helpers -----------------
     def _indent_selection(self):
         sel = self._normalize_selection()
+        self._begin_edit()
         if not sel:
             # indent current line
             l = self.cursor[0]
-            self.push_undo()
-            self.lines[l] = '    ' + self.lines[l]
+            self._insert(l, 0, '    ')
             self.cursor[1] += 4
         else:
             (l1,c1),(l2,c2) = sel
-            self.push_undo()
             for i in range(l1, l2+1):
-                self.lines[i] = '    ' + self.lines[i]
+                self._insert(i, 0, '    ')
             # adjust cursor and selection
             self.cursor[1] += 4
             self.selection = ((l1, c1+4), (l2, c2+4))
+        self._schedule_syntax_check()
 
     def _unindent_selection_or_line(self):
         sel = self._normalize_selection()
         if not sel:
             l = self.cursor[0]
-            line = self.lines[l]
-            if line.startswith('    '):
-                self.push_undo()
-                self.lines[l] = line[4:]
+            if self.lines[l].startswith('    '):
+                self._begin_edit()
+                self._delete((l, 0), (l, 4))
                 self.cursor[1] = max(0, self.cursor[1]-4)
         else:
             (l1,c1),(l2,c2) = sel
-            self.push_undo()
+            self._begin_edit()
             for i in range(l1, l2+1):
                 if self.lines[i].startswith('    '):
-                    self.lines[i] = self.lines[i][4:]
+                    self._delete((i, 0), (i, 4))
             self.selection = ((l1, max(0,c1-4)), (l2, max(0,c2-4)))
             self.cursor[1] = max(0, self.cursor[1]-4)
+        self._schedule_syntax_check()
 
     # ----------------- Clipboard operations -----------------
     def copy(self):
@@ -477,26 +860,13 @@ class CodeEditor:
         txt = self._get_clipboard()
         if not txt:
             return
-        # paste may contain newlines
-        if self._has_selection():
-            self._delete_selection()
-        self.push_undo()
-        l, c = self.cursor
-        line = self.lines[l]
-        before = line[:c]
-        after = line[c:]
-        parts = txt.split('\\n')
-        if len(parts) == 1:
-            self.lines[l] = before + parts[0] + after
-            self.cursor[1] = c + len(parts[0])
-        else:
-            self.lines[l] = before + parts[0]
-            for i,p in enumerate(parts[1:], start=1):
-                self.lines.insert(l+i, p)
-            self.lines[l+len(parts)-1] = self.lines[l+len(parts)-1] + after
-            self.cursor = [l+len(parts)-1, len(parts[-1])]
+        # paste may contain newlines, in any platform's convention
+        txt = txt.replace('\r\n', '\n').replace('\r', '\n')
+        self._begin_edit()
+        self._remove_selection()
+        self.cursor = list(self._insert(self.cursor[0], self.cursor[1], txt))
         self._ensure_scroll_for_cursor()
-        self.check_syntax_quiet()
+        self._schedule_syntax_check()
 
     # ----------------- Rendering -----------------
     def _in_gutter(self, mx, my):
@@ -512,7 +882,116 @@ class CodeEditor:
             return line_idx
         return None
 
+    def _check_render_cache(self):
+        if self._cache_font is not self.font:
+            self._line_surfaces.clear()
+            self._gutter_surfaces.clear()
+            self._info_surface = (None, None)
+            self._line_offsets.clear()
+            self._completion_surfaces.clear()
+            self._find_surface = (None, None)
+            self._cache_font = self.font
+            widths = {self.font.size(ch)[0] for ch in 'iW.m_ '}
+            self._advance = widths.pop() if len(widths) == 1 else None
+
+    def cache_size(self) -> int:
+        # rough bytes held by the token and render caches: surface pixels,
+        # column offsets and the text/spans kept per lexed line
+        total = 0
+        for cache in (self._line_surfaces, self._gutter_surfaces, self._completion_surfaces):
+            for s in cache.values():
+                if s is not None:
+                    total += s.get_width() * s.get_height() * s.get_bytesize()
+        for offsets in self._line_offsets.values():
+            total += 8 * len(offsets)
+        for entry in self.lexer.entries:
+            if entry is not None:
+                total += 64 + len(entry[0]) + 48 * len(entry[2])
+        for found in self.search.matches:
+            if found:
+                total += 16 * len(found)
+        return total
+
+    def evict_caches(self):
+        # drop everything cache_size counts; it is all rebuilt lazily on
+        # the next draw, so this only costs time when the tab is shown again
+        self._line_surfaces.clear()
+        self._gutter_surfaces.clear()
+        self._line_offsets.clear()
+        self._completion_surfaces.clear()
+        self._info_surface = (None, None)
+        self._find_surface = (None, None)
+        self.lexer.reset(len(self.lines))
+        self.search.reset(len(self.lines))
+
+    def _offsets(self, text: str) -> List[int]:
+        # x offset of every column of a proportional-font line, built once
+        # per distinct line text; prefix widths include kerning, so they
+        # line up with the rendered text
+        cache = self._line_offsets
+        offsets = cache.get(text)
+        if offsets is not None:
+            cache.move_to_end(text)
+            return offsets
+        size = self.font.size
+        offsets = [0] + [size(text[:i])[0] for i in range(1, len(text) + 1)]
+        cache[text] = offsets
+        if len(cache) > self.max_cached_lines:
+            cache.popitem(last=False)
+        return offsets
+
+    def _col_to_x(self, text: str, col: int) -> int:
+        if self._advance is not None:
+            return col * self._advance
+        return self._offsets(text)[col]
+
+    def _x_to_col(self, text: str, x: int) -> int:
+        # nearest column boundary to a pixel offset within the line
+        if self._advance is not None:
+            return max(0, min(len(text), (x + self._advance // 2) // self._advance))
+        offsets = self._offsets(text)
+        col = bisect_left(offsets, x)
+        if col >= len(offsets):
+            return len(text)
+        if col > 0 and x - offsets[col-1] < offsets[col] - x:
+            col -= 1
+        return col
+
+    def _line_surface(self, li: int) -> Optional[pygame.Surface]:
+        entry = self.lexer.line_entry(self.lines, li)
+        key = (entry[0], entry[1])
+        cache = self._line_surfaces
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        text, spans = entry[0], entry[2]
+        line_surf = None
+        if text:
+            fh = self.font.get_linesize()
+            width = max(self._col_to_x(text, len(text)), self.font.size(text)[0])
+            line_surf = pygame.Surface((max(1, width), fh), pygame.SRCALPHA)
+            col = 0
+            default = self.colors['text']
+            # spans start at the same offsets the cursor and selection use
+            for part, ttype in spans:
+                line_surf.blit(self.font.render(part, True, self.colors.get(ttype, default)), (self._col_to_x(text, col), 0))
+                col += len(part)
+        cache[key] = line_surf
+        if len(cache) > self.max_cached_lines:
+            cache.popitem(last=False)
+        return line_surf
+
+    def _gutter_surface(self, li: int) -> pygame.Surface:
+        num_s = self._gutter_surfaces.get(li)
+        if num_s is None:
+            if len(self._gutter_surfaces) > self.max_cached_lines:
+                self._gutter_surfaces.clear()
+            num_s = self._gutter_surfaces[li] = self.font.render(str(li+1), True, self.colors['gutter_text'])
+        return num_s
+
     def draw(self, surf:pygame.Surface):
+        self.poll_syntax()
+        self._check_render_cache()
         # background
         pygame.draw.rect(surf, self.colors['background'], self.rect)
         # gutter
@@ -526,8 +1005,7 @@ class CodeEditor:
             li = i + self.scroll
             if li >= len(self.lines): break
             y = self.rect.y + i*fh
-            num_s = self.font.render(str(li+1), True, self.colors['gutter_text'])
-            surf.blit(num_s, (self.rect.x + 6, y))
+            surf.blit(self._gutter_surface(li), (self.rect.x + 6, y))
             if li in self.breakpoints:
                 # draw red dot
                 cx = self.rect.x + self.gutter_width - 14
@@ -543,14 +1021,22 @@ class CodeEditor:
                     r = pygame.Rect(self.rect.x + self.gutter_width, self.rect.y + rel*fh, self.rect.width - self.gutter_width, fh)
                     pygame.draw.rect(surf, self.colors['error_bg'], r)
 
-        # render visible lines with token spans
+        # render visible lines from the line-surface cache
+        line_blits = []
         for i in range(visible):
             li = i + self.scroll
             if li >= len(self.lines): break
-            line = self.lines[li]
             x = self.rect.x + self.gutter_width + 6
             y = self.rect.y + i*fh
 
+            # highlight search matches (cached per line)
+            if self.search.pattern is not None:
+                text = self.lines[li]
+                for start, end in self.search.line_matches(self.lines, li):
+                    x1 = self._col_to_x(text, start)
+                    x2 = self._col_to_x(text, end)
+                    pygame.draw.rect(surf, self.colors['match_bg'], (x + x1, y, x2 - x1, fh))
+
             # draw selection background if intersects this line
             if self._has_selection():
                 sel = self._normalize_selection()
@@ -560,31 +1046,31 @@ class CodeEditor:
                     start = c1 if li==l1 else 0
                     end = c2 if li==l2 else len(self.lines[li])
                     # draw rect for selected region
-                    pre = self.lines[li][:start]
-                    sel_text = self.lines[li][start:end]
-                    px = x + self.font.size(pre)[0]
-                    w = max(1, self.font.size(sel_text)[0])
+                    text = self.lines[li]
+                    px = x + self._col_to_x(text, start)
+                    w = max(1, self._col_to_x(text, end) - self._col_to_x(text, start))
                     pygame.draw.rect(surf, self.colors['selection_bg'], (px, y, w, fh))
 
-            spans = self._tokenize_line_spans(line)
-            for text, ttype in spans:
-                color = self.colors['text']
-                if ttype == 'keyword': color = self.colors['keyword']
-                elif ttype == 'string': color = self.colors['string']
-                elif ttype == 'comment': color = self.colors['comment']
-                elif ttype == 'number': color = self.colors['number']
-                elif ttype == 'function': color = self.colors['function']
-                elif ttype == 'class': color = self.colors['class']
-                elif ttype == 'bracket': color = self.colors['bracket']
-                surf.blit(self.font.render(text, True, color), (x, y))
-                x += self.font.size(text)[0]
+            line_surf = self._line_surface(li)
+            if line_surf is not None:
+                line_blits.append((line_surf, (x, y)))
+
+            # underline what static analysis found on this line
+            for d in self._diagnostics_by_line.get(li, ()):
+                text = self.lines[li]
+                c1 = min(d['col'], len(text))
+                c2 = max(c1 + 1, min(d['end_col'], len(text)))
+                x1 = x + self._col_to_x(text, c1)
+                x2 = x + self._col_to_x(text, c2) if c2 <= len(text) else x1 + 8
+                pygame.draw.line(surf, self.colors['diagnostic_' + d['severity']], (x1, y + fh - 2), (x2, y + fh - 2), 2)
+
+        surf.blits(line_blits, False)
 
         # draw cursor
         cline, ccol = self.cursor
         if self.scroll <= cline < self.scroll + visible:
             rel = cline - self.scroll
-            pre = self.lines[cline][:ccol]
-            cx = self.rect.x + self.gutter_width + 6 + self.font.size(pre)[0]
+            cx = self.rect.x + self.gutter_width + 6 + self._col_to_x(self.lines[cline], ccol)
             cy = self.rect.y + rel*fh
             # blink
             self.blink += 1/60.0
@@ -593,16 +1079,72 @@ class CodeEditor:
                 self.blink_visible = not self.blink_visible
             if self.blink_visible:
                 pygame.draw.rect(surf, self.colors['cursor'], (cx, cy, max(2,2), fh))
+            if self.completion_items:
+                self._draw_completions(surf, cx, cy + fh)
 
         # bottom line: show syntax messages
         msg = ''
         if self.syntax_error:
             msg = f"Syntax Error: {self.syntax_error.get('msg','')}"
+        elif self.diagnostics:
+            # the problem on the cursor line, else the first one
+            d = self._diagnostics_by_line.get(self.cursor[0], self.diagnostics)[0]
+            msg = f"Line {d['line'] + 1}: {d['msg']}"
+            if len(self.diagnostics) > 1:
+                msg = f"{msg} ({len(self.diagnostics)} problems)"
+        elif self.lint_warnings:
+            line, text = self.lint_warnings[0]
+            msg = f"Warning: {text}" if line is None else f"Warning (line {line + 1}): {text}"
         else:
             msg = 'Ctrl+C/X/V Copy/Cut/Paste — Click gutter to toggle breakpoint'
-        info_surf = self.font.render(msg, True, (230,230,230))
+        if self._info_surface[0] != msg:
+            self._info_surface = (msg, self.font.render(msg, True, (230,230,230)))
+        info_surf = self._info_surface[1]
         surf.blit(info_surf, (self.rect.x + self.gutter_width + 6, self.rect.y + self.rect.height - fh - 6))
 
+        if self.find_mode:
+            self._draw_find_bar(surf, fh)
+
+    def _draw_find_bar(self, surf, fh):
+        # one line above the status message
+        # '>' marks the field that receives typing
+        active = '>' if self.find_field == 'find' else ' '
+        msg = f"{active}Find: {self.find_text}"
+        if self.find_mode == 'replace':
+            active = '>' if self.find_field == 'replace' else ' '
+            msg += f"   {active}Replace: {self.replace_text}"
+        flags = ('.* ' if self.find_regex else '') + ('Aa ' if self.find_case else '')
+        status = self.search.error or f"{self.search.count(self.lines)} matches"
+        msg = f"{msg}   [{flags}{status}]"
+        if self._find_surface[0] != msg:
+            self._find_surface = (msg, self.font.render(msg, True, self.colors['text']))
+        bar = pygame.Rect(self.rect.x + self.gutter_width, self.rect.bottom - 2*fh - 10, self.rect.width - self.gutter_width, fh + 4)
+        pygame.draw.rect(surf, self.colors['popup_bg'], bar)
+        pygame.draw.rect(surf, self.colors['popup_border'], bar, 1)
+        surf.blit(self._find_surface[1], (bar.x + 6, bar.y + 2))
+
+    def _draw_completions(self, surf, x, y):
+        fh = self.font.get_linesize()
+        rendered = []
+        for word in self.completion_items:
+            s = self._completion_surfaces.get(word)
+            if s is None:
+                if len(self._completion_surfaces) > self.max_cached_lines:
+                    self._completion_surfaces.clear()
+                s = self._completion_surfaces[word] = self.font.render(word, True, self.colors['text'])
+            rendered.append(s)
+        w = max(s.get_width() for s in rendered) + 12
+        box = pygame.Rect(x, y, w, fh * len(rendered) + 4)
+        # keep the popup inside the editor, above the cursor line if needed
+        if box.bottom > self.rect.bottom:
+            box.bottom = y - fh
+        box.right = min(box.right, self.rect.right)
+        pygame.draw.rect(surf, self.colors['popup_bg'], box)
+        pygame.draw.rect(surf, self.colors['popup_border'], box, 1)
+        sel = pygame.Rect(box.x + 1, box.y + 2 + self.completion_selected * fh, box.width - 2, fh)
+        pygame.draw.rect(surf, self.colors['selection_bg'], sel)
+        surf.blits([(s, (box.x + 6, box.y + 2 + i * fh)) for i, s in enumerate(rendered)], False)
+
     # ----------------- Utilities -----------------
     def _ensure_scroll_for_cursor(self):
         fh = self.font.get_linesize()
@@ -617,114 +1159,15 @@ class CodeEditor:
         self.cursor[1] = max(0, min(self.cursor[1], len(self.lines[self.cursor[0]])))
 
     def check_syntax_quiet(self):
-        try:
-            ast.parse('\\n'.join(self.lines))
-            self.syntax_error = None
-            return True, None
-        except Exception as e:
-            msg = str(e)
-            ln = None
-            try:
-                import re
-                m = re.search(r'line (\\d+)', msg)
-                if m:
-                    ln = int(m.group(1)) - 1
-            except Exception:
-                ln = None
-            self.syntax_error = {'msg': msg, 'line': ln}
-            return False, msg
+        # synchronous check of the current buffer (run / save); also
+        # satisfies any background check pending for this version
+        info = check_source('\n'.join(self.lines), self.analyzer)
+        self._apply_syntax_result(info)
+        self._checked_version = self._version
+        if info['error']:
+            return False, info['error']['msg']
+        return True, None
 
     def check_syntax(self):
         ok, msg = self.check_syntax_quiet()
         return ok, self.syntax_error.get('msg') if self.syntax_error else None
-
-    def _tokenize_line_spans(self, line: str) -> List[Tuple[str, str]]:
-        """Tokenize a line of Python code into spans with types for syntax highlighting."""
-        # This is a simplified tokenizer for basic Python syntax highlighting
-        spans = []
-        i = 0
-        while i < len(line):
-            # Skip whitespace
-            if line[i].isspace():
-                j = i
-                while j < len(line) and line[j].isspace():
-                    j += 1
-                spans.append((line[i:j], 'text'))
-                i = j
-                continue
-
-            # Strings (single or double quotes)
-            if line[i] in ('"', "'"):
-                quote = line[i]
-                j = i + 1
-                while j < len(line) and line[j] != quote:
-                    if line[j] == '\\' and j + 1 < len(line):
-                        j += 2  # Skip escaped character
-                    else:
-                        j += 1
-                if j < len(line):
-                    j += 1  # Include closing quote
-                spans.append((line[i:j], 'string'))
-                i = j
-                continue
-
-            # Comments
-            if line[i] == '#':
-                spans.append((line[i:], 'comment'))
-                break
-
-            # Numbers
-            if line[i].isdigit() or (line[i] == '.' and i + 1 < len(line) and line[i+1].isdigit()):
-                j = i
-                if line[j] == '.':
-                    j += 1
-                while j < len(line) and (line[j].isdigit() or line[j] == '.'):
-                    j += 1
-                # Check for scientific notation
-                if j < len(line) and line[j] in 'eE':
-                    j += 1
-                    if j < len(line) and line[j] in '+-':
-                        j += 1
-                    while j < len(line) and line[j].isdigit():
-                        j += 1
-                spans.append((line[i:j], 'number'))
-                i = j
-                continue
-
-            # Keywords and identifiers
-            if line[i].isalpha() or line[i] == '_':
-                j = i
-                while j < len(line) and (line[j].isalnum() or line[j] == '_'):
-                    j += 1
-                word = line[i:j]
-                
-                # Check for special identifiers
-                if word in keyword.kwlist:
-                    spans.append((word, 'keyword'))
-                elif word in ('True', 'False', 'None'):
-                    spans.append((word, 'keyword'))
-                elif word in dir(__builtins__):
-                    spans.append((word, 'function'))
-                else:
-                    # Check if it's followed by parentheses (function call)
-                    k = j
-                    while k < len(line) and line[k].isspace():
-                        k += 1
-                    if k < len(line) and line[k] == '(':
-                        spans.append((word, 'function'))
-                    else:
-                        spans.append((word, 'text'))
-                i = j
-                continue
-
-            # Brackets
-            if line[i] in '()[]{}':
-                spans.append((line[i], 'bracket'))
-                i += 1
-                continue
-
-            # Operators and other punctuation
-            spans.append((line[i], 'text'))
-            i += 1
-
-        return spans
\ No newline at end of file
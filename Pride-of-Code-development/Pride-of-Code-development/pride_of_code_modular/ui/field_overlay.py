@@ -0,0 +1,145 @@
+"""
+Field Overlay - Marcher trails and field-coverage heatmap.
+
+This module keeps the history the field view shows on top of the grass:
+short trails of where each marcher was during the last few counts, and
+a heatmap of how often each yard of the field has been marched over.
+
+Both are updated incrementally once per tick. The heatmap lives in a
+one-cell-per-yard RGBA buffer that is wrapped as a Surface once, so a
+tick only rewrites the cells of marchers that moved and drawing is a
+single scaled blit, no matter how long the show runs.
+"""
+
+import math
+import pygame
+from collections import deque
+from typing import Dict, List, Tuple, Sequence
+from config import FIELD_LENGTH, FIELD_WIDTH, TICKS_PER_COUNT, TRAIL_COUNTS, SECTION_COLORS
+
+# Heat added to a yard cell each tick a marcher moves through it
+HEAT_STEP = 4
+
+
+def _build_palette() -> List[bytes]:
+    """Build the 256-entry RGBA palette used for heat levels.
+    
+    Level 0 is fully transparent; higher levels go from a faint blue
+    through yellow to an opaque red.
+    """
+    palette = [bytes((0, 0, 0, 0))]
+    for level in range(1, 256):
+        t = level / 255.0
+        if t < 0.5:
+            r, g, b = int(510 * t), int(510 * t), int(255 * (1 - 2 * t))
+        else:
+            r, g, b = 255, int(255 * (2 - 2 * t)), 0
+        alpha = int(60 + 140 * t)
+        palette.append(bytes((r, g, b, alpha)))
+    return palette
+
+
+HEAT_PALETTE = _build_palette()
+
+
+class FieldOverlay:
+    """Accumulates marcher trails and field coverage tick by tick."""
+    
+    def __init__(self, trail_counts: int = TRAIL_COUNTS, ticks_per_count: int = TICKS_PER_COUNT):
+        """Create an empty overlay.
+        
+        Args:
+            trail_counts: Number of counts of history kept in each trail
+            ticks_per_count: Ticks recorded per count
+        """
+        self.trail_length = max(2, trail_counts * ticks_per_count)
+        
+        # One heat cell per yard, 0..100 by 0..53
+        self.cols = FIELD_LENGTH + 1
+        self.rows = int(math.ceil(FIELD_WIDTH))
+        self.heat = bytearray(self.cols * self.rows)
+        self.pixels = bytearray(self.cols * self.rows * 4)
+        self.heat_surface = pygame.image.frombuffer(self.pixels, (self.cols, self.rows), 'RGBA')
+        
+        # Heatmap scaled to the field, rebuilt only after the heat changed
+        self._scaled_heat = None
+        self._heat_dirty = False
+        
+        self.trails: Dict[int, deque] = {}
+        self._last_positions: Dict[int, Tuple[float, float]] = {}
+        
+    def reset(self):
+        """Forget all trails and coverage."""
+        self.heat[:] = bytes(len(self.heat))
+        self.pixels[:] = bytes(len(self.pixels))
+        self.trails.clear()
+        self._last_positions.clear()
+        self._heat_dirty = True
+        
+    def record(self, members: Sequence, pxs: Sequence[int], pys: Sequence[int]):
+        """Record one tick of marcher positions.
+        
+        Args:
+            members: Band members in drawing order
+            pxs: Screen x pixel of each member
+            pys: Screen y pixel of each member
+        """
+        trails = self.trails
+        last = self._last_positions
+        heat = self.heat
+        pixels = self.pixels
+        cols, rows = self.cols, self.rows
+        
+        for member, px, py in zip(members, pxs, pys):
+            trail = trails.get(member.id)
+            if trail is None:
+                trail = trails[member.id] = deque(maxlen=self.trail_length)
+            trail.append((px, py))
+            
+            # Additive heat only for marchers that moved since last tick
+            position = (member.x, member.y)
+            if last.get(member.id) == position:
+                continue
+            last[member.id] = position
+            col = min(cols - 1, max(0, int(member.x)))
+            row = min(rows - 1, max(0, int(member.y)))
+            cell = row * cols + col
+            level = min(255, heat[cell] + HEAT_STEP)
+            if level != heat[cell]:
+                heat[cell] = level
+                pixels[cell * 4:cell * 4 + 4] = HEAT_PALETTE[level]
+                self._heat_dirty = True
+                
+    def draw_heatmap(self, surface: pygame.Surface, dest: Tuple[int, int], size: Tuple[int, int],
+                     clip: pygame.Rect):
+        """Draw the heatmap scaled to the playing area.
+        
+        Args:
+            surface: Surface to draw on
+            dest: Screen position of the 0,0 yard corner
+            size: Pixel size of the heat buffer once scaled
+            clip: Screen rectangle the heatmap may cover
+        """
+        if self._scaled_heat is None or self._scaled_heat.get_size() != size:
+            self._scaled_heat = pygame.Surface(size, pygame.SRCALPHA)
+            self._heat_dirty = True
+        if self._heat_dirty:
+            pygame.transform.scale(self.heat_surface, size, self._scaled_heat)
+            self._heat_dirty = False
+        area = pygame.Rect(0, 0, clip.right - dest[0], clip.bottom - dest[1])
+        surface.blit(self._scaled_heat, dest, area)
+        
+    def draw_trails(self, surface: pygame.Surface, members: Sequence):
+        """Draw the trail of every member.
+        
+        Args:
+            surface: Surface to draw on
+            members: Band members whose trails should be drawn
+        """
+        trails = self.trails
+        for member in members:
+            trail = trails.get(member.id)
+            if trail is None or len(trail) < 2:
+                continue
+            color = SECTION_COLORS.get(member.section, (255, 255, 255))
+            pygame.draw.lines(surface, color, False, trail, 1)
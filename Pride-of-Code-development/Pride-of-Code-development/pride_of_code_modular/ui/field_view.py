@@ -7,14 +7,17 @@ in a classic 8-bit pixel art style.
 
 import pygame
 import math
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Iterable, Sequence
 from config import (
     FIELD_PIXEL_WIDTH, FIELD_PIXEL_HEIGHT, FIELD_OFFSET_X, FIELD_OFFSET_Y,
     COLOR_FIELD_GREEN, COLOR_FIELD_LINES, COLOR_BLUE, COLOR_GOLD,
     SECTION_COLORS, MARCHER_SIZE, FIELD_LENGTH, FIELD_WIDTH
 )
 from gameplay.band_api import BandMember
+from ui.field_overlay import FieldOverlay
 
+# Transparent key color for the cached grid overlay
+GRID_COLORKEY = (255, 0, 255)
 
 
 class FieldView:
@@ -31,14 +34,26 @@ class FieldView:
         self.font_small = pygame.font.SysFont('arial', 10, bold=True)
         self.font_medium = pygame.font.SysFont('arial', 14, bold=True)
         
+        # Precomputed yard-to-pixel transform, marcher sprite atlas and grid
+        self._compute_transform()
+        self._sprite_cache = {}
+        self._label_cache = {}
+        self.grid_surface = None
+        self._grid_key = None
+        
         # Create surfaces for field
         self.field_surface = pygame.Surface((width, height))
         self._render_field()
         
+        # Trails and coverage heatmap, recorded once per tick
+        self.overlay = FieldOverlay()
+        
         # Animation state
         self.show_grid = True
         self.show_coordinates = False
         self.show_section_labels = True
+        self.show_trails = False
+        self.show_heatmap = False
         
         # Grid settings
         self.grid_steps = 4  # 4 steps per 5 yards
@@ -88,13 +103,35 @@ class FieldView:
         pygame.draw.rect(self.field_surface, (100, 100, 100), 
                         (self.width - self._yard_to_pixel_x(10), 0, self._yard_to_pixel_x(10), self.height))
         
+    def _compute_transform(self):
+        """Precompute the yard-to-pixel scale factors for the current size."""
+        self._scale_x = (self.width - 10) / FIELD_LENGTH
+        self._scale_y = (self.height - 10) / FIELD_WIDTH
+        
     def _yard_to_pixel_x(self, yard: float) -> int:
         """Convert yard line (0-100) to pixel x coordinate."""
-        return int((yard / FIELD_LENGTH) * (self.width - 10) + 5)
+        return int(yard * self._scale_x + 5)
         
     def _yard_to_pixel_y(self, yard: float) -> int:
         """Convert yard position (0-53.33) to pixel y coordinate."""
-        return int((yard / FIELD_WIDTH) * (self.height - 10) + 5)
+        return int(yard * self._scale_y + 5)
+        
+    def yards_to_pixels(self, xs: Iterable[float], ys: Iterable[float],
+                        origin: Tuple[int, int] = (0, 0)) -> Tuple[List[int], List[int]]:
+        """Convert whole coordinate arrays from yards to pixels.
+        
+        Args:
+            xs: X coordinates in yards
+            ys: Y coordinates in yards
+            origin: Pixel position of the field's top-left corner
+        
+        Returns:
+            (pixel_xs, pixel_ys) offset by origin
+        """
+        sx, sy = self._scale_x, self._scale_y
+        # int(v + origin) == int(v) + origin for the non-negative values here
+        ox, oy = origin[0] + 5, origin[1] + 5
+        return [int(x * sx + ox) for x in xs], [int(y * sy + oy) for y in ys]
         
     def _pixel_to_yard_x(self, pixel_x: int) -> float:
         """Convert pixel x to yard position."""
@@ -104,17 +141,25 @@ class FieldView:
         """Convert pixel y to yard position."""
         return ((pixel_y - 5) / (self.height - 10)) * FIELD_WIDTH
         
-    def _draw_marcher_sprite(self, surface: pygame.Surface, x: int, y: int, 
-                            section: str, facing: float = 0, selected: bool = False):
-        """Draw a Retro Bowl-style 8x8 pixel marcher sprite.
+    def _get_marcher_sprite(self, section: str, facing: float = 0, selected: bool = False) -> pygame.Surface:
+        """Get a Retro Bowl-style 8x8 pixel marcher sprite from the atlas.
+        
+        Sprites are built once per (section, facing, selected) combination
+        and reused on every frame.
         
         Args:
-            surface: Surface to draw on
-            x, y: Center position in pixels
             section: Band section for color
             facing: Direction in degrees (0 = up)
             selected: Whether the marcher is selected
         """
+        # Only the four cardinal directions get a facing indicator
+        if facing not in (0, 90, 180, 270):
+            facing = None
+        key = (section, facing, selected)
+        sprite = self._sprite_cache.get(key)
+        if sprite is not None:
+            return sprite
+        
         color = SECTION_COLORS.get(section, COLOR_GOLD)
         
         # Create 8x8 sprite
@@ -141,16 +186,32 @@ class FieldView:
         if selected:
             pygame.draw.rect(sprite, (255, 255, 255), (0, 0, MARCHER_SIZE, MARCHER_SIZE), 1)
             
-        # Blit sprite centered at position
-        surface.blit(sprite, (x - MARCHER_SIZE // 2, y - MARCHER_SIZE // 2))
+        self._sprite_cache[key] = sprite
+        return sprite
+        
+    def _get_section_label(self, section: str) -> pygame.Surface:
+        """Get the cached one-letter label surface for a section."""
+        label = self._label_cache.get(section)
+        if label is None:
+            label_text = section[:1].upper()  # First letter of section
+            label = self.font_small.render(label_text, True, (255, 255, 255))
+            self._label_cache[section] = label
+        return label
         
-    def draw(self, surface: pygame.Surface, members: List[BandMember], selected_member: Optional[BandMember] = None):
+    def draw(self, surface: pygame.Surface, members: List[BandMember], selected_member: Optional[BandMember] = None,
+             positions: Optional[Sequence[Tuple[float, float]]] = None):
         """Draw the field and all band members.
         
+        Positions are converted to pixels in one pass over the band's
+        coordinate arrays and every sprite is submitted in a single
+        ``Surface.blits`` call.
+        
         Args:
             surface: Main game surface
             members: List of BandMember objects to render
             selected_member: Currently selected member (if any)
+            positions: Positions (in yards) to draw the members at instead
+                of their own, e.g. interpolated between simulation ticks
         """
         # Draw field background
         surface.blit(self.field_surface, (self.x, self.y))
@@ -159,51 +220,117 @@ class FieldView:
         if self.show_grid:
             self._draw_grid(surface)
             
-        # Draw all band members
-        for member in members:
-            px = self.x + self._yard_to_pixel_x(member.x)
-            py = self.y + self._yard_to_pixel_y(member.y)
-            is_selected = selected_member is not None and selected_member.id == member.id
-            self._draw_marcher_sprite(surface, px, py, member.section, member.facing, is_selected)
+        # Draw coverage and trails underneath the marchers
+        if self.show_heatmap:
+            self.overlay.draw_heatmap(
+                surface, (self.x + 5, self.y + 5),
+                (int(self.overlay.cols * self._scale_x), int(self.overlay.rows * self._scale_y)),
+                self.rect.inflate(-10, -10)
+            )
+        if self.show_trails:
+            self.overlay.draw_trails(surface, members)
+        
+        if not members:
+            return
             
-            # Show coordinates if enabled
-            if self.show_coordinates:
-                coord_text = f"({member.x:.0f},{member.y:.0f})"
-                text_surf = self.font_small.render(coord_text, True, COLOR_FIELD_LINES)
-                surface.blit(text_surf, (px - 15, py + 8))
-                
-            # Show section labels if enabled
-            if self.show_section_labels:
-                label_text = member.section[:1].upper()  # First letter of section
-                text_surf = self.font_small.render(label_text, True, (255, 255, 255))
-                surface.blit(text_surf, (px - 3, py - 12))
+        # Convert all positions to screen pixels, one pass per axis
+        if positions is None:
+            xs, ys = (m.x for m in members), (m.y for m in members)
+        else:
+            xs, ys = (p[0] for p in positions), (p[1] for p in positions)
+        pxs, pys = self.yards_to_pixels(xs, ys, (self.x, self.y))
+        
+        # Build the (sprite, dest) list for all band members
+        half = MARCHER_SIZE // 2
+        selected_id = selected_member.id if selected_member is not None else None
+        get_sprite = self._get_marcher_sprite
+        blit_list = [
+            (get_sprite(m.section, m.facing, m.id == selected_id), (px - half, py - half))
+            for m, px, py in zip(members, pxs, pys)
+        ]
+        
+        # Show section labels if enabled
+        if self.show_section_labels:
+            get_label = self._get_section_label
+            blit_list.extend(
+                (get_label(m.section), (px - 3, py - 12))
+                for m, px, py in zip(members, pxs, pys)
+            )
+        
+        # Show coordinates if enabled
+        if self.show_coordinates:
+            render = self.font_small.render
+            blit_list.extend(
+                (render(f"({m.x:.0f},{m.y:.0f})", True, COLOR_FIELD_LINES), (px - 15, py + 8))
+                for m, px, py in zip(members, pxs, pys)
+            )
+        
+        surface.blits(blit_list, False)
                 
     def _draw_grid(self, surface: pygame.Surface):
         """Draw a subtle grid overlay for coding reference."""
+        # The grid only changes with the field size or step count
+        key = (self.width, self.height, self.grid_steps)
+        if self._grid_key != key:
+            self._render_grid()
+            self._grid_key = key
+        surface.blit(self.grid_surface, (self.x, self.y))
+        
+    def _render_grid(self):
+        """Render the grid overlay into a cached color-keyed surface."""
+        self.grid_surface = pygame.Surface((self.width, self.height))
+        self.grid_surface.fill(GRID_COLORKEY)
+        self.grid_surface.set_colorkey(GRID_COLORKEY, pygame.RLEACCEL)
+        grid = self.grid_surface
+        
         # Draw vertical lines every 5 yards
         for yard in range(0, 101, 5):
-            x = self.x + self._yard_to_pixel_x(yard)
-            pygame.draw.line(surface, (255, 255, 255, 40),
-                           (x, self.y), (x, self.y + self.height), 1)
+            x = self._yard_to_pixel_x(yard)
+            pygame.draw.line(grid, (255, 255, 255, 40),
+                           (x, 0), (x, self.height), 1)
             
         # Draw horizontal lines every ~10 yards
         for yard in [0, 13.33, 26.67, 40.0, 53.33]:
-            y = self.y + self._yard_to_pixel_y(yard)
-            pygame.draw.line(surface, (255, 255, 255, 40),
-                           (self.x, y), (self.x + self.width, y), 1)
+            y = self._yard_to_pixel_y(yard)
+            pygame.draw.line(grid, (255, 255, 255, 40),
+                           (0, y), (self.width, y), 1)
                            
         # Draw finer grid steps (4 steps per 5 yards)
         step_yards = 5.0 / self.grid_steps
         for yard_x in [i * step_yards for i in range(int(100 / step_yards) + 1)]:
-            x = self.x + self._yard_to_pixel_x(yard_x)
-            pygame.draw.line(surface, (200, 200, 200, 20),
-                           (x, self.y), (x, self.y + self.height), 1)
+            x = self._yard_to_pixel_x(yard_x)
+            pygame.draw.line(grid, (200, 200, 200, 20),
+                           (x, 0), (x, self.height), 1)
                            
         for yard_y in [i * step_yards for i in range(int(53.33 / step_yards) + 1)]:
-            y = self.y + self._yard_to_pixel_y(yard_y)
-            pygame.draw.line(surface, (200, 200, 200, 20),
-                           (self.x, y), (self.x + self.width, y), 1)
+            y = self._yard_to_pixel_y(yard_y)
+            pygame.draw.line(grid, (200, 200, 200, 20),
+                           (0, y), (self.width, y), 1)
                            
+    def record_tick(self, members: List[BandMember]):
+        """Record the band's positions for trails and the coverage heatmap.
+        
+        Call once per simulation tick, not per frame.
+        
+        Args:
+            members: List of BandMember objects
+        """
+        pxs, pys = self.yards_to_pixels((m.x for m in members), (m.y for m in members),
+                                        (self.x, self.y))
+        self.overlay.record(members, pxs, pys)
+        
+    def clear_overlay(self):
+        """Forget recorded trails and coverage."""
+        self.overlay.reset()
+        
+    def toggle_trails(self):
+        """Toggle marcher trail display."""
+        self.show_trails = not self.show_trails
+        
+    def toggle_heatmap(self):
+        """Toggle field coverage heatmap display."""
+        self.show_heatmap = not self.show_heatmap
+        
     def toggle_grid(self):
         """Toggle grid display."""
         self.show_grid = not self.show_grid
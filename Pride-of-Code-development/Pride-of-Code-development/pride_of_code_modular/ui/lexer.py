@@ -0,0 +1,233 @@
+"""
+Lexer - Incremental Python syntax highlighting for the code editor.
+
+Each line is tokenized into (text, type) spans together with the lexer
+state at the end of the line, which is either None or the delimiter of
+a triple-quoted string that is still open. Results are cached per line;
+an edit only re-tokenizes from the changed line until the state at the
+end of a line matches what it was before, after which the rest of the
+cache is known to be valid again.
+"""
+
+import builtins
+import keyword
+from bisect import bisect_left
+from typing import List, Tuple, Optional
+
+KEYWORDS = frozenset(keyword.kwlist) | {'True', 'False', 'None'}
+BUILTINS = frozenset(dir(builtins))
+BRACKETS = frozenset('()[]{}')
+STRING_PREFIXES = frozenset('rRbBfFuU')
+
+Span = Tuple[str, str]
+
+
+def _scan_string_end(line: str, i: int, quote: str) -> int:
+    """Return the index just past the closing quote, or -1 if not closed."""
+    n = len(line)
+    q = len(quote)
+    while i < n:
+        if line[i] == '\\':
+            i += 2
+            continue
+        if line.startswith(quote, i):
+            return i + q
+        i += 1
+    return -1
+
+
+def lex_line(line: str, state: Optional[str] = None) -> Tuple[List[Span], Optional[str]]:
+    """Tokenize one line of Python for highlighting.
+    
+    Args:
+        line: Line of source code without its newline
+        state: Open triple-quote delimiter carried over from the previous
+            line, or None
+    
+    Returns:
+        (spans, state) where spans is a list of (text, type) tuples and
+        state is the lexer state at the end of the line
+    """
+    spans: List[Span] = []
+    n = len(line)
+    i = 0
+    
+    # Continue a triple-quoted string from an earlier line
+    if state is not None:
+        end = _scan_string_end(line, 0, state)
+        if end < 0:
+            if line:
+                spans.append((line, 'string'))
+            return spans, state
+        spans.append((line[:end], 'string'))
+        i = end
+        state = None
+    
+    while i < n:
+        ch = line[i]
+        
+        # Whitespace
+        if ch.isspace():
+            j = i
+            while j < n and line[j].isspace():
+                j += 1
+            spans.append((line[i:j], 'text'))
+            i = j
+            continue
+        
+        # Strings, including prefixed and triple-quoted ones
+        j = i
+        while j < n and j - i < 2 and line[j] in STRING_PREFIXES:
+            j += 1
+        if j < n and line[j] in ('"', "'"):
+            quote = line[j] * 3 if line.startswith(line[j] * 3, j) else line[j]
+            end = _scan_string_end(line, j + len(quote), quote)
+            if end < 0:
+                spans.append((line[i:], 'string'))
+                # Only triple-quoted strings carry over to the next line
+                return spans, quote if len(quote) == 3 else None
+            spans.append((line[i:end], 'string'))
+            i = end
+            continue
+        
+        # Comments
+        if ch == '#':
+            spans.append((line[i:], 'comment'))
+            break
+        
+        # Numbers
+        if ch.isdigit() or (ch == '.' and i + 1 < n and line[i + 1].isdigit()):
+            j = i
+            if line[j] == '.':
+                j += 1
+            while j < n and (line[j].isdigit() or line[j] == '.'):
+                j += 1
+            # Scientific notation
+            if j < n and line[j] in 'eE':
+                j += 1
+                if j < n and line[j] in '+-':
+                    j += 1
+                while j < n and line[j].isdigit():
+                    j += 1
+            spans.append((line[i:j], 'number'))
+            i = j
+            continue
+        
+        # Keywords and identifiers
+        if ch.isalpha() or ch == '_':
+            j = i
+            while j < n and (line[j].isalnum() or line[j] == '_'):
+                j += 1
+            word = line[i:j]
+            if word in KEYWORDS:
+                spans.append((word, 'keyword'))
+            elif word in BUILTINS:
+                spans.append((word, 'function'))
+            else:
+                # A name followed by '(' is a call
+                k = j
+                while k < n and line[k].isspace():
+                    k += 1
+                spans.append((word, 'function' if k < n and line[k] == '(' else 'text'))
+            i = j
+            continue
+        
+        if ch in BRACKETS:
+            spans.append((ch, 'bracket'))
+        else:
+            spans.append((ch, 'text'))
+        i += 1
+    
+    return spans, state
+
+
+class IncrementalLexer:
+    """Per-line token cache that re-tokenizes only what an edit affects."""
+    
+    def __init__(self):
+        # Per line: (text, state in, spans, state out) or None if never lexed
+        self.entries: List[Optional[tuple]] = []
+        # Lines before this index are known to be valid
+        self.valid = 0
+        # Sorted indices of lines edited since they were last lexed
+        self.dirty: List[int] = []
+        
+    def reset(self, line_count: int = 0):
+        """Drop every cached line."""
+        self.entries = [None] * line_count
+        self.valid = 0
+        self.dirty = []
+        
+    def lines_changed(self, first: int, removed: int, added: int):
+        """Record that lines [first, first + removed) were replaced by `added` lines.
+        
+        Args:
+            first: Index of the first changed line
+            removed: Number of old lines replaced
+            added: Number of new lines in their place
+        """
+        self.entries[first:first + removed] = [None] * added
+        self.valid = min(self.valid, first)
+        
+        # Shift dirty marks behind the edit and mark the new lines
+        shift = added - removed
+        if shift == 0 and added <= 8:
+            # Lines edited in place: nothing moves, just mark them
+            dirty = self.dirty
+            for d in range(first, first + added):
+                k = bisect_left(dirty, d)
+                if k == len(dirty) or dirty[k] != d:
+                    dirty.insert(k, d)
+            return
+        start = bisect_left(self.dirty, first)
+        tail = [d + shift for d in self.dirty[start:] if d >= first + removed]
+        self.dirty[start:] = list(range(first, first + added)) + tail
+        
+    def line_spans(self, lines, index: int) -> List[Span]:
+        """Get the highlighted spans of one line, lexing lines up to it if needed.
+        
+        Args:
+            lines: The editor's lines
+            index: Line to get spans for
+        """
+        return self.line_entry(lines, index)[2]
+        
+    def line_entry(self, lines, index: int) -> tuple:
+        """Get the cached (text, state in, spans, state out) entry of one line.
+        
+        The text and input state together determine the spans, so they
+        make a cache key for anything rendered from them.
+        
+        Args:
+            lines: The editor's lines
+            index: Line to get the entry for
+        """
+        if len(self.entries) != len(lines):
+            # The buffer was replaced without notification
+            self.reset(len(lines))
+        
+        entries = self.entries
+        j = self.valid
+        while j <= index:
+            state = entries[j - 1][3] if j > 0 else None
+            text = lines[j]
+            entry = entries[j]
+            if entry is not None and entry[0] == text and entry[1] == state:
+                # Unchanged line with unchanged input state: every cached line
+                # up to the next edit is still valid
+                k = bisect_left(self.dirty, j + 1)
+                j = self.dirty[k] if k < len(self.dirty) else len(entries)
+                continue
+            spans, out_state = lex_line(text, state)
+            entries[j] = (text, state, spans, out_state)
+            dirty = self.dirty
+            k = bisect_left(dirty, j)
+            if k < len(dirty) and dirty[k] == j:
+                del dirty[k]
+            # A changed end state makes the next line stale as well
+            if (entry is None or entry[3] != out_state) and j + 1 < len(entries):
+                if k >= len(dirty) or dirty[k] != j + 1:
+                    dirty.insert(k, j + 1)
+            j += 1
+        self.valid = max(self.valid, j)
+        return entries[index]
@@ -0,0 +1,147 @@
+"""
+Search - Incremental find and replace for the code editor.
+
+SearchIndex keeps the matches of the current pattern per line, in a
+list parallel to the editor's lines. Lines are only scanned when they
+are first needed (drawn, or passed while looking for the next match),
+and an edit only forgets the matches of the lines it touched, the same
+way the lexer's token cache works. Matches never span lines.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+Match = Tuple[int, int]
+
+
+class SearchIndex:
+    """Per-line match cache for one search pattern."""
+    
+    def __init__(self):
+        self.pattern: Optional[re.Pattern] = None
+        self.error: Optional[str] = None
+        # Per line: list of (start, end) matches, or None if not scanned yet
+        self.matches: List[Optional[List[Match]]] = []
+        self._total: Optional[int] = None
+        
+    def set_pattern(self, text: str, regex: bool = False, case_sensitive: bool = False):
+        """Search for a new pattern, dropping all cached matches.
+        
+        Args:
+            text: Search text, or a regular expression if regex is set
+            regex: Whether text is a regular expression
+            case_sensitive: Whether letter case must match
+        """
+        self.error = None
+        self.pattern = None
+        if text:
+            flags = 0 if case_sensitive else re.IGNORECASE
+            try:
+                self.pattern = re.compile(text if regex else re.escape(text), flags)
+            except re.error as e:
+                self.error = f"Invalid pattern: {e}"
+        self.matches = [None] * len(self.matches)
+        self._total = None
+        
+    def reset(self, line_count: int = 0):
+        """Forget every cached line."""
+        self.matches = [None] * line_count
+        self._total = None
+        
+    def lines_changed(self, first: int, removed: int, added: int):
+        """Record that lines [first, first + removed) were replaced by `added` lines."""
+        self.matches[first:first + removed] = [None] * added
+        self._total = None
+        
+    def line_matches(self, lines, index: int) -> List[Match]:
+        """Get the matches on one line, scanning it if needed.
+        
+        Args:
+            lines: The editor's lines
+            index: Line to get matches for
+        """
+        if self.pattern is None:
+            return []
+        if len(self.matches) != len(lines):
+            # The buffer was replaced without notification
+            self.reset(len(lines))
+        found = self.matches[index]
+        if found is None:
+            # Empty matches (e.g. '^' or 'a*') can't be highlighted or stepped over
+            found = [m.span() for m in self.pattern.finditer(lines[index]) if m.end() > m.start()]
+            self.matches[index] = found
+        return found
+        
+    def count(self, lines) -> int:
+        """Total matches in the buffer; cached until the next edit."""
+        if self.pattern is None:
+            return 0
+        if self._total is None:
+            self._total = sum(len(self.line_matches(lines, i)) for i in range(len(lines)))
+        return self._total
+        
+    def find(self, lines, line: int, col: int, backwards: bool = False) -> Optional[Tuple[int, int, int]]:
+        """Find the next match from a position, wrapping around the buffer.
+        
+        Args:
+            lines: The editor's lines
+            line: Line to start from
+            col: Column to start from; a match must start at or after it
+                (or end at or before it when searching backwards)
+            backwards: Search towards the start of the buffer
+        
+        Returns:
+            (line, start, end) of the match, or None
+        """
+        if self.pattern is None or not len(lines):
+            return None
+        n = len(lines)
+        for step in range(n + 1):
+            li = (line - step) % n if backwards else (line + step) % n
+            found = self.line_matches(lines, li)
+            if step == 0:
+                # Only the part of the start line on the search side of the cursor
+                found = [m for m in found if (m[1] <= col if backwards else m[0] >= col)]
+            elif step == n:
+                # Wrapped back to the start line: the part skipped at first
+                found = [m for m in found if (m[1] > col if backwards else m[0] < col)]
+            if found:
+                start, end = found[-1] if backwards else found[0]
+                return li, start, end
+        return None
+        
+    def expand(self, text: str, start: int, end: int, replacement: str, regex: bool) -> str:
+        """Get the replacement for one match, expanding regex group references."""
+        if not regex:
+            return replacement
+        m = self.pattern.match(text, start)
+        if m is None or m.end() != end:
+            return replacement
+        return m.expand(replacement)
+        
+    def replace_all(self, lines, replacement: str, regex: bool) -> List[Tuple[int, str]]:
+        """Compute the new text of every line with a match.
+        
+        Args:
+            lines: The editor's lines
+            replacement: Replacement text (may use \\1 etc. when regex is set)
+            regex: Whether the pattern is a regular expression
+        
+        Returns:
+            (line index, new text) for each changed line, in order
+        """
+        if self.pattern is None:
+            return []
+            
+        def substitute(m):
+            # Skip empty matches, as highlighting and stepping do
+            if m.end() == m.start():
+                return ''
+            return m.expand(replacement) if regex else replacement
+        
+        changes = []
+        for i, text in enumerate(lines):
+            new, count = self.pattern.subn(substitute, text)
+            if count and new != text:
+                changes.append((i, new))
+        return changes
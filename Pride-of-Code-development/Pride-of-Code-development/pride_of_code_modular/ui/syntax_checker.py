@@ -0,0 +1,118 @@
+"""
+Syntax Checker - Background syntax and lint checking for the code editor.
+
+Parsing the whole buffer on every keystroke makes typing in long files
+lag, so the editor hands snapshots of its text to a worker thread once
+the user has stopped typing for a moment. Every snapshot carries the
+buffer version it was taken from; results for a version that has since
+been edited again are dropped by the editor.
+"""
+
+import ast
+import threading
+import warnings
+from typing import Optional, Dict, List, Tuple
+
+
+def check_source(source: str, analyzer=None) -> Dict:
+    """Parse and compile source code, collecting errors and warnings.
+    
+    Args:
+        source: Python source code
+        analyzer: Optional CodeAnalyzer run on the tree once it compiles
+    
+    Returns:
+        Dictionary with 'error' ({'msg', 'line'} or None), 'warnings'
+        (list of (line, message)), 'diagnostics' (the analyzer's
+        findings) and 'tree' (the AST, or None)
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        return {'error': _error_info(e), 'warnings': [], 'diagnostics': [], 'tree': None}
+    except ValueError as e:  # e.g. null bytes in the source
+        return {'error': {'msg': str(e), 'line': None}, 'warnings': [], 'diagnostics': [], 'tree': None}
+    
+    # Compiling catches what the parser accepts but Python rejects
+    # ('return' outside a function, ...) and reports SyntaxWarnings
+    lint: List[Tuple[Optional[int], str]] = []
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        try:
+            compile(tree, '<editor>', 'exec')
+        except SyntaxError as e:
+            return {'error': _error_info(e), 'warnings': [], 'diagnostics': [], 'tree': tree}
+    for w in caught:
+        line = getattr(w, 'lineno', None)
+        lint.append((line - 1 if line else None, str(w.message)))
+    diagnostics = analyzer.analyze(tree) if analyzer is not None else []
+    return {'error': None, 'warnings': lint, 'diagnostics': diagnostics, 'tree': tree}
+
+
+def _error_info(e: SyntaxError) -> Dict:
+    """Convert a SyntaxError into the editor's error dictionary."""
+    return {'msg': str(e), 'line': e.lineno - 1 if e.lineno else None}
+
+
+class SyntaxChecker:
+    """Checks buffer snapshots on a background thread, newest first."""
+    
+    def __init__(self, analyzer=None):
+        """Create an idle checker.
+        
+        Args:
+            analyzer: Optional CodeAnalyzer run on every snapshot that compiles
+        """
+        self.analyzer = analyzer
+        self._cond = threading.Condition()
+        self._pending: Optional[Tuple[int, str]] = None
+        self._result: Optional[Tuple[int, Dict]] = None
+        self._thread: Optional[threading.Thread] = None
+        self.busy = False
+        
+    def submit(self, version: int, source: str):
+        """Queue a snapshot for checking, replacing any not yet started.
+        
+        Args:
+            version: Buffer version the snapshot was taken at
+            source: Full buffer text
+        """
+        with self._cond:
+            self._pending = (version, source)
+            self.busy = True
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='syntax-checker', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        
+    def poll(self) -> Optional[Tuple[int, Dict]]:
+        """Take the latest finished result, if any.
+        
+        Returns:
+            (version, result) or None
+        """
+        with self._cond:
+            result, self._result = self._result, None
+            return result
+        
+    def wait(self, timeout: float = 1.0) -> bool:
+        """Block until the queued snapshot has been checked (for tests and saving).
+        
+        Returns:
+            True if the checker is idle
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self.busy, timeout)
+        
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None)
+                version, source = self._pending
+                self._pending = None
+            result = check_source(source, self.analyzer)
+            with self._cond:
+                self._result = (version, result)
+                if self._pending is None:
+                    self.busy = False
+                self._cond.notify_all()
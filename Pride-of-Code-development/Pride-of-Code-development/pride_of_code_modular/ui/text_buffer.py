@@ -0,0 +1,161 @@
+"""
+Text Buffer - Chunked line storage for the code editor.
+
+A plain list of lines makes every multi-line insert or delete shift the
+whole tail of the file, so pasting a generated script of thousands of
+lines into a large buffer stalls the UI. LineBuffer keeps the lines in
+chunks of bounded size with an index of the first line of each chunk:
+finding a line is a bisect over the chunk index, and an edit only
+splices the chunks it touches.
+
+LineBuffer behaves like a read-only sequence of strings plus item
+assignment and a `replace` splice, which is all the editor needs.
+"""
+
+from bisect import bisect_right
+from collections.abc import Sequence
+from itertools import chain
+from typing import Iterable, List
+
+# Lines per chunk; chunks grow up to twice this before being split
+CHUNK_SIZE = 512
+
+
+class LineBuffer(Sequence):
+    """Sequence of lines stored in bounded chunks with a line-start index."""
+    
+    def __init__(self, lines: Iterable[str] = (), chunk_size: int = CHUNK_SIZE):
+        """Create a buffer holding the given lines.
+        
+        Args:
+            lines: Initial lines, without newlines
+            chunk_size: Target number of lines per chunk
+        """
+        self.chunk_size = max(1, chunk_size)
+        lines = list(lines)
+        self._chunks: List[List[str]] = self._split(lines)
+        self._starts: List[int] = []
+        self._length = 0
+        self._reindex(0)
+        
+    def _split(self, lines: List[str]) -> List[List[str]]:
+        """Cut a list of lines into chunks of chunk_size."""
+        size = self.chunk_size
+        if len(lines) <= 2 * size:
+            return [lines] if lines else []
+        return [lines[i:i + size] for i in range(0, len(lines), size)]
+        
+    def _reindex(self, first_chunk: int):
+        """Recompute chunk start lines from first_chunk on."""
+        starts = self._starts
+        del starts[first_chunk:]
+        total = starts[-1] + len(self._chunks[first_chunk - 1]) if first_chunk else 0
+        for chunk in self._chunks[first_chunk:]:
+            starts.append(total)
+            total += len(chunk)
+        self._length = total
+        
+    def _locate(self, index: int):
+        """Return (chunk number, offset in chunk) of a line index."""
+        ci = bisect_right(self._starts, index) - 1
+        return ci, index - self._starts[ci]
+        
+    def _normalize(self, index: int) -> int:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('line index out of range')
+        return index
+        
+    def __len__(self) -> int:
+        return self._length
+        
+    def __iter__(self):
+        return chain.from_iterable(self._chunks)
+        
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return list(self)[index]
+            return self.lines_between(start, stop)
+        ci, offset = self._locate(self._normalize(index))
+        return self._chunks[ci][offset]
+        
+    def __setitem__(self, index: int, line: str):
+        ci, offset = self._locate(self._normalize(index))
+        self._chunks[ci][offset] = line
+        
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (LineBuffer, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+        
+    def __repr__(self) -> str:
+        return f"LineBuffer({list(self)!r})"
+        
+    def lines_between(self, start: int, stop: int) -> List[str]:
+        """Get lines [start, stop) as a list.
+        
+        Args:
+            start: First line index
+            stop: Line index to stop before
+        """
+        if start >= stop:
+            return []
+        ci, offset = self._locate(start)
+        result = []
+        count = stop - start
+        while len(result) < count:
+            chunk = self._chunks[ci]
+            result.extend(chunk[offset:offset + count - len(result)])
+            ci += 1
+            offset = 0
+        return result
+        
+    def replace(self, first: int, removed: int, new_lines: List[str]):
+        """Replace lines [first, first + removed) with new_lines.
+        
+        Only the chunks the range touches are rebuilt, so the cost is the
+        size of the edit plus one chunk, not the size of the buffer.
+        
+        Args:
+            first: Index of the first line replaced (may equal len(self))
+            removed: Number of lines removed
+            new_lines: Lines inserted in their place
+        """
+        if first < 0 or removed < 0 or first + removed > self._length:
+            raise IndexError('line range out of range')
+        if not self._chunks:
+            self._chunks = self._split(list(new_lines))
+            self._reindex(0)
+            return
+        
+        # Chunks holding the first and last affected line
+        if first == self._length:
+            ci = cj = len(self._chunks) - 1
+            start = len(self._chunks[ci])
+            end = start
+        else:
+            ci, start = self._locate(first)
+            if removed:
+                cj, end = self._locate(first + removed - 1)
+                end += 1
+            else:
+                cj, end = ci, start
+        
+        if ci == cj and len(self._chunks[ci]) - removed + len(new_lines) <= 2 * self.chunk_size:
+            # Common case: a splice inside one chunk
+            chunk = self._chunks[ci]
+            chunk[start:end] = new_lines
+            if chunk:
+                if removed != len(new_lines):
+                    self._reindex(ci)
+                return
+            del self._chunks[ci]
+            self._reindex(ci)
+            return
+        
+        merged = self._chunks[ci][:start] + list(new_lines) + self._chunks[cj][end:]
+        self._chunks[ci:cj + 1] = self._split(merged)
+        self._reindex(ci)
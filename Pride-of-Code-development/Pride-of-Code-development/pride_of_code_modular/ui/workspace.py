@@ -0,0 +1,438 @@
+"""
+Workspace - Tabs of code files for the editor scene.
+
+A workspace holds one tab per file. Opening a folder only lists it: a
+tab reads its file and builds its CodeEditor the first time it is
+shown, so a class folder of hundreds of student scripts opens at once.
+
+Saving (Ctrl+S) snapshots the buffer on the UI thread and hands the
+text to a background writer, which writes a temporary file next to the
+target and renames it over the original, so a crash or a full disk
+never leaves half a file behind.
+
+Each editor caches tokens and rendered lines. Tabs that are not shown
+keep their text and undo history, but when the caches of all tabs add
+up to more than the memory budget, those of the least recently shown
+tabs are dropped; they are rebuilt the next time the tab is drawn.
+"""
+
+import os
+import tempfile
+import threading
+import pygame
+from typing import Dict, List, Optional, Tuple
+
+from ui.editor import CodeEditor
+
+# Bytes of token and render caches kept across all tabs
+MEMORY_BUDGET = 8 * 1024 * 1024
+
+# Height of the tab strip in pixels
+TAB_HEIGHT = 24
+
+# Width of one tab in the strip
+TAB_WIDTH = 130
+
+
+def write_atomic(path: str, text: str, newline: str = '\n'):
+    """Write a text file by renaming a finished temporary file over it.
+    
+    Args:
+        path: File to write
+        text: Contents, with '\\n' line endings
+        newline: Line ending written to disk
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    # Same directory, so the rename never crosses file systems
+    fd, tmp = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline=newline) as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            # mkstemp creates the file private; keep the original's mode
+            os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class FileSaver:
+    """Writes files on a background thread, newest snapshot per file first."""
+    
+    def __init__(self):
+        self._cond = threading.Condition()
+        # path -> (key, version, text, newline) not yet written
+        self._pending: Dict[str, tuple] = {}
+        self._results: List[Tuple[object, int, Optional[str]]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._writing = 0
+        
+    @property
+    def busy(self) -> bool:
+        """Whether any snapshot is queued or being written."""
+        with self._cond:
+            return bool(self._pending) or self._writing > 0
+        
+    def submit(self, key, path: str, version: int, text: str, newline: str = '\n'):
+        """Queue a snapshot for writing, replacing an unwritten one for the same path.
+        
+        Args:
+            key: Returned with the result to identify the caller (a tab)
+            path: File to write
+            version: Buffer version the snapshot was taken at
+            text: Full buffer text
+            newline: Line ending written to disk
+        """
+        with self._cond:
+            self._pending[path] = (key, version, text, newline)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='file-saver', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        
+    def poll(self) -> List[Tuple[object, int, Optional[str]]]:
+        """Take the finished writes.
+        
+        Returns:
+            (key, version, error message or None) per write, in order
+        """
+        with self._cond:
+            results, self._results = self._results, []
+            return results
+        
+    def wait(self, timeout: float = 5.0) -> bool:
+        """Block until every queued snapshot is on disk (for tests and quitting).
+        
+        Returns:
+            True if the saver is idle
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._writing, timeout)
+        
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                path = next(iter(self._pending))
+                key, version, text, newline = self._pending.pop(path)
+                self._writing += 1
+            error = None
+            try:
+                write_atomic(path, text, newline)
+            except OSError as e:
+                error = f"Could not save {os.path.basename(path)}: {e.strerror or e}"
+            with self._cond:
+                self._writing -= 1
+                self._results.append((key, version, error))
+                self._cond.notify_all()
+
+
+class Tab:
+    """One file in the workspace; its editor is created on first use."""
+    
+    def __init__(self, path: Optional[str], title: Optional[str] = None, lines: Optional[List[str]] = None):
+        """Create an unloaded tab.
+        
+        Args:
+            path: File shown in the tab, or None for an unsaved buffer
+            title: Label in the tab strip; defaults to the file name
+            lines: Initial text of an unsaved buffer
+        """
+        self.path = path
+        self.title = title or (os.path.basename(path) if path else 'untitled')
+        self.editor: Optional[CodeEditor] = None
+        self.newline = '\n'
+        # Buffer version last written to disk, and the one being written
+        self.saved_version: Optional[int] = None
+        self.saving_version: Optional[int] = None
+        # Activation counter when last shown, for least-recently-used eviction
+        self.last_active = 0
+        self._initial_lines = lines
+        
+    @property
+    def loaded(self) -> bool:
+        """Whether the file has been read into an editor."""
+        return self.editor is not None
+        
+    @property
+    def modified(self) -> bool:
+        """Whether the buffer has changes not yet on disk."""
+        return self.editor is not None and self.editor._version != self.saved_version
+        
+    def load(self, rect: pygame.Rect, font=None):
+        """Read the file and create the tab's editor.
+        
+        Args:
+            rect: Editor area
+            font: Editor font, or None for the editor default
+        """
+        lines = self._initial_lines
+        if self.path is not None:
+            with open(self.path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+                text = f.read()
+            # Saves keep the file's line endings
+            self.newline = '\r\n' if '\r\n' in text else '\n'
+            lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        self.editor = CodeEditor(rect, font, lines=lines or [''])
+        self._initial_lines = None
+        if self.path is not None:
+            self.saved_version = self.editor._version
+
+
+class Workspace:
+    """A strip of tabs with one active code editor below it."""
+    
+    def __init__(self, rect: pygame.Rect, font=None, memory_budget: int = MEMORY_BUDGET):
+        """Create an empty workspace.
+        
+        Args:
+            rect: Area of the tab strip and the editor together
+            font: Editor font, or None for the editor default
+            memory_budget: Bytes of token and render caches kept across tabs
+        """
+        self.rect = rect
+        self.editor_rect = pygame.Rect(rect.x, rect.y + TAB_HEIGHT, rect.width, rect.height - TAB_HEIGHT)
+        self.font = font
+        self.memory_budget = memory_budget
+        self.tabs: List[Tab] = []
+        self.active = -1
+        self.saver = FileSaver()
+        # Last save result or error, for the scene's status line
+        self.status: Optional[str] = None
+        self._activations = 0
+        # First tab shown in the strip when they don't all fit
+        self._first_visible = 0
+        self._tab_font = pygame.font.SysFont('arial', 14)
+        self._title_surfaces: Dict[Tuple[str, bool, bool], pygame.Surface] = {}
+        
+        self.colors = {
+            'strip_bg': (24, 24, 28),
+            'tab_bg': (40, 40, 52),
+            'tab_active': (30, 30, 40),
+            'tab_border': (80, 80, 100),
+            'text': (200, 200, 200),
+            'text_active': (255, 215, 0)
+        }
+        
+    @property
+    def editor(self) -> Optional[CodeEditor]:
+        """Editor of the active tab."""
+        if self.active < 0:
+            return None
+        return self.tabs[self.active].editor
+        
+    def open_folder(self, folder: str, extension: str = '.py') -> int:
+        """Add a tab for every matching file in a folder, without reading any.
+        
+        Args:
+            folder: Directory to list (not recursive)
+            extension: File name suffix to include
+        
+        Returns:
+            Number of tabs added
+        """
+        open_paths = {tab.path for tab in self.tabs}
+        with os.scandir(folder) as entries:
+            paths = sorted(e.path for e in entries
+                           if e.name.endswith(extension) and not e.name.startswith('.') and e.is_file())
+        new = [Tab(p) for p in paths if p not in open_paths]
+        self.tabs.extend(new)
+        if self.active < 0 and self.tabs:
+            self.activate(0)
+        return len(new)
+        
+    def open_file(self, path: str) -> int:
+        """Show a file, adding a tab for it unless it is already open.
+        
+        Returns:
+            Index of the file's tab
+        """
+        for i, tab in enumerate(self.tabs):
+            if tab.path == path:
+                break
+        else:
+            self.tabs.append(Tab(path))
+            i = len(self.tabs) - 1
+        self.activate(i)
+        return i
+        
+    def new_tab(self, title: str = 'untitled', lines: Optional[List[str]] = None) -> int:
+        """Add and show a buffer that has no file yet.
+        
+        Returns:
+            Index of the new tab
+        """
+        self.tabs.append(Tab(None, title, lines))
+        self.activate(len(self.tabs) - 1)
+        return len(self.tabs) - 1
+        
+    def activate(self, index: int):
+        """Show a tab, loading its file the first time.
+        
+        Args:
+            index: Tab to show
+        """
+        tab = self.tabs[index]
+        self.status = None
+        if not tab.loaded:
+            try:
+                tab.load(self.editor_rect, self.font)
+            except OSError as e:
+                self.status = f"Could not open {tab.title}: {e.strerror or e}"
+                return
+            tab.editor.on_save_requested = lambda tab=tab: self.save(tab)
+        self.active = index
+        self._activations += 1
+        tab.last_active = self._activations
+        self._enforce_budget()
+        
+    def close_tab(self, index: int):
+        """Close a tab; a save already queued for it still completes.
+        
+        Args:
+            index: Tab to close
+        """
+        del self.tabs[index]
+        if index < self.active:
+            self.active -= 1
+        elif index == self.active:
+            # Show the tab that took its place, or the new last one
+            self.active = -1
+            if self.tabs:
+                self.activate(min(index, len(self.tabs) - 1))
+        
+    def save(self, tab: Optional[Tab] = None) -> bool:
+        """Queue a tab's text for writing in the background.
+        
+        Args:
+            tab: Tab to save; defaults to the active tab
+        
+        Returns:
+            True if a write was queued
+        """
+        tab = tab or (self.tabs[self.active] if self.active >= 0 else None)
+        if tab is None or not tab.loaded:
+            return False
+        if tab.path is None:
+            self.status = f"{tab.title} has no file to save to"
+            return False
+        # The snapshot is taken here; edits made during the write just
+        # leave the tab modified
+        tab.saving_version = tab.editor._version
+        self.saver.submit(tab, tab.path, tab.saving_version, '\n'.join(tab.editor.lines), tab.newline)
+        return True
+        
+    def poll(self):
+        """Apply finished saves; call once per frame."""
+        for tab, version, error in self.saver.poll():
+            if error:
+                self.status = error
+            else:
+                tab.saved_version = version
+                self.status = f"Saved {tab.title}"
+            if tab.saving_version == version:
+                tab.saving_version = None
+        
+    def cache_size(self) -> int:
+        """Approximate bytes held by the caches of every loaded tab."""
+        return sum(tab.editor.cache_size() for tab in self.tabs if tab.loaded)
+        
+    def _enforce_budget(self):
+        """Evict the caches of the least recently shown tabs while over budget."""
+        sizes = [(tab.last_active, tab.editor.cache_size(), tab) for i, tab in enumerate(self.tabs)
+                 if tab.loaded and i != self.active]
+        total = sum(size for _, size, _ in sizes)
+        if self.active >= 0:
+            total += self.tabs[self.active].editor.cache_size()
+        for _, size, tab in sorted(sizes, key=lambda s: s[0]):
+            if total <= self.memory_budget:
+                break
+            if size:
+                tab.editor.evict_caches()
+                total -= size
+        
+    def handle_event(self, event):
+        """Handle tab switching, closing and clicks; pass the rest to the editor.
+        
+        Args:
+            event: Pygame event
+        """
+        if event.type == pygame.KEYDOWN:
+            mod = pygame.key.get_mods()
+            ctrl = mod & pygame.KMOD_CTRL
+            if ctrl and event.key == pygame.K_TAB and self.tabs:
+                step = -1 if mod & pygame.KMOD_SHIFT else 1
+                self.activate((self.active + step) % len(self.tabs))
+                return
+            if ctrl and event.key == pygame.K_w and self.active >= 0:
+                self.close_tab(self.active)
+                return
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 2):
+            index = self._tab_at(event.pos)
+            if index is not None:
+                # Left click shows a tab, middle click closes it
+                if event.button == 1:
+                    self.activate(index)
+                else:
+                    self.close_tab(index)
+                return
+        if self.editor is not None:
+            self.editor.handle_event(event)
+        
+    def _visible_tabs(self) -> range:
+        """Indices of the tabs that fit in the strip, keeping the active one shown."""
+        fit = max(1, self.rect.width // TAB_WIDTH)
+        if self.active >= 0:
+            if self.active < self._first_visible:
+                self._first_visible = self.active
+            elif self.active >= self._first_visible + fit:
+                self._first_visible = self.active - fit + 1
+        self._first_visible = max(0, min(self._first_visible, len(self.tabs) - fit))
+        return range(self._first_visible, min(len(self.tabs), self._first_visible + fit))
+        
+    def _tab_at(self, pos) -> Optional[int]:
+        """Index of the tab under a point of the strip, or None."""
+        x, y = pos
+        if not (self.rect.x <= x < self.rect.right and self.rect.y <= y < self.rect.y + TAB_HEIGHT):
+            return None
+        index = self._first_visible + (x - self.rect.x) // TAB_WIDTH
+        return index if index in self._visible_tabs() else None
+        
+    def _title_surface(self, tab: Tab, active: bool) -> pygame.Surface:
+        """Render a tab label, cached by its text and state."""
+        key = (tab.title, tab.modified, active)
+        surface = self._title_surfaces.get(key)
+        if surface is None:
+            if len(self._title_surfaces) > 512:
+                self._title_surfaces.clear()
+            label = tab.title + (' *' if tab.modified else '')
+            color = self.colors['text_active'] if active else self.colors['text']
+            surface = self._title_surfaces[key] = self._tab_font.render(label, True, color)
+        return surface
+        
+    def draw(self, surface: pygame.Surface):
+        """Draw the tab strip and the active editor.
+        
+        Args:
+            surface: Surface to draw on
+        """
+        self.poll()
+        strip = pygame.Rect(self.rect.x, self.rect.y, self.rect.width, TAB_HEIGHT)
+        pygame.draw.rect(surface, self.colors['strip_bg'], strip)
+        for slot, i in enumerate(self._visible_tabs()):
+            active = i == self.active
+            box = pygame.Rect(strip.x + slot * TAB_WIDTH, strip.y, TAB_WIDTH - 2, TAB_HEIGHT)
+            pygame.draw.rect(surface, self.colors['tab_active' if active else 'tab_bg'], box)
+            pygame.draw.rect(surface, self.colors['tab_border'], box, 1)
+            label = self._title_surface(self.tabs[i], active)
+            # Clip long names to the tab
+            surface.blit(label, (box.x + 6, box.y + (TAB_HEIGHT - label.get_height()) // 2),
+                         pygame.Rect(0, 0, TAB_WIDTH - 12, label.get_height()))
+        if self.editor is not None:
+            self.editor.draw(surface)